@@ -0,0 +1,195 @@
+"""
+Сравнение синхронных и асинхронных страниц блога под ASGI.
+
+Заполняет базу так же, как run_benchmarks.py, и для каждого режима
+(ASYNC_VIEWS = False и True) отправляет ASGI-приложению Django
+параллельные запросы к лентам и страницам публикаций прямо в процессе,
+без HTTP-сервера. Замеряются пропускная способность и задержки
+при заданном числе одновременных запросов.
+
+Синхронная debug toolbar из цепочки middleware исключается: с ней
+каждый запрос под ASGI проходит через общий поток и режимы
+не различаются.
+
+Пример:
+    python benchmarks/asgi_benchmark.py --posts 10000 --comments 100000 \
+        --users 1000 --requests 400 --concurrency 16 --output asgi.json
+"""
+import asyncio
+import json
+import platform
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timezone as dt_timezone
+from importlib import import_module, reload
+from pathlib import Path
+
+from run_benchmarks import (
+    build_parser,
+    build_routes,
+    git_revision,
+    percentile,
+    prepare_database,
+    setup_django,
+)
+
+ROUTES = (
+    'index',
+    'index_deep_page',
+    'category',
+    'profile',
+    'post_detail',
+    'post_detail_busiest',
+)
+MODES = {'sync': False, 'async': True}
+
+
+def parse_args():
+    parser = build_parser(__doc__)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument(
+        '--modes', nargs='*', choices=tuple(MODES), default=tuple(MODES)
+    )
+    return parser.parse_args()
+
+
+def build_application(async_views):
+    from django.conf import settings
+    from django.core.asgi import get_asgi_application
+    from django.urls import clear_url_caches
+
+    settings.ASYNC_VIEWS = async_views
+    for module in ('blog.urls', 'blogicum.urls'):
+        reload(import_module(module))
+    clear_url_caches()
+    return get_asgi_application()
+
+
+async def request(application, url):
+    path, _, query = url.partition('?')
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': query.encode(),
+        'root_path': '',
+        'headers': [(b'host', b'localhost')],
+        'client': ('127.0.0.1', 0),
+        'server': ('localhost', 80),
+    }
+    status = None
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        nonlocal status
+        if message['type'] == 'http.response.start':
+            status = message['status']
+
+    await application(scope, receive, send)
+    return status
+
+
+async def measure(application, url, requests, warmup, concurrency):
+    for _ in range(warmup):
+        await request(application, url)
+    latencies = []
+    statuses = set()
+    pending = iter(range(requests))
+
+    async def worker():
+        for _ in pending:
+            request_started = time.perf_counter()
+            statuses.add(await request(application, url))
+            latencies.append(time.perf_counter() - request_started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    total = time.perf_counter() - started
+    return {
+        'statuses': sorted(statuses),
+        'requests': requests,
+        'throughput_rps': round(requests / total, 2),
+        'mean_ms': round(statistics.mean(latencies) * 1000, 3),
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+    }
+
+
+def main():
+    args = parse_args()
+    setup_django(args.db)
+    prepare_database(args)
+
+    from django.conf import settings
+
+    settings.MIDDLEWARE = [
+        name
+        for name in settings.MIDDLEWARE
+        if not name.startswith('debug_toolbar.')
+    ]
+    _, routes = build_routes(random.Random(args.seed))
+    names = [
+        name for name in ROUTES if not args.routes or name in args.routes
+    ]
+
+    results = {}
+    for mode in args.modes:
+        application = build_application(MODES[mode])
+        results[mode] = {}
+        for name in names:
+            url = routes[name][1]
+            results[mode][name] = {
+                'url': url,
+                **asyncio.run(
+                    measure(
+                        application,
+                        url,
+                        args.requests,
+                        args.warmup,
+                        args.concurrency,
+                    )
+                ),
+            }
+            print(
+                f'{mode:6} {name:22} '
+                f'{results[mode][name]["p50_ms"]:9.2f} ms p50 '
+                f'{results[mode][name]["throughput_rps"]:9.1f} rps',
+                file=sys.stderr,
+            )
+
+    if len(results) == len(MODES):
+        for name in names:
+            before = results['sync'][name]['throughput_rps']
+            after = results['async'][name]['throughput_rps']
+            print(
+                f'{name:22} {before:8.1f} -> {after:8.1f} rps '
+                f'(x{after / before:.2f})',
+                file=sys.stderr,
+            )
+
+    report = {
+        'revision': git_revision(),
+        'created_at': datetime.now(dt_timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'concurrency': args.concurrency,
+        'results': results,
+    }
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output == '-':
+        print(output)
+    else:
+        Path(args.output).write_text(output + '\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,262 @@
+"""
+Нагрузочный бенчмарк страниц блога.
+
+Заполняет отдельную базу SQLite синтетическими данными и замеряет
+пропускную способность и задержки (p50/p95/p99) каждого адреса
+из blog/urls.py через тестовый клиент Django. Результат пишется в JSON,
+чтобы прогоны на разных коммитах можно было сравнить.
+
+Пример:
+    python benchmarks/run_benchmarks.py --posts 10000 --comments 100000 \
+        --users 1000 --requests 200 --output bench.json
+    python benchmarks/run_benchmarks.py --reuse --compare bench.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone as dt_timezone
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent.parent
+PROJECT_DIR = ROOT_DIR / 'blogicum'
+
+
+def build_parser(description=__doc__):
+    parser = argparse.ArgumentParser(description=description.split('\n')[1])
+    parser.add_argument(
+        '--db', default=Path(tempfile.gettempdir()) / 'blogicum_bench.sqlite3'
+    )
+    parser.add_argument('--users', type=int, default=10_000)
+    parser.add_argument('--categories', type=int, default=50)
+    parser.add_argument('--locations', type=int, default=200)
+    parser.add_argument('--posts', type=int, default=100_000)
+    parser.add_argument('--comments', type=int, default=1_000_000)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument(
+        '--reuse',
+        action='store_true',
+        help='Не пересоздавать базу, если она уже заполнена.',
+    )
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--warmup', type=int, default=20)
+    parser.add_argument(
+        '--routes',
+        nargs='*',
+        help='Замерить только перечисленные адреса.',
+    )
+    parser.add_argument('--output', default='-')
+    parser.add_argument(
+        '--compare',
+        help='JSON предыдущего прогона для сравнения p50 и пропускной'
+        ' способности.',
+    )
+    return parser
+
+
+def parse_args():
+    return build_parser().parse_args()
+
+
+def setup_django(db_path):
+    sys.path.insert(0, str(PROJECT_DIR))
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'blogicum.settings')
+    from django.conf import settings
+
+    settings.DATABASES['default']['NAME'] = str(db_path)
+    settings.DEBUG = False
+    import django
+
+    django.setup()
+
+
+def seed(args):
+    from django.core.management import call_command
+
+    call_command(
+        'seed_blog',
+        users=args.users,
+        categories=args.categories,
+        locations=args.locations,
+        posts=args.posts,
+        comments=args.comments,
+        seed=args.seed,
+        stdout=sys.stderr,
+    )
+
+
+def prepare_database(args):
+    from django.core.management import call_command
+
+    from blog.models import Post
+
+    db_path = Path(args.db)
+    if not args.reuse and db_path.exists():
+        db_path.unlink()
+    call_command('migrate', verbosity=0)
+    if not Post.objects.exists():
+        started = time.perf_counter()
+        seed(args)
+        print(
+            f'База заполнена за {time.perf_counter() - started:.1f} с',
+            file=sys.stderr,
+        )
+
+
+def build_routes(rng):
+    from blog.models import Category, Comment, Post
+
+    post_ids = Post.objects.published().values_list('pk', flat=True)
+    post = Post.objects.get(pk=rng.choice(list(post_ids[:1000])))
+    author = post.author
+    comment = Comment.objects.filter(author=author).first()
+    category = Category.objects.filter(is_published=True).first()
+    deep_page = max(Post.objects.published().count() // 10 // 2, 1)
+    busiest_post = (
+        Post.objects.published().order_by('-comment_count').first()
+    )
+    return author, {
+        'index': ('anon', '/'),
+        'index_deep_page': ('anon', f'/?page={deep_page}'),
+        'category': ('anon', f'/category/{category.slug}/'),
+        'profile': ('anon', f'/profile/{author.username}/'),
+        'profile_own': ('author', f'/profile/{author.username}/'),
+        'post_detail': ('anon', f'/posts/{post.id}/'),
+        'post_detail_busiest': ('anon', f'/posts/{busiest_post.id}/'),
+        'comments_fragment': ('anon', f'/posts/{busiest_post.id}/comments/'),
+        'create_post': ('author', '/posts/create/'),
+        'edit_post': ('author', f'/posts/{post.id}/edit/'),
+        'delete_post': ('author', f'/posts/{post.id}/delete/'),
+        'edit_comment': (
+            'author',
+            f'/posts/{comment.post_id}/edit_comment/{comment.id}/'
+            if comment
+            else '/',
+        ),
+        'edit_profile': ('author', '/profile-edit/'),
+    }
+
+
+def describe_dataset():
+    from django.db.models import Max
+
+    from blog.models import Comment, Post, User
+
+    return {
+        'users': User.objects.count(),
+        'posts': Post.objects.count(),
+        'comments': Comment.objects.count(),
+        'max_comments_per_post': Post.objects.aggregate(
+            Max('comment_count')
+        )['comment_count__max'],
+    }
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    index = min(int(round(fraction * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+def measure(client, url, requests, warmup):
+    for _ in range(warmup):
+        client.get(url)
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(requests):
+        request_started = time.perf_counter()
+        response = client.get(url)
+        latencies.append(time.perf_counter() - request_started)
+    total = time.perf_counter() - started
+    return {
+        'status': response.status_code,
+        'requests': requests,
+        'throughput_rps': round(requests / total, 2),
+        'mean_ms': round(statistics.mean(latencies) * 1000, 3),
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ('git', 'rev-parse', '--short', 'HEAD'),
+            cwd=ROOT_DIR,
+            text=True,
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, previous_path):
+    previous = json.loads(Path(previous_path).read_text())['results']
+    for name, result in results.items():
+        if name not in previous:
+            continue
+        before = previous[name]
+        print(
+            f'{name:24} p50 {before["p50_ms"]:9.2f} -> '
+            f'{result["p50_ms"]:9.2f} ms   '
+            f'{before["throughput_rps"]:8.1f} -> '
+            f'{result["throughput_rps"]:8.1f} rps',
+            file=sys.stderr,
+        )
+
+
+def main():
+    args = parse_args()
+    setup_django(args.db)
+    prepare_database(args)
+
+    from django.test import Client
+
+    rng = random.Random(args.seed)
+    author, routes = build_routes(rng)
+    clients = {
+        'anon': Client(HTTP_HOST='localhost'),
+        'author': Client(HTTP_HOST='localhost'),
+    }
+    clients['author'].force_login(author)
+
+    results = {}
+    for name, (client_name, url) in routes.items():
+        if args.routes and name not in args.routes:
+            continue
+        results[name] = {
+            'url': url,
+            'client': client_name,
+            **measure(clients[client_name], url, args.requests, args.warmup),
+        }
+        print(
+            f'{name:24} {results[name]["p50_ms"]:9.2f} ms p50 '
+            f'{results[name]["throughput_rps"]:9.1f} rps',
+            file=sys.stderr,
+        )
+
+    report = {
+        'revision': git_revision(),
+        'created_at': datetime.now(dt_timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'dataset': describe_dataset(),
+        'results': results,
+    }
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output == '-':
+        print(output)
+    else:
+        Path(args.output).write_text(output + '\n')
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == '__main__':
+    main()
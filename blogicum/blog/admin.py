@@ -1,7 +1,7 @@
 from django.contrib import admin
-from django.db.models import Count
 
-from .models import Category, Comment, Location, Post
+from .models import Category, Comment, ImageJob, Location, Post
+from .search import search_posts
 
 admin.site.empty_value_display = 'Не задано'
 
@@ -68,15 +68,6 @@ class LocationAdmin(admin.ModelAdmin):
 
 
 class PostAdmin(admin.ModelAdmin):
-    def get_queryset(self, request):
-        qs = super().get_queryset(request)
-        return qs.annotate(comment_count=Count('comments'))
-
-    def comment_count(self, instance):
-        return instance.comment_count
-
-    comment_count.short_description = 'Количество комментариев'
-
     list_display = (
         'title',
         'text',
@@ -92,7 +83,7 @@ class PostAdmin(admin.ModelAdmin):
         'is_published',
         'category',
     )
-    search_fields = ('title',)
+    search_fields = ('title', 'text')
     list_filter = (
         'category',
         'author',
@@ -102,8 +93,28 @@ class PostAdmin(admin.ModelAdmin):
     )
     inlines = (CommentInline,)
 
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return search_posts(search_term, queryset), False
+
+
+class ImageJobAdmin(admin.ModelAdmin):
+    list_display = (
+        'source',
+        'post',
+        'status',
+        'attempts',
+        'run_after',
+        'created_at',
+    )
+    list_filter = ('status',)
+    search_fields = ('source',)
+    readonly_fields = ('last_error',)
+
 
 admin.site.register(Post, PostAdmin)
 admin.site.register(Category, CategoryAdmin)
 admin.site.register(Location, LocationAdmin)
 admin.site.register(Comment, CommentAdmin)
+admin.site.register(ImageJob, ImageJobAdmin)
@@ -1,7 +1,29 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_migrate
 
 
 class BlogConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'blog'
     verbose_name = 'Блог'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .checks import precompile_templates
+        from .middleware import install_query_timer
+        from .search import ensure_search_triggers
+
+        post_migrate.connect(ensure_search_triggers, sender=self)
+        connection_created.connect(install_query_timer)
+        if settings.TEMPLATE_PRECOMPILE:
+            errors = precompile_templates()
+            if errors:
+                raise ImproperlyConfigured(
+                    'Шаблоны не компилируются: '
+                    + '; '.join(
+                        f'{name}: {error}' for name, error in errors.items()
+                    )
+                )
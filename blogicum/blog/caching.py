@@ -0,0 +1,142 @@
+import time
+from hashlib import md5
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.utils.http import quote_etag
+
+from .models import get_publication_cutoff
+
+VERSION_KEY = 'blog:version:{label}:{pk}'
+
+
+def _version_key(label, pk):
+    return VERSION_KEY.format(label=label, pk=pk)
+
+
+def _new_version():
+    return f'{int(time.time() * 1000):x}-{uuid4().hex}'
+
+
+def version_timestamp(version):
+    """Время создания версии в секундах."""
+    stamp, _, _ = version.partition('-')
+    try:
+        return int(stamp, 16) / 1000
+    except ValueError:
+        return 0
+
+
+def get_versions(*objects):
+    """
+    Возвращает версии объектов по парам (метка, pk).
+    Отсутствующая в кеше версия создаётся заново, чтобы после вытеснения
+    ключа не совпасть со старым фрагментом.
+    """
+    keys = [_version_key(label, pk) for label, pk in objects]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, _new_version(), None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_version(label, pk):
+    cache.set(_version_key(label, pk), _new_version(), None)
+
+
+def post_card_cache_key(post, viewer_is_author):
+    """
+    Ключ карточки публикации. updated_at меняется при любой записи
+    публикации в базу, поэтому правка сбрасывает карточку во всех
+    процессах, даже если версия в их кеше не сдвинулась.
+    """
+    versions = get_versions(
+        ('post', post.pk),
+        ('category', post.category_id),
+        ('location', post.location_id),
+        ('user', post.author_id),
+    )
+    return 'blog:post_card:{}:{}:{}:{}:{}'.format(
+        post.pk,
+        post.comment_count,
+        int(post.updated_at.timestamp() * 1000000),
+        ':'.join(versions),
+        int(viewer_is_author),
+    )
+
+
+PAGE_CACHE_KEY = 'blog:page:{path}:{cutoff}:{versions}'
+PAGE_CACHE_STATS_KEY = 'blog:page_cache:{}'
+
+
+def page_cache_key(request, tags):
+    versions = get_versions(*(('tag', tag) for tag in ('all', *tags)))
+    return PAGE_CACHE_KEY.format(
+        path=request.get_full_path(),
+        cutoff=int(get_publication_cutoff().timestamp()),
+        versions=':'.join(versions),
+    )
+
+
+CONTENT_VALIDATORS_KEY = 'blog:validators:{path}'
+
+
+def get_content_validators(path, content):
+    """
+    Возвращает (ETag, Last-Modified) для содержимого по адресу path.
+    ETag считается по содержимому, а Last-Modified сдвигается только
+    вместе с ним, поэтому пересборка неизменившегося ответа после
+    сброса кеша не ломает условные запросы клиентов.
+    """
+    etag = quote_etag(md5(content).hexdigest())
+    key = CONTENT_VALIDATORS_KEY.format(path=path)
+    validators = cache.get(key)
+    if validators is None or validators[0] != etag:
+        validators = (etag, int(time.time()))
+        cache.set(key, validators, None)
+    return validators
+
+
+def get_file_validators(file_stat, encoding=None):
+    """
+    Возвращает (ETag, Last-Modified) для файла по его stat. У сжатой
+    копии файла (encoding) свой ETag.
+    """
+    etag = f'{file_stat.st_mtime_ns:x}-{file_stat.st_size:x}'
+    if encoding:
+        etag += f'-{encoding}'
+    return quote_etag(etag), int(file_stat.st_mtime)
+
+
+def purge_tags(*tags):
+    for tag in set(tags):
+        bump_version('tag', tag)
+
+
+def post_page_tags(category_slug, author_username):
+    return (
+        'feed',
+        f'category:{category_slug}',
+        f'profile:{author_username}',
+    )
+
+
+def record_page_cache_access(hit):
+    key = PAGE_CACHE_STATS_KEY.format('hits' if hit else 'misses')
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
+
+
+def page_cache_stats():
+    stats = cache.get_many(
+        [PAGE_CACHE_STATS_KEY.format(name) for name in ('hits', 'misses')]
+    )
+    return {
+        name: stats.get(PAGE_CACHE_STATS_KEY.format(name), 0)
+        for name in ('hits', 'misses')
+    }
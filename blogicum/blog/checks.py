@@ -0,0 +1,50 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.core.checks import Error, Tags, register
+from django.template import TemplateSyntaxError, engines
+
+from .media import MEDIA_SERVE_MODES
+
+
+def precompile_templates():
+    """
+    Компилирует все шаблоны из TEMPLATES_DIR. С кеширующим загрузчиком
+    скомпилированные шаблоны остаются в памяти, и первый запрос к
+    странице не тратит время на разбор. Возвращает ошибки по именам
+    шаблонов.
+    """
+    directory = Path(settings.TEMPLATES_DIR)
+    engine = engines['django']
+    errors = {}
+    for path in sorted(directory.rglob('*.html')):
+        name = path.relative_to(directory).as_posix()
+        try:
+            engine.get_template(name)
+        except TemplateSyntaxError as error:
+            errors[name] = error
+    return errors
+
+
+@register(Tags.templates)
+def check_templates_compile(app_configs, **kwargs):
+    return [
+        Error(
+            f'Шаблон {name} не компилируется: {error}',
+            id='blog.E001',
+        )
+        for name, error in precompile_templates().items()
+    ]
+
+
+@register()
+def check_media_serve_mode(app_configs, **kwargs):
+    if settings.MEDIA_SERVE_MODE in MEDIA_SERVE_MODES:
+        return []
+    return [
+        Error(
+            f'MEDIA_SERVE_MODE должен быть одним из {MEDIA_SERVE_MODES},'
+            f' а не {settings.MEDIA_SERVE_MODE!r}.',
+            id='blog.E002',
+        )
+    ]
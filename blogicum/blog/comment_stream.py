@@ -0,0 +1,356 @@
+import asyncio
+import json
+from collections import defaultdict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.db.models import Max
+from django.template.loader import render_to_string
+from django.urls import Resolver404, resolve
+
+from .models import Comment, Post
+
+STREAM_VIEW_NAME = 'blog:comment_stream'
+STREAM_PATH_SUFFIX = '/comments/stream/'
+BATCH_SIZE = 100
+SSE_HEADERS = [
+    (b'content-type', b'text/event-stream; charset=utf-8'),
+    (b'cache-control', b'no-cache'),
+    (b'x-accel-buffering', b'no'),
+]
+
+
+class StreamLimitExceeded(Exception):
+    pass
+
+
+def serialize_comment(comment):
+    return {
+        'id': comment.id,
+        'post_id': comment.post_id,
+        'author': comment.author.username,
+        'text': comment.text,
+        'created_at': comment.created_at.isoformat(),
+        'html': render_to_string(
+            'includes/comment.html', {'comment': comment}
+        ),
+    }
+
+
+def format_event(payload):
+    data = json.dumps(payload, ensure_ascii=False)
+    return f'id: {payload["id"]}\nevent: comment\ndata: {data}\n\n'
+
+
+def format_stream_start(last_id):
+    """
+    Начало потока: задержка переподключения и номер последнего
+    комментария, чтобы EventSource прислал его в Last-Event-ID.
+    """
+    retry = int(settings.COMMENT_STREAM_POLL_INTERVAL * 1000)
+    return f'retry: {retry}\nid: {last_id}\n\n'
+
+
+def get_comment_events(post_ids, after):
+    comments = (
+        Comment.objects.filter(post_id__in=post_ids, pk__gt=after)
+        .select_related('author')
+        .order_by('pk')[:BATCH_SIZE]
+    )
+    return [serialize_comment(comment) for comment in comments]
+
+
+def post_is_streamable(post_id):
+    return Post.objects.published().filter(pk=post_id).exists()
+
+
+def get_last_comment_id():
+    return Comment.objects.aggregate(last=Max('pk'))['last'] or 0
+
+
+def get_stream_start(post_id, last_event_id=None):
+    """
+    Номер последнего отданного комментария публикации и комментарии
+    после Last-Event-ID.
+    """
+    if last_event_id is None:
+        last_id = Comment.objects.filter(post_id=post_id).aggregate(
+            last=Max('pk')
+        )['last']
+        return last_id or 0, []
+    replay = get_comment_events([post_id], last_event_id)
+    return (replay[-1]['id'] if replay else last_event_id), replay
+
+
+def open_stream(post_id, last_event_id=None):
+    """
+    Проверяет, что публикация видна всем, и возвращает начало потока
+    из get_stream_start(). None — публикации нет или она скрыта.
+    """
+    if not post_is_streamable(post_id):
+        return None
+    return get_stream_start(post_id, last_event_id)
+
+
+def parse_last_event_id(value):
+    try:
+        return max(int(value), 0)
+    except (TypeError, ValueError):
+        return None
+
+
+def _in_thread(func):
+    def run(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+
+    return sync_to_async(run, thread_sensitive=False)
+
+
+class Listener:
+    """
+    Подписчик на комментарии одной публикации.
+    Очередь ограничена COMMENT_STREAM_QUEUE_SIZE: если клиент не успевает
+    читать, очередь очищается, и поток закрывается. Клиент
+    переподключится с Last-Event-ID и дочитает пропущенное из базы.
+    Комментарии не новее last_id подписчику уже отданы и в очередь
+    не попадают.
+    """
+
+    def __init__(self, last_id=0):
+        self.queue = asyncio.Queue(settings.COMMENT_STREAM_QUEUE_SIZE)
+        self.overflowed = False
+        self.last_id = last_id
+
+    def offer(self, payload):
+        if self.overflowed or payload['id'] <= self.last_id:
+            return
+        self.last_id = payload['id']
+        try:
+            self.queue.put_nowait(payload)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(None)
+
+
+class CommentStreamHub:
+    """
+    Раздаёт новые комментарии подписчикам в пределах процесса.
+
+    Пока есть подписчики, одна задача опрашивает базу раз в
+    COMMENT_STREAM_POLL_INTERVAL секунд — так до подписчиков доходят
+    комментарии, созданные другими процессами, без внешнего брокера.
+    Комментарии этого процесса будят опрос сразу через notify().
+
+    Опрос идёт от общего номера последнего комментария, который только
+    растёт: он начинается с последнего комментария на момент первой
+    подписки, а более ранние подписчик дочитывает сам после подписки.
+    """
+
+    def __init__(self):
+        self.listeners = defaultdict(set)
+        self.connections = 0
+        self.last_id = None
+        self.loop = None
+        self.wakeup = None
+        self.poller = None
+
+    async def subscribe(self, post_id, last_id):
+        if self.last_id is None:
+            cursor = await _in_thread(get_last_comment_id)()
+            if self.last_id is None:
+                self.last_id = cursor
+        if self.connections >= settings.COMMENT_STREAM_MAX_CONNECTIONS:
+            raise StreamLimitExceeded
+        listener = Listener(last_id)
+        self.listeners[post_id].add(listener)
+        self.connections += 1
+        self._ensure_poller()
+        return listener
+
+    def unsubscribe(self, post_id, listener):
+        listeners = self.listeners[post_id]
+        listeners.discard(listener)
+        if not listeners:
+            del self.listeners[post_id]
+        self.connections -= 1
+
+    def notify(self):
+        """Будит опрос; вызывается из любого потока."""
+        loop, wakeup = self.loop, self.wakeup
+        if loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(wakeup.set)
+
+    def publish(self, payloads):
+        for payload in payloads:
+            for listener in self.listeners.get(payload['post_id'], ()):
+                listener.offer(payload)
+
+    def _ensure_poller(self):
+        loop = asyncio.get_running_loop()
+        if self.loop is not loop:
+            self.loop = loop
+            self.wakeup = asyncio.Event()
+            self.poller = None
+        if self.poller is None or self.poller.done():
+            self.poller = loop.create_task(self._poll())
+
+    async def _poll(self):
+        fetch = _in_thread(get_comment_events)
+        try:
+            while self.listeners:
+                try:
+                    await asyncio.wait_for(
+                        self.wakeup.wait(),
+                        settings.COMMENT_STREAM_POLL_INTERVAL,
+                    )
+                except asyncio.TimeoutError:
+                    pass
+                self.wakeup.clear()
+                payloads = [None] * BATCH_SIZE
+                while len(payloads) == BATCH_SIZE and self.listeners:
+                    payloads = await fetch(list(self.listeners), self.last_id)
+                    if payloads:
+                        self.last_id = payloads[-1]['id']
+                        self.publish(payloads)
+        finally:
+            if not self.listeners:
+                self.last_id = None
+
+
+comment_stream_hub = CommentStreamHub()
+
+
+class CommentStreamApplication:
+    """
+    ASGI-приложение поверх Django, которое само обслуживает потоки
+    новых комментариев (blog:comment_stream). В Django 3.2 потоковый
+    ответ нельзя отдавать асинхронно, поэтому Server-Sent Events
+    пишутся напрямую в send(): тысячи ждущих клиентов стоят по
+    корутине и небольшой очереди, без потока на каждого.
+    Остальные запросы передаются Django.
+    """
+
+    def __init__(self, application, hub=comment_stream_hub):
+        self.application = application
+        self.hub = hub
+
+    async def __call__(self, scope, receive, send):
+        post_id = self.match(scope)
+        if post_id is None:
+            return await self.application(scope, receive, send)
+        return await self.stream(post_id, scope, receive, send)
+
+    def match(self, scope):
+        if scope['type'] != 'http' or not scope['path'].endswith(
+            STREAM_PATH_SUFFIX
+        ):
+            return None
+        try:
+            match = resolve(scope['path'])
+        except Resolver404:
+            return None
+        if match.view_name != STREAM_VIEW_NAME:
+            return None
+        return match.kwargs['post_id']
+
+    async def respond(self, send, status, text, headers=()):
+        await send(
+            {
+                'type': 'http.response.start',
+                'status': status,
+                'headers': [
+                    (b'content-type', b'text/plain; charset=utf-8'),
+                    *headers,
+                ],
+            }
+        )
+        await send({'type': 'http.response.body', 'body': text.encode()})
+
+    async def stream(self, post_id, scope, receive, send):
+        headers = dict(scope['headers'])
+        last_event_id = parse_last_event_id(
+            headers.get(b'last-event-id', b'').decode()
+        )
+        if not await _in_thread(post_is_streamable)(post_id):
+            return await self.respond(send, 404, 'Публикация не найдена.')
+        try:
+            listener = await self.hub.subscribe(post_id, last_event_id or 0)
+        except StreamLimitExceeded:
+            retry_after = str(settings.COMMENT_STREAM_POLL_INTERVAL)
+            return await self.respond(
+                send,
+                503,
+                'Слишком много подключений, попробуйте позже.',
+                [(b'retry-after', retry_after.encode())],
+            )
+        disconnected = asyncio.ensure_future(self.wait_disconnect(receive))
+        try:
+            # Начало потока читается после подписки: комментарии,
+            # созданные между ними, приходят либо здесь, либо от опроса.
+            last_id, replay = await _in_thread(get_stream_start)(
+                post_id, last_event_id
+            )
+            listener.last_id = max(listener.last_id, last_id)
+            await send(
+                {
+                    'type': 'http.response.start',
+                    'status': 200,
+                    'headers': SSE_HEADERS,
+                }
+            )
+            await self.send_chunk(
+                send,
+                format_stream_start(last_id)
+                + ''.join(format_event(payload) for payload in replay),
+            )
+            if len(replay) == BATCH_SIZE:
+                # Пропущено больше, чем помещается в одну выборку, а опрос
+                # уже ушёл дальше: поток закрывается, и клиент дочитает
+                # остальное, переподключившись с Last-Event-ID.
+                await send({'type': 'http.response.body', 'body': b''})
+                return
+            await self.relay(listener, last_id, disconnected, send)
+        finally:
+            disconnected.cancel()
+            self.hub.unsubscribe(post_id, listener)
+
+    async def relay(self, listener, last_id, disconnected, send):
+        while True:
+            received = asyncio.ensure_future(listener.queue.get())
+            done, _ = await asyncio.wait(
+                {received, disconnected},
+                timeout=settings.COMMENT_STREAM_HEARTBEAT,
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if received not in done:
+                received.cancel()
+                if disconnected in done:
+                    return
+                await self.send_chunk(send, ': ping\n\n')
+                continue
+            payload = received.result()
+            if payload is None:
+                await send({'type': 'http.response.body', 'body': b''})
+                return
+            if payload['id'] > last_id:
+                last_id = payload['id']
+                await self.send_chunk(send, format_event(payload))
+
+    async def send_chunk(self, send, text):
+        await send(
+            {
+                'type': 'http.response.body',
+                'body': text.encode(),
+                'more_body': True,
+            }
+        )
+
+    async def wait_disconnect(self, receive):
+        while (await receive())['type'] != 'http.disconnect':
+            pass
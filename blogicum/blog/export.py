@@ -0,0 +1,135 @@
+import json
+from datetime import datetime, time, timedelta
+from itertools import groupby
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+
+from .models import Comment
+from .queryset_utilities import get_posts
+
+POST_FIELDS = (
+    'id',
+    'title',
+    'text',
+    'pub_date',
+    'created_at',
+    'updated_at',
+    'is_published',
+    'image',
+    'comment_count',
+    'author_id',
+    'author__username',
+    'category_id',
+    'category__slug',
+    'category__title',
+    'location_id',
+    'location__name',
+)
+COMMENT_FIELDS = (
+    'id',
+    'post_id',
+    'text',
+    'created_at',
+    'author_id',
+    'author__username',
+)
+
+
+def _start_of_day(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def get_export_queryset(
+    since=None, until=None, category=None, only_published=True
+):
+    """
+    Публикации для выгрузки в порядке первичного ключа.
+    since и until — даты публикации включительно, category — slug.
+    """
+    posts = get_posts(only_published=only_published)
+    if since is not None:
+        posts = posts.filter(pub_date__gte=_start_of_day(since))
+    if until is not None:
+        posts = posts.filter(
+            pub_date__lt=_start_of_day(until + timedelta(days=1))
+        )
+    if category is not None:
+        posts = posts.filter(category__slug=category)
+    return posts.order_by('pk').values(*POST_FIELDS)
+
+
+def _serialize_post(post, comments):
+    return {
+        'id': post['id'],
+        'title': post['title'],
+        'text': post['text'],
+        'pub_date': post['pub_date'],
+        'created_at': post['created_at'],
+        'updated_at': post['updated_at'],
+        'is_published': post['is_published'],
+        'image': post['image'] or None,
+        'comment_count': post['comment_count'],
+        'author': {
+            'id': post['author_id'],
+            'username': post['author__username'],
+        },
+        'category': post['category_id'] and {
+            'id': post['category_id'],
+            'slug': post['category__slug'],
+            'title': post['category__title'],
+        },
+        'location': post['location_id'] and {
+            'id': post['location_id'],
+            'name': post['location__name'],
+        },
+        'comments': [
+            {
+                'id': comment['id'],
+                'text': comment['text'],
+                'created_at': comment['created_at'],
+                'author': {
+                    'id': comment['author_id'],
+                    'username': comment['author__username'],
+                },
+            }
+            for comment in comments
+        ],
+    }
+
+
+def _serialize_chunk(posts):
+    comments = (
+        Comment.objects.filter(post_id__in=[post['id'] for post in posts])
+        .order_by('post_id', 'created_at', 'id')
+        .values(*COMMENT_FIELDS)
+    )
+    by_post = {
+        post_id: list(group)
+        for post_id, group in groupby(
+            comments.iterator(), key=lambda comment: comment['post_id']
+        )
+    }
+    for post in posts:
+        yield json.dumps(
+            _serialize_post(post, by_post.get(post['id'], ())),
+            cls=DjangoJSONEncoder,
+            ensure_ascii=False,
+        ) + '\n'
+
+
+def export_posts_ndjson(posts, chunk_size=1000):
+    """
+    Построчно отдаёт публикации с комментариями в формате NDJSON.
+    Публикации читаются через iterator() порциями по chunk_size,
+    комментарии каждой порции — одним запросом, поэтому память
+    не растёт вместе с таблицами.
+    """
+    chunk = []
+    for post in posts.iterator(chunk_size=chunk_size):
+        chunk.append(post)
+        if len(chunk) == chunk_size:
+            yield from _serialize_chunk(chunk)
+            chunk = []
+    if chunk:
+        yield from _serialize_chunk(chunk)
@@ -0,0 +1,144 @@
+from django.conf import settings
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.http import http_date
+
+from .caching import get_content_validators, page_cache_key
+from .models import Category, User
+from .queryset_utilities import get_posts
+
+
+class CachedFeed(Feed):
+    """
+    Лента публикаций с кешированием тела и условными запросами.
+    Тело хранится под теми же метками, что и страницы из кеша страниц,
+    поэтому сбрасывается вместе с ними при изменении публикаций.
+    """
+
+    def get_cache_tags(self, **kwargs):
+        return ('feed',)
+
+    def __call__(self, request, *args, **kwargs):
+        key = page_cache_key(request, self.get_cache_tags(**kwargs))
+        cached = cache.get(key)
+        if cached is None:
+            response = super().__call__(request, *args, **kwargs)
+            cached = (
+                response.content,
+                response['Content-Type'],
+                *get_content_validators(
+                    request.get_full_path(), response.content
+                ),
+            )
+            cache.set(key, cached, settings.FEED_CACHE_TIMEOUT)
+        content, content_type, etag, last_modified = cached
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        ) or HttpResponse(content, content_type=content_type)
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        return response
+
+    def items(self, obj=None):
+        return get_posts(only_published=True)[:settings.FEED_ITEMS]
+
+    def item_title(self, item):
+        return item.title
+
+    def item_description(self, item):
+        return item.text
+
+    def item_link(self, item):
+        return reverse('blog:post_detail', kwargs={'post_id': item.pk})
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_updateddate(self, item):
+        return max(item.pub_date, item.updated_at)
+
+    def item_author_name(self, item):
+        return item.author.get_full_name() or item.author.username
+
+    def item_categories(self, item):
+        return (item.category.title,) if item.category_id else ()
+
+
+class LatestPostsFeed(CachedFeed):
+    title = 'Блогикум'
+    description = 'Новые публикации Блогикума.'
+
+    def link(self):
+        return reverse('blog:index')
+
+
+class CategoryPostsFeed(CachedFeed):
+    def get_cache_tags(self, category_slug):
+        return (f'category:{category_slug}',)
+
+    def get_object(self, request, category_slug):
+        return get_object_or_404(
+            Category, slug=category_slug, is_published=True
+        )
+
+    def title(self, category):
+        return f'Блогикум: {category.title}'
+
+    def description(self, category):
+        return category.description
+
+    def link(self, category):
+        return reverse(
+            'blog:category_posts', kwargs={'category_slug': category.slug}
+        )
+
+    def items(self, category):
+        return get_posts(category.posts, only_published=True)[
+            :settings.FEED_ITEMS
+        ]
+
+
+class AuthorPostsFeed(CachedFeed):
+    def get_cache_tags(self, username):
+        return (f'profile:{username}',)
+
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def title(self, author):
+        return f'Блогикум: публикации {author.username}'
+
+    def description(self, author):
+        return f'Новые публикации пользователя {author.username}.'
+
+    def link(self, author):
+        return reverse('blog:profile', kwargs={'username': author.username})
+
+    def items(self, author):
+        return get_posts(author.posts, only_published=True)[
+            :settings.FEED_ITEMS
+        ]
+
+
+class LatestPostsAtomFeed(LatestPostsFeed):
+    feed_type = Atom1Feed
+    subtitle = LatestPostsFeed.description
+
+
+class CategoryPostsAtomFeed(CategoryPostsFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, category):
+        return self.description(category)
+
+
+class AuthorPostsAtomFeed(AuthorPostsFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, author):
+        return self.description(author)
@@ -40,3 +40,12 @@ class CustomUserForm(UserCreationForm):
             'username',
             'email',
         )
+
+
+class PostExportForm(forms.Form):
+    since = forms.DateField(required=False, label='Опубликовано с')
+    until = forms.DateField(required=False, label='Опубликовано по')
+    category = forms.SlugField(required=False, label='Категория')
+    all = forms.BooleanField(
+        required=False, label='Включая неопубликованные'
+    )
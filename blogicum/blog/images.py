@@ -0,0 +1,138 @@
+from io import BytesIO
+from pathlib import PurePosixPath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+
+def get_variant_widths():
+    widths = set()
+    for width in settings.POST_IMAGE_SIZES.values():
+        widths.update((width, width * 2))
+    return sorted(widths)
+
+
+def variant_name(name, width, extension):
+    path = PurePosixPath(name)
+    return str(path.with_name(f'{path.stem}_{width}w.{extension}'))
+
+
+def _encode(image, image_format, **options):
+    buffer = BytesIO()
+    image.save(buffer, format=image_format, **options)
+    return ContentFile(buffer.getvalue())
+
+
+def generate_variants(image_file):
+    """
+    Сохраняет уменьшенные копии изображения рядом с оригиналом.
+    Для каждой ширины из POST_IMAGE_SIZES (и её 2x) меньше исходной
+    создаётся копия в исходном формате и в WebP. Возвращает описание
+    оригинала и копий для поля Post.image_variants.
+    """
+    storage = image_file.storage
+    with image_file.open('rb'), Image.open(image_file) as source:
+        has_alpha = (
+            'A' in source.getbands() or 'transparency' in source.info
+        )
+        image = ImageOps.exif_transpose(source).convert(
+            'RGBA' if has_alpha else 'RGB'
+        )
+    fallback_format, extension = (
+        ('PNG', 'png') if has_alpha else ('JPEG', 'jpg')
+    )
+
+    variants = []
+    for width in get_variant_widths():
+        if width >= image.width:
+            break
+        height = round(image.height * width / image.width)
+        resized = image.resize((width, height), Image.Resampling.LANCZOS)
+        fallback_options = (
+            {'optimize': True}
+            if has_alpha
+            else {
+                'quality': settings.POST_IMAGE_QUALITY,
+                'optimize': True,
+                'progressive': True,
+            }
+        )
+        variants.append(
+            {
+                'width': width,
+                'height': height,
+                'fallback': storage.save(
+                    variant_name(image_file.name, width, extension),
+                    _encode(resized, fallback_format, **fallback_options),
+                ),
+                'webp': storage.save(
+                    variant_name(image_file.name, width, 'webp'),
+                    _encode(
+                        resized,
+                        'WEBP',
+                        quality=settings.POST_IMAGE_QUALITY,
+                    ),
+                ),
+            }
+        )
+    return {
+        'source': image_file.name,
+        'width': image.width,
+        'height': image.height,
+        'variants': variants,
+    }
+
+
+def clean_original(image_file):
+    """
+    Убирает EXIF из оригинала и пережимает его.
+    Файл перезаписывается под тем же именем, если в нём были метаданные
+    или пережатая копия получилась меньше исходной.
+    """
+    with image_file.open('rb'), Image.open(image_file) as source:
+        image_format = source.format
+        if image_format not in ('JPEG', 'PNG', 'WEBP'):
+            return image_file.name
+        has_exif = bool(source.getexif())
+        options = {'exif': b'', 'optimize': True}
+        if 'icc_profile' in source.info:
+            options['icc_profile'] = source.info['icc_profile']
+        if image_format in ('JPEG', 'WEBP'):
+            options['quality'] = settings.POST_IMAGE_QUALITY
+        image = ImageOps.exif_transpose(source)
+        if image_format == 'JPEG':
+            options['progressive'] = True
+            if image.mode not in ('RGB', 'L'):
+                image = image.convert('RGB')
+        cleaned = _encode(image, image_format, **options)
+    if not has_exif and cleaned.size >= image_file.size:
+        return image_file.name
+    storage, name = image_file.storage, image_file.name
+    storage.delete(name)
+    return storage.save(name, cleaned)
+
+
+def variants_are_current(post):
+    if not post.image:
+        return not post.image_variants
+    return (post.image_variants or {}).get('source') == post.image.name
+
+
+def update_variants(post):
+    """
+    Обрабатывает изображение публикации, если копии устарели:
+    чистит оригинал и создаёт уменьшенные копии.
+    """
+    if variants_are_current(post):
+        return False
+    source = post.image.name
+    if post.image:
+        post.image.name = clean_original(post.image)
+        post.image_variants = generate_variants(post.image)
+    else:
+        post.image_variants = {}
+    type(post).objects.filter(pk=post.pk, image=source).update(
+        image=post.image.name, image_variants=post.image_variants
+    )
+    return True
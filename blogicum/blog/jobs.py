@@ -0,0 +1,163 @@
+import logging
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .caching import bump_version, post_page_tags, purge_tags
+from .images import update_variants, variants_are_current
+from .models import ImageJob
+
+logger = logging.getLogger(__name__)
+
+
+def enqueue_image_job(post):
+    """Ставит обработку изображения в очередь, если её там ещё нет."""
+    if variants_are_current(post):
+        return None
+    job, _ = ImageJob.objects.get_or_create(
+        post=post,
+        source=post.image.name,
+        status=ImageJob.PENDING,
+    )
+    return job
+
+
+def _stale_condition(now):
+    """
+    Задачи, обработчик которых не отчитался за IMAGE_JOB_TIMEOUT:
+    скорее всего, он упал вместе с процессом.
+    """
+    stale = now - timedelta(seconds=settings.IMAGE_JOB_TIMEOUT)
+    return Q(status=ImageJob.RUNNING, locked_at__lt=stale)
+
+
+def _ready_condition(now):
+    return Q(status=ImageJob.PENDING, run_after__lte=now) | (
+        _stale_condition(now)
+        & Q(attempts__lt=settings.IMAGE_JOB_MAX_ATTEMPTS)
+    )
+
+
+def fail_exhausted_jobs(now=None):
+    """
+    Помечает FAILED зависшие задачи без оставшихся попыток. Задача,
+    на которой обработчик падает целиком (нехватка памяти, сбой в
+    Pillow), иначе забиралась бы заново каждые IMAGE_JOB_TIMEOUT.
+    """
+    return ImageJob.objects.filter(
+        _stale_condition(now or timezone.now()),
+        attempts__gte=settings.IMAGE_JOB_MAX_ATTEMPTS,
+    ).update(
+        status=ImageJob.FAILED,
+        last_error='Обработчик не завершил задачу за отведённое время.',
+    )
+
+
+def claim_job(job_id):
+    """Атомарно забирает задачу, чтобы её не взял другой обработчик."""
+    now = timezone.now()
+    return (
+        ImageJob.objects.filter(_ready_condition(now), pk=job_id).update(
+            status=ImageJob.RUNNING,
+            locked_at=now,
+            attempts=F('attempts') + 1,
+        )
+        == 1
+    )
+
+
+def get_ready_job_ids(limit):
+    now = timezone.now()
+    fail_exhausted_jobs(now)
+    return list(
+        ImageJob.objects.filter(_ready_condition(now)).values_list(
+            'pk', flat=True
+        )[:limit]
+    )
+
+
+def run_job(job_id):
+    if not claim_job(job_id):
+        return None
+    job = ImageJob.objects.select_related(
+        'post__category', 'post__author'
+    ).get(pk=job_id)
+    post = job.post
+    try:
+        if post.image.name == job.source and update_variants(post):
+            bump_version('post', post.pk)
+            purge_tags(
+                *post_page_tags(
+                    post.category.slug if post.category_id else None,
+                    post.author.username,
+                )
+            )
+    except Exception:
+        logger.exception('Не удалось обработать изображение %s', job.source)
+        job.refresh_from_db(fields=('attempts',))
+        if job.attempts >= settings.IMAGE_JOB_MAX_ATTEMPTS:
+            job.status = ImageJob.FAILED
+        else:
+            job.status = ImageJob.PENDING
+            job.run_after = timezone.now() + timedelta(
+                seconds=settings.IMAGE_JOB_RETRY_DELAY
+                * 2 ** (job.attempts - 1)
+            )
+        job.last_error = traceback.format_exc()
+        job.save(update_fields=('status', 'run_after', 'last_error'))
+    else:
+        job.status = ImageJob.DONE
+        job.last_error = ''
+        job.save(update_fields=('status', 'last_error'))
+    return job.status
+
+
+def _run_job_in_thread(job_id):
+    close_old_connections()
+    try:
+        return run_job(job_id)
+    finally:
+        connection.close()
+
+
+def run_worker(concurrency=1, once=False, poll_interval=1.0):
+    """
+    Обрабатывает очередь изображений.
+    При concurrency > 1 задачи выполняются в пуле потоков; с once=True
+    обработчик завершается, когда готовых задач не остаётся.
+    """
+    processed = 0
+    executor = (
+        ThreadPoolExecutor(max_workers=concurrency)
+        if concurrency > 1
+        else None
+    )
+    try:
+        while True:
+            job_ids = get_ready_job_ids(limit=concurrency * 4)
+            if not job_ids:
+                if once:
+                    return processed
+                time.sleep(poll_interval)
+                continue
+            if executor is None:
+                results = [run_job(job_id) for job_id in job_ids]
+            else:
+                results = list(executor.map(_run_job_in_thread, job_ids))
+            processed += sum(result is not None for result in results)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+
+def process_post_image(post):
+    """Обрабатывает изображение сразу или через очередь."""
+    if settings.IMAGE_PROCESSING_ASYNC:
+        return enqueue_image_job(post)
+    return update_variants(post)
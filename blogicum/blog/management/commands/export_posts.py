@@ -0,0 +1,61 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand
+
+from blog.export import export_posts_ndjson, get_export_queryset
+
+
+class Command(BaseCommand):
+    help = 'Выгружает публикации с комментариями в формате NDJSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            default='-',
+            help='Файл для выгрузки; по умолчанию стандартный вывод.',
+        )
+        parser.add_argument(
+            '--since',
+            type=date.fromisoformat,
+            help='Дата публикации не раньше, ГГГГ-ММ-ДД.',
+        )
+        parser.add_argument(
+            '--until',
+            type=date.fromisoformat,
+            help='Дата публикации не позже, ГГГГ-ММ-ДД.',
+        )
+        parser.add_argument('--category', help='Slug категории.')
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Выгрузить и неопубликованные публикации.',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=1000,
+            help='Количество публикаций, читаемых из базы за раз.',
+        )
+
+    def handle(self, *args, **options):
+        posts = get_export_queryset(
+            since=options['since'],
+            until=options['until'],
+            category=options['category'],
+            only_published=not options['all'],
+        )
+        lines = export_posts_ndjson(
+            posts, chunk_size=max(options['chunk_size'], 1)
+        )
+        if options['output'] == '-':
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        exported = 0
+        with open(options['output'], 'w', encoding='utf-8') as output:
+            for line in lines:
+                output.write(line)
+                exported += 1
+        self.stdout.write(
+            self.style.SUCCESS(f'Выгружено публикаций: {exported}')
+        )
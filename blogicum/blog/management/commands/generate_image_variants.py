@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from blog.images import update_variants
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Создаёт уменьшенные копии изображений публикаций.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Пересоздать копии даже для уже обработанных изображений.',
+        )
+
+    def handle(self, *args, **options):
+        updated = 0
+        posts = Post.objects.exclude(image='').only('image', 'image_variants')
+        for post in posts.iterator():
+            if options['force']:
+                post.image_variants = {}
+            if update_variants(post):
+                updated += 1
+        self.stdout.write(
+            self.style.SUCCESS(f'Обработано изображений: {updated}')
+        )
@@ -0,0 +1,35 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from blog.jobs import run_worker
+
+
+class Command(BaseCommand):
+    help = 'Запускает обработчик очереди изображений публикаций.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=settings.IMAGE_WORKER_CONCURRENCY,
+            help='Количество одновременно обрабатываемых задач.',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Обработать готовые задачи и завершиться.',
+        )
+        parser.add_argument(
+            '--poll-interval',
+            type=float,
+            default=1.0,
+            help='Пауза между проверками пустой очереди, в секундах.',
+        )
+
+    def handle(self, *args, **options):
+        processed = run_worker(
+            concurrency=max(options['concurrency'], 1),
+            once=options['once'],
+            poll_interval=options['poll_interval'],
+        )
+        self.stdout.write(self.style.SUCCESS(f'Обработано задач: {processed}'))
@@ -0,0 +1,77 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError
+
+from blog.search import search_index_suspended
+from blog.seeding import Progress, bulk_load_pragmas, generate, import_fixture
+
+
+class Command(BaseCommand):
+    help = (
+        'Быстро заполняет базу пользователями, категориями, '
+        'местоположениями, публикациями и комментариями.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--categories', type=int, default=20)
+        parser.add_argument('--locations', type=int, default=50)
+        parser.add_argument('--posts', type=int, default=10_000)
+        parser.add_argument('--comments', type=int, default=100_000)
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Зерно генератора: одинаковое зерно даёт одинаковые данные.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Количество строк в одной транзакции.',
+        )
+        parser.add_argument(
+            '--fixture',
+            help='Загрузить данные из JSON в формате dumpdata вместо '
+            'генерации. Первичные ключи берутся из файла, поэтому '
+            'загружать стоит в пустую базу.',
+        )
+
+    def report(self, label, done, total, rate):
+        if self.verbosity >= 1:
+            rate = f'{rate:,.0f}'.replace(',', ' ')
+            self.stdout.write(f'{label}: {done}/{total} ({rate} строк/с)')
+
+    def handle(self, *args, **options):
+        self.verbosity = options['verbosity']
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError('Размер пакета должен быть положительным.')
+        progress = Progress(self.report)
+        with bulk_load_pragmas(), search_index_suspended():
+            if options['fixture']:
+                try:
+                    import_fixture(options['fixture'], batch_size, progress)
+                except IntegrityError as error:
+                    raise CommandError(
+                        f'Данные из файла конфликтуют с базой: {error}'
+                    )
+            else:
+                try:
+                    generate(
+                        users=options['users'],
+                        categories=options['categories'],
+                        locations=options['locations'],
+                        posts=options['posts'],
+                        comments=options['comments'],
+                        seed=options['seed'],
+                        batch_size=batch_size,
+                        progress=progress,
+                    )
+                except ValueError as error:
+                    raise CommandError(error)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'Загружено строк: {progress.rows} за '
+                f'{progress.elapsed:.1f} с'
+            )
+        )
@@ -0,0 +1,53 @@
+import base64
+import hashlib
+from pathlib import Path
+from urllib.request import urlopen
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django_bootstrap5.core import get_bootstrap_setting
+
+from blog.staticfiles import BOOTSTRAP_CSS
+
+
+def check_integrity(content, integrity):
+    algorithm, expected = integrity.split('-', 1)
+    digest = hashlib.new(algorithm, content).digest()
+    return base64.b64encode(digest).decode() == expected
+
+
+class Command(BaseCommand):
+    help = (
+        'Скачивает CSS Bootstrap из настроек django_bootstrap5 в статику '
+        'проекта, чтобы collectstatic отдавал его вместе с остальными '
+        'файлами.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Скачать заново, даже если файл уже есть.',
+        )
+
+    def handle(self, *args, **options):
+        target = Path(settings.STATICFILES_DIRS[0]) / BOOTSTRAP_CSS
+        if target.exists() and not options['force']:
+            self.stdout.write(f'Bootstrap уже скачан: {target}')
+            return
+        source = get_bootstrap_setting('css_url')
+        try:
+            with urlopen(source['url'], timeout=30) as response:
+                content = response.read()
+        except OSError as error:
+            raise CommandError(
+                f'Не удалось скачать {source["url"]}: {error}'
+            )
+        integrity = source.get('integrity')
+        if integrity and not check_integrity(content, integrity):
+            raise CommandError(
+                f'Хеш {source["url"]} не совпадает с {integrity}.'
+            )
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(content)
+        self.stdout.write(self.style.SUCCESS(f'Bootstrap сохранён: {target}'))
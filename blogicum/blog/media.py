@@ -0,0 +1,185 @@
+import mimetypes
+import os
+import re
+import stat
+from urllib.parse import quote
+
+from django.conf import settings
+from django.db.models import Q
+from django.http import FileResponse, HttpResponse, StreamingHttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_etags
+
+from .caching import get_file_validators
+from .models import Post
+
+MEDIA_SERVE_MODES = ('django', 'x-accel-redirect', 'x-sendfile')
+# Уменьшенные копии фото: post_images/photo_640w.webp для
+# post_images/photo.jpg (см. images.variant_name).
+VARIANT_NAME = re.compile(r'^(?P<source>.+)_\d+w\.[^./]+$')
+BYTE_RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+def get_image_posts(name):
+    """
+    Публикации, фото которых может храниться в файле name: оригинал
+    или уменьшенная копия. Для копии подходит любой оригинал
+    source.<расширение>; диапазон вместо startswith, чтобы запрос шёл
+    по индексу на image.
+    """
+    condition = Q(image=name)
+    match = VARIANT_NAME.match(name)
+    if match:
+        source = match['source']
+        condition |= Q(image__gte=source + '.', image__lt=source + '/')
+    return Post.objects.filter(condition).only(
+        'image', 'image_variants', 'author_id'
+    )
+
+
+def owns_file(post, name):
+    if post.image.name == name:
+        return True
+    variants = (post.image_variants or {}).get('variants', ())
+    return any(
+        name in (variant['fallback'], variant['webp'])
+        for variant in variants
+    )
+
+
+def get_cache_control(request, name):
+    """
+    Cache-Control для файла, который request может видеть, иначе None.
+    Фото опубликованных постов видны всем и кешируются общими кешами
+    на MEDIA_CACHE_MAX_AGE: после снятия с публикации фото пропадёт из
+    них не позже этого срока. Фото скрытых постов видит только автор,
+    и браузер перепроверяет их при каждом показе.
+    """
+    posts = get_image_posts(name)
+    if any(owns_file(post, name) for post in posts.published()):
+        return f'public, max-age={settings.MEDIA_CACHE_MAX_AGE}'
+    user = request.user
+    if user.is_authenticated and any(
+        owns_file(post, name) for post in posts.filter(author=user)
+    ):
+        return 'private, no-cache'
+    return None
+
+
+def get_content_type(name):
+    return mimetypes.guess_type(name)[0] or 'application/octet-stream'
+
+
+def parse_range(header, size):
+    """
+    (начало, конец) из заголовка Range с одним диапазоном байтов.
+    None — заголовка нет или диапазонов несколько, тогда отдаётся
+    весь файл. ValueError — диапазон за пределами файла.
+    """
+    match = BYTE_RANGE.match(header or '')
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first:
+        if not last:
+            return None
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    if start > end:
+        raise ValueError
+    return start, end
+
+
+def read_range(file, start, length, block_size=FileResponse.block_size):
+    with file:
+        file.seek(start)
+        while length > 0:
+            chunk = file.read(min(block_size, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
+
+
+def ranged_response(request, path, file_stat, etag, content_type):
+    if_range = request.headers.get('If-Range')
+    try:
+        byte_range = (
+            parse_range(request.headers.get('Range'), file_stat.st_size)
+            if if_range is None or parse_etags(if_range) == [etag]
+            else None
+        )
+    except ValueError:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{file_stat.st_size}'
+        return response
+    if byte_range is None:
+        return FileResponse(open(path, 'rb'), content_type=content_type)
+    start, end = byte_range
+    response = StreamingHttpResponse(
+        read_range(open(path, 'rb'), start, end - start + 1),
+        status=206,
+        content_type=content_type,
+    )
+    response['Content-Length'] = end - start + 1
+    response['Content-Range'] = f'bytes {start}-{end}/{file_stat.st_size}'
+    return response
+
+
+def file_response(request, name, path):
+    """
+    Отдаёт файл из процесса с ETag, Last-Modified и поддержкой Range.
+    Целиком файл уходит через FileResponse, поэтому WSGI-сервер может
+    передать его через sendfile().
+    """
+    try:
+        file_stat = os.stat(path)
+    except OSError:
+        return None
+    if not stat.S_ISREG(file_stat.st_mode):
+        return None
+    etag, last_modified = get_file_validators(file_stat)
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    ) or ranged_response(
+        request, path, file_stat, etag, get_content_type(name)
+    )
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+def offload_response(name, path):
+    """
+    Пустой ответ, по которому файл отдаёт стоящий перед приложением
+    веб-сервер: процесс освобождается сразу после проверки доступа.
+    """
+    response = HttpResponse(content_type=get_content_type(name))
+    if settings.MEDIA_SERVE_MODE == 'x-accel-redirect':
+        response['X-Accel-Redirect'] = quote(
+            settings.MEDIA_ACCEL_REDIRECT_URL + name
+        )
+    else:
+        response['X-Sendfile'] = path
+    return response
+
+
+def serve_media(request, name, path):
+    """
+    Ответ на запрос медиафайла name, лежащего по пути path, или None,
+    если файла нет или он скрыт от пользователя.
+    """
+    cache_control = get_cache_control(request, name)
+    if cache_control is None:
+        return None
+    if settings.MEDIA_SERVE_MODE == 'django':
+        response = file_response(request, name, path)
+        if response is None:
+            return None
+    else:
+        response = offload_response(name, path)
+    response['Cache-Control'] = cache_control
+    return response
@@ -0,0 +1,114 @@
+from bisect import bisect_left
+from collections import defaultdict
+from threading import Lock
+
+TIME_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+
+
+class Histogram:
+    """Гистограмма в духе Prometheus: счётчики по верхним границам."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip((*self.buckets, '+Inf'), self.counts):
+            total += count
+            yield bound, total
+
+
+class HistogramFamily:
+    def __init__(self, name, description, buckets):
+        self.name = name
+        self.description = description
+        self.buckets = buckets
+        self.by_view = defaultdict(lambda: Histogram(self.buckets))
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._lock = Lock()
+        self.families = {
+            family.name: family
+            for family in (
+                HistogramFamily(
+                    'blog_request_duration_seconds',
+                    'Время обработки запроса.',
+                    TIME_BUCKETS,
+                ),
+                HistogramFamily(
+                    'blog_sql_queries',
+                    'Количество SQL-запросов за запрос.',
+                    COUNT_BUCKETS,
+                ),
+                HistogramFamily(
+                    'blog_sql_duration_seconds',
+                    'Суммарное время SQL-запросов за запрос.',
+                    TIME_BUCKETS,
+                ),
+                HistogramFamily(
+                    'blog_template_render_seconds',
+                    'Время отрисовки шаблона ответа.',
+                    TIME_BUCKETS,
+                ),
+            )
+        }
+
+    def observe(self, view, **values):
+        with self._lock:
+            for name, value in values.items():
+                self.families[name].by_view[view].observe(value)
+
+    def reset(self):
+        with self._lock:
+            for family in self.families.values():
+                family.by_view.clear()
+
+    def render(self, counters=()):
+        """Возвращает метрики в текстовом формате Prometheus."""
+        lines = []
+        with self._lock:
+            for family in self.families.values():
+                lines.append(f'# HELP {family.name} {family.description}')
+                lines.append(f'# TYPE {family.name} histogram')
+                for view, histogram in sorted(family.by_view.items()):
+                    label = _escape(view)
+                    for bound, total in histogram.cumulative():
+                        lines.append(
+                            f'{family.name}_bucket'
+                            f'{{view="{label}",le="{bound}"}} {total}'
+                        )
+                    lines.append(
+                        f'{family.name}_sum{{view="{label}"}} '
+                        f'{histogram.sum}'
+                    )
+                    lines.append(
+                        f'{family.name}_count{{view="{label}"}} '
+                        f'{histogram.count}'
+                    )
+        for name, description, value in counters:
+            lines.append(f'# HELP {name} {description}')
+            lines.append(f'# TYPE {name} counter')
+            lines.append(f'{name} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value):
+    return (
+        value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    )
+
+
+registry = MetricsRegistry()
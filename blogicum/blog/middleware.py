@@ -0,0 +1,279 @@
+import asyncio
+import mimetypes
+import os
+import random
+import stat
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+from .caching import get_file_validators
+from .metrics import registry
+from .routers import RoutingState, routing_state
+from .staticfiles import is_hashed_name
+
+
+def accepts_encoding(header, encoding):
+    """
+    Принимает ли клиент кодировку encoding по заголовку Accept-Encoding.
+    Кодировка с q=0 запрещена, даже если разрешена через *.
+    """
+    weights = {}
+    for item in header.split(','):
+        coding, *params = item.split(';')
+        weight = 1.0
+        for param in params:
+            name, _, value = param.strip().partition('=')
+            if name.lower() == 'q':
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[coding.strip().lower()] = weight
+    weight = weights.get(encoding, weights.get('*', 0.0))
+    return weight > 0
+
+
+class QueryTimer:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+# Счётчик SQL-запросов текущего запроса. Контекст копируется в потоки
+# sync_to_async, поэтому запросы синхронных представлений под ASGI
+# попадают в тот же счётчик.
+query_timer = ContextVar('query_timer', default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    timer = query_timer.get()
+    if timer is None:
+        return execute(sql, params, many, context)
+    return timer(execute, sql, params, many, context)
+
+
+def install_query_timer(sender, connection, **kwargs):
+    """
+    Обработчик connection_created: подключает учёт запросов к каждому
+    соединению, в каком бы потоке оно ни открылось. Обёртка ставится
+    первой, чтобы не мешать execute_wrapper(), который снимает
+    последнюю.
+    """
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, record_query)
+
+
+class AsyncCapableMiddleware:
+    """
+    Основа для middleware, которое работает и в WSGI, и в ASGI без
+    перехода между потоками: в асинхронной цепочке __call__ возвращает
+    корутину __acall__.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+
+class MetricsMiddleware(AsyncCapableMiddleware):
+    """
+    Собирает по каждому представлению время ответа, число и время
+    SQL-запросов и время отрисовки шаблона.
+    """
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        start, token = self.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            query_timer.reset(token)
+        self.finish(request, start)
+        return response
+
+    async def __acall__(self, request):
+        start, token = self.start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            query_timer.reset(token)
+        self.finish(request, start)
+        return response
+
+    def start(self, request):
+        request._render_time = 0.0
+        request._query_timer = QueryTimer()
+        return time.perf_counter(), query_timer.set(request._query_timer)
+
+    def finish(self, request, start):
+        duration = time.perf_counter() - start
+        match = request.resolver_match
+        registry.observe(
+            match.view_name if match else 'unresolved',
+            blog_request_duration_seconds=duration,
+            blog_sql_queries=request._query_timer.count,
+            blog_sql_duration_seconds=request._query_timer.duration,
+            blog_template_render_seconds=request._render_time,
+        )
+
+    def process_template_response(self, request, response):
+        start = time.perf_counter()
+
+        def render_finished(response):
+            request._render_time = time.perf_counter() - start
+
+        response.add_post_render_callback(render_finished)
+        return response
+
+
+class ReplicaRoutingMiddleware(AsyncCapableMiddleware):
+    """
+    Заводит состояние маршрутизации для ReplicaRouter на время запроса.
+    Изменяющие запросы и запросы с кукой закрепления читают с основной
+    базы, остальные — с одной случайной реплики на весь запрос; если во
+    время запроса была запись, кука ставится заново.
+    """
+
+    safe_methods = ('GET', 'HEAD', 'OPTIONS')
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        state, token = self.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            routing_state.reset(token)
+        return self.finish(response, state)
+
+    async def __acall__(self, request):
+        state, token = self.start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            routing_state.reset(token)
+        return self.finish(response, state)
+
+    def start(self, request):
+        state = RoutingState(
+            pinned=(
+                request.method not in self.safe_methods
+                or settings.REPLICA_PIN_COOKIE in request.COOKIES
+            )
+        )
+        if not state.pinned and settings.DATABASE_REPLICAS:
+            state.replica = random.choice(settings.DATABASE_REPLICAS)
+        return state, routing_state.set(state)
+
+    def finish(self, response, state):
+        if state.wrote:
+            response.set_cookie(
+                settings.REPLICA_PIN_COOKIE,
+                '1',
+                max_age=settings.REPLICA_PIN_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
+
+
+class StaticFilesMiddleware(AsyncCapableMiddleware):
+    """
+    Отдаёт собранную collectstatic статику из STATIC_ROOT раньше
+    остальной цепочки middleware.
+
+    Файлы с хешем содержимого в имени браузер кеширует на
+    STATIC_MAX_AGE без перепроверки (immutable): новая версия файла
+    получает новое имя. Остальные файлы перепроверяются по ETag и
+    Last-Modified. Клиентам с поддержкой gzip отдаются заранее сжатые
+    копии. Файлы, которых нет в STATIC_ROOT, передаются дальше.
+    """
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        return self.serve(request) or self.get_response(request)
+
+    async def __acall__(self, request):
+        return self.serve(request) or await self.get_response(request)
+
+    def find_file(self, request):
+        """
+        Путь к файлу в STATIC_ROOT для запроса, его кодировка и stat.
+        None — запрос не к собранной статике.
+        """
+        if (
+            not settings.STATIC_ROOT
+            or request.method not in ('GET', 'HEAD')
+            or not request.path.startswith(settings.STATIC_URL)
+        ):
+            return None
+        try:
+            path = safe_join(
+                settings.STATIC_ROOT, request.path[len(settings.STATIC_URL):]
+            )
+        except SuspiciousFileOperation:
+            return None
+        candidates = [(path, None)]
+        accept_encoding = request.headers.get('Accept-Encoding', '')
+        if accepts_encoding(accept_encoding, 'gzip'):
+            candidates.insert(0, (path + '.gz', 'gzip'))
+        for filename, encoding in candidates:
+            try:
+                file_stat = os.stat(filename)
+            except OSError:
+                continue
+            if stat.S_ISREG(file_stat.st_mode):
+                return filename, encoding, file_stat
+        return None
+
+    def serve(self, request):
+        found = self.find_file(request)
+        if found is None:
+            return None
+        filename, encoding, file_stat = found
+        name = request.path[len(settings.STATIC_URL):]
+        etag, last_modified = get_file_validators(file_stat, encoding)
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = FileResponse(
+                open(filename, 'rb'),
+                filename=os.path.basename(name),
+                content_type=(
+                    mimetypes.guess_type(name)[0]
+                    or 'application/octet-stream'
+                ),
+            )
+            if encoding:
+                response['Content-Encoding'] = encoding
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(last_modified)
+        response['Cache-Control'] = (
+            f'public, max-age={settings.STATIC_MAX_AGE}, immutable'
+            if is_hashed_name(name)
+            else 'no-cache'
+        )
+        patch_vary_headers(response, ('Accept-Encoding',))
+        return response
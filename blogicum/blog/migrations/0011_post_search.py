@@ -0,0 +1,76 @@
+from django.db import migrations
+
+SQLITE_FORWARD = (
+    "CREATE VIRTUAL TABLE blog_post_fts USING fts5("
+    "title, text, content='blog_post', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER blog_post_fts_insert AFTER INSERT ON blog_post BEGIN "
+    "INSERT INTO blog_post_fts(rowid, title, text) "
+    "VALUES (new.id, new.title, new.text); END",
+    "CREATE TRIGGER blog_post_fts_delete AFTER DELETE ON blog_post BEGIN "
+    "INSERT INTO blog_post_fts(blog_post_fts, rowid, title, text) "
+    "VALUES ('delete', old.id, old.title, old.text); END",
+    "CREATE TRIGGER blog_post_fts_update AFTER UPDATE OF title, text "
+    "ON blog_post BEGIN "
+    "INSERT INTO blog_post_fts(blog_post_fts, rowid, title, text) "
+    "VALUES ('delete', old.id, old.title, old.text); "
+    "INSERT INTO blog_post_fts(rowid, title, text) "
+    "VALUES (new.id, new.title, new.text); END",
+    "INSERT INTO blog_post_fts(blog_post_fts) VALUES ('rebuild')",
+)
+SQLITE_BACKWARD = (
+    'DROP TRIGGER IF EXISTS blog_post_fts_update',
+    'DROP TRIGGER IF EXISTS blog_post_fts_delete',
+    'DROP TRIGGER IF EXISTS blog_post_fts_insert',
+    'DROP TABLE IF EXISTS blog_post_fts',
+)
+POSTGRESQL_FORWARD = (
+    "ALTER TABLE blog_post ADD COLUMN search_vector tsvector "
+    "GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('russian', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('russian', coalesce(text, '')), 'B')"
+    ") STORED",
+    'CREATE INDEX blog_post_search_idx ON blog_post '
+    'USING GIN (search_vector)',
+)
+POSTGRESQL_BACKWARD = (
+    'DROP INDEX IF EXISTS blog_post_search_idx',
+    'ALTER TABLE blog_post DROP COLUMN IF EXISTS search_vector',
+)
+
+
+def run_for_vendor(statements):
+    def run(apps, schema_editor):
+        for sql in statements.get(schema_editor.connection.vendor, ()):
+            schema_editor.execute(sql)
+
+    return run
+
+
+class Migration(migrations.Migration):
+    """
+    Полнотекстовый индекс публикаций: FTS5 с триггерами в SQLite
+    и вычисляемый tsvector с GIN-индексом в PostgreSQL. На других
+    СУБД миграция ничего не делает.
+    """
+
+    dependencies = [
+        ('blog', '0010_imagejob'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run_for_vendor(
+                {
+                    'sqlite': SQLITE_FORWARD,
+                    'postgresql': POSTGRESQL_FORWARD,
+                }
+            ),
+            run_for_vendor(
+                {
+                    'sqlite': SQLITE_BACKWARD,
+                    'postgresql': POSTGRESQL_BACKWARD,
+                }
+            ),
+        ),
+    ]
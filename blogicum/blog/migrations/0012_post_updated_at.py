@@ -0,0 +1,43 @@
+from django.db import migrations, models
+from django.db.models import F, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+import django.utils.timezone
+
+
+def fill_updated_at(apps, schema_editor):
+    Comment = apps.get_model('blog', 'Comment')
+    Post = apps.get_model('blog', 'Post')
+    Post.objects.using(schema_editor.connection.alias).update(
+        updated_at=Greatest(
+            F('created_at'),
+            Coalesce(
+                Subquery(
+                    Comment.objects.filter(post=OuterRef('pk'))
+                    .order_by()
+                    .values('post')
+                    .annotate(latest=Max('created_at'))
+                    .values('latest')
+                ),
+                F('created_at'),
+            ),
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_post_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, help_text='Время последнего изменения публикации или комментариев.', verbose_name='Изменено'),
+            preserve_default=False,
+        ),
+        migrations.RunPython(
+            fill_updated_at, migrations.RunPython.noop
+        ),
+    ]
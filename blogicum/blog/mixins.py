@@ -1,25 +1,80 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from hashlib import md5
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import close_old_connections
+from django.db.models import Max, Q
+from django.http import Http404, HttpResponse
 from django.shortcuts import get_object_or_404, redirect
+from django.template.response import SimpleTemplateResponse
 from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
 
+from .caching import (
+    get_versions,
+    page_cache_key,
+    record_page_cache_access,
+    version_timestamp,
+)
 from .forms import CommentForm
-from .models import Comment, Post
+from .models import Comment, Post, get_publication_cutoff
+from .paginators import (
+    CursorPaginator,
+    EstimatedCountPaginator,
+    InvalidCursor,
+)
+from .queryset_utilities import get_posts
+from .routers import routing_state
 
 
 class PostUpdateDeleteMixin:
     model = Post
     pk_url_kwarg = 'post_id'
+    post_object = None
 
     def dispatch(self, request, *args, **kwargs):
-        post = get_object_or_404(Post, pk=self.kwargs[self.pk_url_kwarg])
-        if post.author != request.user:
+        self.post_object = get_object_or_404(
+            Post, pk=self.kwargs[self.pk_url_kwarg]
+        )
+        if self.post_object.author_id != request.user.id:
             return redirect(
                 reverse(
                     'blog:post_detail',
-                    kwargs={'post_id': post.id},
+                    kwargs={'post_id': self.post_object.id},
                 )
             )
         return super().dispatch(request, *args, **kwargs)
 
+    def get_object(self, queryset=None):
+        return self.post_object
+
+
+class VisiblePostMixin:
+    def get_visible_post(self):
+        post = get_object_or_404(get_posts(), pk=self.kwargs['post_id'])
+        if self.request.user != post.author and (
+            not post.is_published
+            or not post.category.is_published
+            or post.pub_date > get_publication_cutoff()
+        ):
+            raise Http404
+        return post
+
+    def get_comments_page(self, post):
+        paginator = CursorPaginator(
+            post.comments.select_related('author'),
+            settings.COMMENTS_PAGINATE_BY,
+            ordering=('created_at', 'id'),
+        )
+        try:
+            return paginator.page(self.request.GET.get('cursor'))
+        except InvalidCursor as e:
+            raise Http404(str(e))
+
 
 class CommentMixin:
     model = Comment
@@ -42,3 +97,250 @@ class ProfileRedirectMixin:
         return reverse(
             'blog:profile', kwargs={'username': self.request.user.username}
         )
+
+
+class CursorPaginationMixin:
+    cursor_kwarg = 'cursor'
+    cursor_ordering = ('-pub_date', '-id')
+
+    def paginate_queryset(self, queryset, page_size):
+        if not settings.CURSOR_PAGINATION:
+            return super().paginate_queryset(queryset, page_size)
+        paginator = CursorPaginator(
+            queryset, page_size, ordering=self.cursor_ordering
+        )
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidCursor as e:
+            raise Http404(str(e))
+        return (paginator, page, page.object_list, page.has_other_pages())
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['cursor_pagination'] = settings.CURSOR_PAGINATION
+        return context
+
+
+class EstimatedCountMixin:
+    """
+    Подключает EstimatedCountPaginator: число объектов кешируется по
+    ключу ленты и сбрасывается вместе с её метками кеша.
+    """
+
+    paginator_class = EstimatedCountPaginator
+
+    def get_cache_tags(self):
+        return ()
+
+    def get_count_scope(self):
+        return ':'.join(self.get_cache_tags())
+
+    def get_paginator(self, queryset, per_page, **kwargs):
+        return super().get_paginator(
+            queryset,
+            per_page,
+            count_scope=self.get_count_scope(),
+            count_tags=self.get_cache_tags(),
+            **kwargs,
+        )
+
+
+class ReplicaReadMixin:
+    """
+    Разрешает читать данные страницы с реплик. Флаг действует до конца
+    запроса, чтобы и отложенная отрисовка шаблона читала с реплики.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        state = routing_state.get()
+        if state is not None:
+            state.replica_reads = True
+        return super().dispatch(request, *args, **kwargs)
+
+
+class AnonymousPageCacheMixin:
+    """Кеширует страницы целиком для анонимных пользователей."""
+
+    def get_cache_tags(self):
+        return ()
+
+    def dispatch(self, request, *args, **kwargs):
+        if (
+            not settings.ANONYMOUS_PAGE_CACHE
+            or request.method not in ('GET', 'HEAD')
+            or request.user.is_authenticated
+        ):
+            return super().dispatch(request, *args, **kwargs)
+
+        key = page_cache_key(request, self.get_cache_tags())
+        cached = cache.get(key)
+        record_page_cache_access(hit=cached is not None)
+        if cached is not None:
+            content, content_type = cached
+            response = HttpResponse(content, content_type=content_type)
+            response['X-Page-Cache'] = 'hit'
+            return response
+
+        response = super().dispatch(request, *args, **kwargs)
+        if hasattr(response, 'render'):
+            response.render()
+        if response.status_code == 200 and not response.cookies:
+            cache.set(
+                key,
+                (response.content, response['Content-Type']),
+                settings.ANONYMOUS_PAGE_CACHE_TIMEOUT,
+            )
+        response['X-Page-Cache'] = 'miss'
+        return response
+
+
+class ConditionalGetMixin:
+    """
+    Отвечает 304 на условные GET-запросы к неизменившейся странице.
+    Валидаторы собираются из версий в кеше, которые сбрасываются
+    сигналами, и времени изменения данных из одного лёгкого запроса,
+    без выполнения запроса самой страницы. ETag учитывает пользователя
+    и его CSRF-куку; Last-Modified пользователей не различает, поэтому
+    отдаётся и проверяется только для анонимов.
+    """
+
+    def get_cache_tags(self):
+        return ()
+
+    def get_validator_versions(self):
+        return [('tag', tag) for tag in ('all', *self.get_cache_tags())]
+
+    def get_last_modified_candidates(self):
+        return ()
+
+    def get_viewer_key(self):
+        user = self.request.user
+        if not user.is_authenticated:
+            return 'anonymous'
+        return '{}:{}'.format(
+            user.pk, self.request.COOKIES.get(settings.CSRF_COOKIE_NAME, '')
+        )
+
+    def get_validators(self):
+        versions = get_versions(*self.get_validator_versions())
+        times = [
+            moment
+            for moment in self.get_last_modified_candidates()
+            if moment is not None
+        ]
+        etag = quote_etag(
+            md5(
+                ':'.join(
+                    (
+                        *versions,
+                        *(moment.isoformat() for moment in times),
+                        self.request.get_full_path(),
+                        self.get_viewer_key(),
+                    )
+                ).encode()
+            ).hexdigest()
+        )
+        last_modified = int(
+            max(
+                [
+                    *(version_timestamp(version) for version in versions),
+                    *(moment.timestamp() for moment in times),
+                ]
+            )
+        )
+        return etag, last_modified
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return super().dispatch(request, *args, **kwargs)
+        etag, last_modified = self.get_validators()
+        if request.user.is_authenticated:
+            last_modified = None
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = super().dispatch(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+        response['ETag'] = etag
+        if last_modified is not None:
+            response['Last-Modified'] = http_date(last_modified)
+        patch_vary_headers(response, ('Cookie',))
+        return response
+
+
+class PostListConditionalGetMixin(ConditionalGetMixin):
+    def get_last_modified_candidates(self):
+        """
+        Самая поздняя дата публикации и самая поздняя правка постов
+        списка одним запросом. updated_at сдвигается при любой записи
+        поста в базу, поэтому правка меняет валидаторы и в тех
+        процессах, кеш которых о ней не знает.
+        """
+        latest = self.get_queryset().aggregate(
+            published=Max(
+                'pub_date', filter=Q(pub_date__lte=get_publication_cutoff())
+            ),
+            updated=Max('updated_at'),
+        )
+        return latest['published'], latest['updated']
+
+
+_view_executor = None
+
+
+def _get_view_executor():
+    global _view_executor
+    if _view_executor is None:
+        _view_executor = ThreadPoolExecutor(
+            max_workers=settings.ASYNC_VIEW_THREADS,
+            thread_name_prefix='blog-views',
+        )
+    return _view_executor
+
+
+def _run_view_in_thread(view, request, *args, **kwargs):
+    try:
+        response = view(request, *args, **kwargs)
+        if not isinstance(response, SimpleTemplateResponse):
+            return response
+        start = time.perf_counter()
+        response.render()
+        request._render_time = time.perf_counter() - start
+    finally:
+        close_old_connections()
+    rendered = HttpResponse(
+        response.content,
+        status=response.status_code,
+        headers=response.headers,
+    )
+    rendered.cookies = response.cookies
+    return rendered
+
+
+class AsyncViewMixin:
+    """
+    Асинхронный вариант представления для ASGI.
+    ORM в Django 3.2 синхронный, поэтому запросы к базе и отрисовка
+    шаблона выполняются одним вызовом в пуле из ASYNC_VIEW_THREADS
+    потоков, а не в общем потоке, где ASGI-обработчик выполняет
+    синхронные представления по очереди. Ответ возвращается уже
+    отрисованным, чтобы обработчику не пришлось возвращаться в тот
+    поток ради отрисовки.
+    """
+
+    @classmethod
+    def as_async_view(cls, **initkwargs):
+        view = cls.as_view(**initkwargs)
+
+        async def async_view(request, *args, **kwargs):
+            return await sync_to_async(
+                _run_view_in_thread,
+                thread_sensitive=False,
+                executor=_get_view_executor(),
+            )(view, request, *args, **kwargs)
+
+        async_view.view_class = cls
+        async_view.view_initkwargs = initkwargs
+        return async_view
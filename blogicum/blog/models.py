@@ -1,6 +1,10 @@
+from datetime import datetime
+
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.db import models
 from django.urls import reverse
+from django.utils import timezone
 
 User = get_user_model()
 
@@ -67,6 +71,31 @@ class Location(PublishedCreatedModel):
         return self.name[:STR_LENGTH_LIMIT] + '...'
 
 
+def get_publication_cutoff(now=None):
+    """
+    Граница отложенных публикаций.
+    Время округляется вниз до PUBLISHED_CUTOFF_GRANULARITY секунд, чтобы
+    запросы ленты в пределах одного окна совпадали и могли кешироваться.
+    """
+    now = now or timezone.now()
+    granularity = settings.PUBLISHED_CUTOFF_GRANULARITY
+    if granularity <= 1:
+        return now
+    timestamp = now.timestamp()
+    return datetime.fromtimestamp(
+        timestamp - timestamp % granularity, tz=now.tzinfo
+    )
+
+
+class PostQuerySet(models.QuerySet):
+    def published(self, now=None):
+        return self.filter(
+            pub_date__lte=get_publication_cutoff(now),
+            is_published=True,
+            category__is_published=True,
+        )
+
+
 class Post(PublishedCreatedModel):
     """Модель публикации."""
 
@@ -102,12 +131,50 @@ class Post(PublishedCreatedModel):
     image = models.ImageField(
         verbose_name='Фото', blank=True, upload_to='post_images'
     )
+    image_variants = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name='Уменьшенные копии фото',
+    )
+    comment_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='Количество комментариев',
+    )
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Изменено',
+        help_text='Время последнего изменения публикации или комментариев.',
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         default_related_name = 'posts'
         ordering = ('-pub_date',)
+        indexes = (
+            models.Index(
+                fields=('is_published', 'pub_date'),
+                name='post_published_pub_date_idx',
+            ),
+            models.Index(
+                fields=('pub_date',),
+                condition=models.Q(is_published=True),
+                name='post_published_feed_idx',
+            ),
+            models.Index(
+                fields=('author', 'pub_date'),
+                name='post_author_pub_date_idx',
+            ),
+            models.Index(
+                fields=('category', 'pub_date'),
+                name='post_category_pub_date_idx',
+            ),
+            models.Index(fields=('image',), name='post_image_idx'),
+        )
 
     def __str__(self) -> str:
         return self.title[:STR_LENGTH_LIMIT] + '...'
@@ -138,6 +205,71 @@ class Comment(models.Model):
         verbose_name_plural = 'Комментарии'
         default_related_name = 'comments'
         ordering = ('created_at',)
+        indexes = (
+            models.Index(
+                fields=('post', 'created_at'),
+                name='comment_post_created_at_idx',
+            ),
+        )
 
     def __str__(self):
         return self.text[:STR_LENGTH_LIMIT] + '...'
+
+
+class ImageJob(models.Model):
+    """Задача фоновой обработки изображения публикации."""
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (PENDING, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Выполнена'),
+        (FAILED, 'Ошибка'),
+    )
+
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='image_jobs',
+        verbose_name='Публикация',
+    )
+    source = models.CharField(
+        max_length=MAX_STRING_LENGTH, verbose_name='Исходный файл'
+    )
+    status = models.CharField(
+        max_length=16,
+        choices=STATUS_CHOICES,
+        default=PENDING,
+        verbose_name='Статус',
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0, verbose_name='Попытки'
+    )
+    run_after = models.DateTimeField(
+        default=timezone.now, verbose_name='Не раньше'
+    )
+    locked_at = models.DateTimeField(
+        null=True, blank=True, verbose_name='Взята в работу'
+    )
+    last_error = models.TextField(blank=True, verbose_name='Ошибка')
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Добавлено',
+    )
+
+    class Meta:
+        verbose_name = 'обработка изображения'
+        verbose_name_plural = 'Обработка изображений'
+        ordering = ('run_after', 'id')
+        indexes = (
+            models.Index(
+                fields=('status', 'run_after'),
+                name='imagejob_status_run_after_idx',
+            ),
+        )
+
+    def __str__(self):
+        return f'{self.source} ({self.get_status_display()})'
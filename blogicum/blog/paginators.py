@@ -0,0 +1,230 @@
+import base64
+import binascii
+import json
+import time
+from collections.abc import Sequence
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.paginator import InvalidPage, Page, Paginator
+from django.db.models import Q, QuerySet
+from django.utils.functional import cached_property
+
+from .caching import get_versions
+
+COUNT_CACHE_KEY = 'blog:count:{}'
+COUNT_LOCK_KEY = 'blog:count_lock:{}'
+COUNT_LOCK_TIMEOUT = 30
+
+
+class InvalidCursor(InvalidPage):
+    pass
+
+
+class CursorPage(Sequence):
+    """Страница курсорной пагинации без информации об общем числе страниц."""
+
+    def __init__(
+        self, object_list, paginator, next_cursor=None, previous_cursor=None
+    ):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<Cursor page of {len(self.object_list)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """
+    Keyset-пагинатор.
+    Следующая страница выбирается условием по ключу сортировки последнего
+    объекта, поэтому любая страница стоит столько же, сколько первая:
+    без COUNT(*) и без OFFSET.
+    """
+
+    def __init__(self, queryset, per_page, ordering=('-pub_date', '-id')):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = ordering
+        self.fields = [name.lstrip('-') for name in ordering]
+        self.descending = [name.startswith('-') for name in ordering]
+
+    def encode_cursor(self, obj, reverse=False):
+        opts = self.queryset.model._meta
+        position = [
+            opts.get_field(name).value_to_string(obj) for name in self.fields
+        ]
+        payload = json.dumps([position, reverse])
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+    def decode_cursor(self, cursor):
+        try:
+            payload = base64.urlsafe_b64decode(
+                cursor + '=' * (-len(cursor) % 4)
+            )
+            position, reverse = json.loads(payload)
+            if len(position) != len(self.fields):
+                raise ValueError
+            opts = self.queryset.model._meta
+            position = [
+                opts.get_field(name).to_python(value)
+                for name, value in zip(self.fields, position)
+            ]
+        except (
+            binascii.Error,
+            UnicodeDecodeError,
+            ValueError,
+            TypeError,
+            ValidationError,
+        ):
+            raise InvalidCursor('Некорректный курсор')
+        return position, bool(reverse)
+
+    def _keyset_filter(self, position, reverse):
+        condition = Q()
+        for index, name in enumerate(self.fields):
+            after = self.descending[index] != reverse
+            lookup = f'{name}__{"lt" if after else "gt"}'
+            step = Q(**dict(zip(self.fields[:index], position[:index])))
+            condition |= step & Q(**{lookup: position[index]})
+        return condition
+
+    def page(self, cursor=None):
+        qs = self.queryset
+        reverse = False
+        if cursor:
+            position, reverse = self.decode_cursor(cursor)
+            qs = qs.filter(self._keyset_filter(position, reverse))
+        if reverse:
+            ordering = [
+                name[1:] if name.startswith('-') else f'-{name}'
+                for name in self.ordering
+            ]
+        else:
+            ordering = self.ordering
+        objects = list(qs.order_by(*ordering)[:self.per_page + 1])
+        has_more = len(objects) > self.per_page
+        objects = objects[:self.per_page]
+        if reverse:
+            objects.reverse()
+
+        next_cursor = previous_cursor = None
+        if objects:
+            if reverse:
+                next_cursor = self.encode_cursor(objects[-1])
+                if has_more:
+                    previous_cursor = self.encode_cursor(
+                        objects[0], reverse=True
+                    )
+            else:
+                if has_more:
+                    next_cursor = self.encode_cursor(objects[-1])
+                if cursor:
+                    previous_cursor = self.encode_cursor(
+                        objects[0], reverse=True
+                    )
+        return CursorPage(objects, self, next_cursor, previous_cursor)
+
+
+class WindowedPage(Page):
+    def elided_page_range(self):
+        """Номера страниц вокруг текущей и по краям, с пропусками."""
+        return self.paginator.get_elided_page_range(
+            self.number,
+            on_each_side=self.paginator.on_each_side,
+            on_ends=self.paginator.on_ends,
+        )
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Пагинатор для больших лент.
+    Точное число объектов считается, только пока оно не больше
+    PAGINATOR_EXACT_COUNT_LIMIT: такой COUNT ограничен LIMIT и дёшев.
+    Число для больших выборок хранится в кеше под count_scope — ключом
+    ленты, а не текстом SQL, в котором меняется граница публикации.
+    Оно пересчитывается раз в PAGINATOR_COUNT_CACHE_TIMEOUT секунд или
+    после сброса версий меток count_tags. Пересчитывает один процесс,
+    взявший блокировку, остальные пока отдают прежнее число, а если его
+    ещё нет — COUNT с LIMIT. Поэтому номер последней страницы может
+    ненадолго отставать от данных.
+    """
+
+    on_each_side = 2
+    on_ends = 1
+
+    def __init__(self, *args, count_scope=None, count_tags=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.count_scope = count_scope
+        self.count_tags = count_tags
+
+    def _get_page(self, *args, **kwargs):
+        return WindowedPage(*args, **kwargs)
+
+    def get_count_versions(self):
+        return ':'.join(
+            get_versions(
+                *(('tag', tag) for tag in ('all', *self.count_tags))
+            )
+        )
+
+    @cached_property
+    def count(self):
+        if self.count_scope is None or not isinstance(
+            self.object_list, QuerySet
+        ):
+            return super().count
+        key = COUNT_CACHE_KEY.format(self.count_scope)
+        versions = self.get_count_versions()
+        cached = cache.get(key)
+        if cached is not None:
+            cached_versions, count, fresh_until = cached
+            if cached_versions == versions and fresh_until > time.time():
+                return count
+        lock_key = COUNT_LOCK_KEY.format(self.count_scope)
+        if not cache.add(lock_key, True, COUNT_LOCK_TIMEOUT):
+            if cached is not None:
+                return cached[1]
+            return self.limited_count()
+        try:
+            return self.recount(key, versions)
+        finally:
+            cache.delete(lock_key)
+
+    def limited_count(self):
+        """
+        COUNT с LIMIT: точное число, если объектов не больше
+        PAGINATOR_EXACT_COUNT_LIMIT, иначе PAGINATOR_EXACT_COUNT_LIMIT + 1.
+        """
+        limit = settings.PAGINATOR_EXACT_COUNT_LIMIT
+        return self.object_list[:limit + 1].count()
+
+    def recount(self, key, versions):
+        count = self.limited_count()
+        if count <= settings.PAGINATOR_EXACT_COUNT_LIMIT:
+            cache.delete(key)
+            return count
+        count = self.object_list.count()
+        timeout = settings.PAGINATOR_COUNT_CACHE_TIMEOUT
+        # Прежнее число живёт ещё один срок, чтобы его можно было отдать,
+        # пока идёт пересчёт.
+        cache.set(key, (versions, count, time.time() + timeout), timeout * 2)
+        return count
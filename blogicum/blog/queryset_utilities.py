@@ -1,22 +1,45 @@
-from django.db.models import Count
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 
-from .models import Post
+from .models import Comment, Post
 
 
-def get_posts(model=Post.objects, only_published=False, comment_count=False):
+def get_posts(model=Post.objects, only_published=False):
     qs = model.select_related(
         'location',
         'author',
         'category',
     )
     if only_published:
-        qs = qs.filter(
-            pub_date__lte=timezone.now(),
-            is_published=True,
-            category__is_published=True,
-        )
-    if comment_count:
-        qs = qs.annotate(comment_count=Count('comments')).order_by('-pub_date')
+        qs = qs.published()
 
     return qs
+
+
+def comment_count_subquery():
+    return Coalesce(
+        Subquery(
+            Comment.objects.filter(post=OuterRef('pk'))
+            .order_by()
+            .values('post')
+            .annotate(count=Count('pk'))
+            .values('count')
+        ),
+        0,
+    )
+
+
+def recount_comments(posts=Post.objects):
+    return posts.update(comment_count=comment_count_subquery())
+
+
+def change_comment_count(post_id, delta):
+    return Post.objects.filter(pk=post_id).update(
+        comment_count=F('comment_count') + delta, updated_at=timezone.now()
+    )
+
+
+def touch_post(post_id):
+    """Сдвигает время изменения публикации после правки комментария."""
+    return Post.objects.filter(pk=post_id).update(updated_at=timezone.now())
@@ -0,0 +1,60 @@
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional
+
+from django.db import DEFAULT_DB_ALIAS
+
+
+@dataclass
+class RoutingState:
+    """Состояние маршрутизации запросов к базам в рамках одного запроса."""
+
+    pinned: bool = False
+    replica_reads: bool = False
+    wrote: bool = False
+    replica: Optional[str] = None
+
+
+routing_state = ContextVar('routing_state', default=None)
+
+
+class ReplicaRouter:
+    """
+    Отправляет чтение на реплики из DATABASE_REPLICAS, а запись —
+    на основную базу.
+
+    С реплик читают только представления, которые сами разрешили это
+    через ReplicaReadMixin, и весь запрос читает с одной реплики,
+    выбранной ReplicaRoutingMiddleware: реплики могут отставать
+    по-разному, и страница не должна смешивать их снимки. Пользователи
+    и сессии всегда читаются с основной базы.
+
+    Запрос закрепляется за основной базой, если он изменяет данные или
+    недавно изменял их тот же пользователь: после записи
+    ReplicaRoutingMiddleware ставит куку на REPLICA_PIN_SECONDS, чтобы
+    пользователь сразу видел свои изменения, не дожидаясь репликации.
+    """
+
+    app_labels = {'blog'}
+
+    def db_for_read(self, model, **hints):
+        state = routing_state.get()
+        if (
+            state is None
+            or state.pinned
+            or not state.replica_reads
+            or state.replica is None
+            or model._meta.app_label not in self.app_labels
+        ):
+            return DEFAULT_DB_ALIAS
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = routing_state.get()
+        if state is not None:
+            state.pinned = state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики — копии основной базы с той же схемой.
+        return True
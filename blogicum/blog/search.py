@@ -0,0 +1,118 @@
+import re
+from contextlib import contextmanager
+
+from django.db import connections
+from django.db.models import Q
+
+from .models import Post
+
+FTS_TABLE = 'blog_post_fts'
+MAX_SEARCH_TERMS = 8
+TITLE_WEIGHT = 10.0
+TEXT_WEIGHT = 1.0
+
+SQLITE_TRIGGERS = (
+    f'CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert AFTER INSERT '
+    f'ON blog_post BEGIN INSERT INTO {FTS_TABLE}(rowid, title, text) '
+    'VALUES (new.id, new.title, new.text); END',
+    f'CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete AFTER DELETE '
+    f'ON blog_post BEGIN INSERT INTO {FTS_TABLE}'
+    f'({FTS_TABLE}, rowid, title, text) '
+    "VALUES ('delete', old.id, old.title, old.text); END",
+    f'CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update AFTER UPDATE '
+    f'OF title, text ON blog_post BEGIN INSERT INTO {FTS_TABLE}'
+    f'({FTS_TABLE}, rowid, title, text) '
+    "VALUES ('delete', old.id, old.title, old.text); "
+    f'INSERT INTO {FTS_TABLE}(rowid, title, text) '
+    'VALUES (new.id, new.title, new.text); END',
+)
+
+
+def ensure_search_triggers(using='default', **kwargs):
+    """
+    Восстанавливает триггеры FTS5 после миграций.
+    SQLite пересоздаёт таблицу blog_post при изменении её полей
+    и теряет триггеры; строки и их id при этом сохраняются,
+    поэтому перестраивать сам индекс не нужно.
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite':
+        return
+    if FTS_TABLE not in connection.introspection.table_names():
+        return
+    with connection.cursor() as cursor:
+        for sql in SQLITE_TRIGGERS:
+            cursor.execute(sql)
+
+
+@contextmanager
+def search_index_suspended(using='default'):
+    """
+    Отключает триггеры FTS5 на время массовой загрузки и один раз
+    перестраивает индекс после неё: это быстрее, чем обновлять индекс
+    на каждую вставленную строку.
+    """
+    connection = connections[using]
+    if (
+        connection.vendor != 'sqlite'
+        or FTS_TABLE not in connection.introspection.table_names()
+    ):
+        yield
+        return
+    with connection.cursor() as cursor:
+        for name in ('insert', 'delete', 'update'):
+            cursor.execute(f'DROP TRIGGER IF EXISTS {FTS_TABLE}_{name}')
+    try:
+        yield
+    finally:
+        ensure_search_triggers(using)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')"
+            )
+
+
+def get_search_terms(query):
+    return re.findall(r'\w+', query.lower())[:MAX_SEARCH_TERMS]
+
+
+def search_posts(query, posts=Post.objects):
+    """
+    Отбирает из posts публикации, в заголовке или тексте которых есть
+    все слова запроса (в том числе как начало слова), и упорядочивает
+    их по релевантности. В SQLite используется индекс FTS5,
+    в PostgreSQL — GIN-индекс по tsvector, на остальных СУБД —
+    поиск подстроки без ранжирования.
+    """
+    terms = get_search_terms(query)
+    if not terms:
+        return posts.none()
+    table = Post._meta.db_table
+    vendor = connections[posts.db].vendor
+    if vendor == 'sqlite':
+        return posts.extra(
+            tables=[FTS_TABLE],
+            where=[f'{FTS_TABLE}.rowid = {table}.id', f'{FTS_TABLE} MATCH %s'],
+            params=[' '.join(f'"{term}"*' for term in terms)],
+            select={
+                'search_rank': f'-bm25({FTS_TABLE}, '
+                f'{TITLE_WEIGHT}, {TEXT_WEIGHT})'
+            },
+            order_by=['-search_rank', '-pub_date'],
+        )
+    if vendor == 'postgresql':
+        tsquery = ' & '.join(f'{term}:*' for term in terms)
+        return posts.extra(
+            where=[f"{table}.search_vector @@ to_tsquery('russian', %s)"],
+            params=[tsquery],
+            select={
+                'search_rank': f'ts_rank({table}.search_vector, '
+                "to_tsquery('russian', %s))"
+            },
+            select_params=[tsquery],
+            order_by=['-search_rank', '-pub_date'],
+        )
+    condition = Q()
+    for term in terms:
+        condition &= Q(title__icontains=term) | Q(text__icontains=term)
+    return posts.filter(condition).order_by('-pub_date')
@@ -0,0 +1,341 @@
+import random
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX
+from django.core import serializers
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from .models import (
+    MAX_STRING_LENGTH,
+    Category,
+    Comment,
+    Location,
+    Post,
+    User,
+)
+from .queryset_utilities import recount_comments
+
+SQLITE_LOAD_PRAGMAS = {
+    'journal_mode': 'MEMORY',
+    'synchronous': 'OFF',
+    'temp_store': 'MEMORY',
+    'cache_size': -262144,
+}
+IMPORT_ORDER = (User, Category, Location, Post, Comment)
+
+
+@contextmanager
+def bulk_load_pragmas():
+    """
+    Ослабляет гарантии SQLite на время загрузки: журнал в памяти,
+    без fsync, большой кеш страниц. Прежние значения возвращаются
+    после загрузки. Внутри открытой транзакции режим журнала менять
+    нельзя, поэтому там и на других СУБД ничего не меняется.
+    """
+    if connection.vendor != 'sqlite' or connection.in_atomic_block:
+        yield
+        return
+    with connection.cursor() as cursor:
+        previous = {}
+        for name, value in SQLITE_LOAD_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name}')
+            previous[name] = cursor.fetchone()[0]
+            cursor.execute(f'PRAGMA {name} = {value}')
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            for name, value in previous.items():
+                cursor.execute(f'PRAGMA {name} = {value}')
+
+
+class Progress:
+    """Считает вставленные строки и скорость загрузки."""
+
+    def __init__(self, report=None):
+        self.report = report
+        self.started = time.perf_counter()
+        self.rows = 0
+
+    def __call__(self, label, done, total, batch):
+        self.rows += batch
+        if self.report is not None:
+            self.report(label, done, total, self.rate)
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    @property
+    def rate(self):
+        return self.rows / max(self.elapsed, 1e-9)
+
+
+def _insert_batches(label, total, batch_size, build, insert, progress):
+    for start in range(0, total, batch_size):
+        rows = build(range(start, min(start + batch_size, total)))
+        with transaction.atomic():
+            insert(rows)
+        progress(label, start + len(rows), total, len(rows))
+
+
+def _default_value(field, now):
+    if getattr(field, 'auto_now', False) or getattr(
+        field, 'auto_now_add', False
+    ):
+        return now
+    return field.get_default()
+
+
+def row_inserter(model, columns, prepare_all=False):
+    """
+    Возвращает функцию, которая вставляет пакет кортежей значений
+    для columns одним executemany, минуя создание объектов модели
+    и компиляцию запроса для каждой строки. Остальные поля получают
+    значения по умолчанию; даты и время (или все значения при
+    prepare_all) приводятся к формату СУБД.
+    """
+    fields = {field.name: field for field in model._meta.concrete_fields}
+    column_fields = [fields[name] for name in columns]
+    now = timezone.now()
+    fixed_fields = [
+        field
+        for field in fields.values()
+        if field not in column_fields and not field.primary_key
+    ]
+    fixed = tuple(
+        field.get_db_prep_save(_default_value(field, now), connection)
+        for field in fixed_fields
+    )
+    adapt = [
+        (index, field)
+        for index, field in enumerate(column_fields)
+        if prepare_all
+        or field.get_internal_type() in ('DateTimeField', 'DateField')
+    ]
+    quote = connection.ops.quote_name
+    names = [field.column for field in (*column_fields, *fixed_fields)]
+    sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+        quote(model._meta.db_table),
+        ', '.join(quote(name) for name in names),
+        ', '.join(['%s'] * len(names)),
+    )
+
+    def prepare(row):
+        if adapt:
+            row = list(row)
+            for index, field in adapt:
+                row[index] = field.get_db_prep_save(row[index], connection)
+            row = tuple(row)
+        return row + fixed
+
+    def insert(rows):
+        with connection.cursor() as cursor:
+            cursor.executemany(sql, [prepare(row) for row in rows])
+
+    return insert
+
+
+def _new_ids(model, after):
+    return list(
+        model.objects.filter(pk__gt=after)
+        .order_by('pk')
+        .values_list('pk', flat=True)
+    )
+
+
+def _max_pk(model):
+    return model.objects.aggregate(max_pk=Max('pk'))['max_pk'] or 0
+
+
+def generate(
+    users=1000,
+    categories=20,
+    locations=50,
+    posts=10_000,
+    comments=100_000,
+    seed=42,
+    batch_size=5000,
+    progress=None,
+):
+    """
+    Заполняет базу синтетическими данными.
+    При одном и том же seed на пустой базе получается один и тот же
+    набор строк; даты публикаций отсчитываются от текущего момента.
+    Возвращает объект Progress с количеством строк и скоростью.
+    """
+    from faker import Faker
+
+    progress = progress or Progress()
+    rng = random.Random(seed)
+    fake = Faker('ru_RU')
+    fake.seed_instance(seed)
+    words = [fake.word().capitalize() for _ in range(200)]
+    cities = [fake.city() for _ in range(200)]
+    sentences = [fake.sentence() for _ in range(500)]
+    paragraphs = [fake.paragraph(nb_sentences=5) for _ in range(500)]
+    now = timezone.now()
+
+    user_offset = User.objects.count()
+    category_offset = Category.objects.count()
+    last_user, last_category, last_location, last_post = (
+        _max_pk(model) for model in (User, Category, Location, Post)
+    )
+
+    _insert_batches(
+        'Пользователи',
+        users,
+        batch_size,
+        lambda ids: [
+            (
+                f'user{user_offset + i}',
+                f'user{user_offset + i}@example.com',
+                rng.choice(words),
+                UNUSABLE_PASSWORD_PREFIX,
+            )
+            for i in ids
+        ],
+        row_inserter(User, ('username', 'email', 'first_name', 'password')),
+        progress,
+    )
+    _insert_batches(
+        'Категории',
+        categories,
+        batch_size,
+        lambda ids: [
+            (
+                rng.choice(words),
+                rng.choice(sentences),
+                f'category-{category_offset + i}',
+                i % 10 != 9,
+            )
+            for i in ids
+        ],
+        row_inserter(
+            Category, ('title', 'description', 'slug', 'is_published')
+        ),
+        progress,
+    )
+    _insert_batches(
+        'Местоположения',
+        locations,
+        batch_size,
+        lambda ids: [(rng.choice(cities),) for _ in ids],
+        row_inserter(Location, ('name',)),
+        progress,
+    )
+
+    user_ids = _new_ids(User, last_user)
+    category_ids = _new_ids(Category, last_category)
+    location_ids = _new_ids(Location, last_location)
+    if posts and not (user_ids and category_ids and location_ids):
+        raise ValueError(
+            'Для публикаций нужны пользователи, категории и местоположения.'
+        )
+    titles = [sentence[:MAX_STRING_LENGTH] for sentence in sentences]
+    _insert_batches(
+        'Публикации',
+        posts,
+        batch_size,
+        lambda ids: [
+            (
+                rng.choice(titles),
+                rng.choice(paragraphs),
+                now - timedelta(minutes=rng.randrange(-1440, 10**6)),
+                rng.choice(user_ids),
+                rng.choice(category_ids),
+                rng.choice(location_ids),
+                rng.random() > 0.05,
+            )
+            for _ in ids
+        ],
+        row_inserter(
+            Post,
+            (
+                'title',
+                'text',
+                'pub_date',
+                'author',
+                'category',
+                'location',
+                'is_published',
+            ),
+        ),
+        progress,
+    )
+
+    post_ids = _new_ids(Post, last_post)
+    if comments and not post_ids:
+        raise ValueError('Для комментариев нужны публикации.')
+    _insert_batches(
+        'Комментарии',
+        comments,
+        batch_size,
+        lambda ids: [
+            (
+                rng.choice(sentences),
+                rng.choice(post_ids),
+                rng.choice(user_ids),
+            )
+            for _ in ids
+        ],
+        row_inserter(Comment, ('text', 'post', 'author')),
+        progress,
+    )
+    if comments:
+        recount_comments(Post.objects.filter(pk__gt=last_post))
+    return progress
+
+
+def _fixture_value(obj, field, now):
+    """Значение поля из файла; пропущенные в файле поля — по умолчанию."""
+    value = getattr(obj, field.attname)
+    if value is None and not field.null:
+        return _default_value(field, now)
+    return value
+
+
+def import_fixture(path, batch_size=5000, progress=None):
+    """
+    Загружает пользователей, категории, местоположения, публикации
+    и комментарии из JSON-файла в формате dumpdata.
+    Остальные модели и связи многие-ко-многим пропускаются.
+    """
+    progress = progress or Progress()
+    by_model = {model: [] for model in IMPORT_ORDER}
+    with open(path, encoding='utf-8') as stream:
+        for deserialized in serializers.deserialize(
+            'json', stream, ignorenonexistent=True
+        ):
+            objs = by_model.get(type(deserialized.object))
+            if objs is not None:
+                objs.append(deserialized.object)
+
+    now = timezone.now()
+    for model, objs in by_model.items():
+        fields = model._meta.concrete_fields
+        _insert_batches(
+            str(model._meta.verbose_name_plural).capitalize(),
+            len(objs),
+            batch_size,
+            lambda ids, objs=objs, fields=fields: [
+                tuple(_fixture_value(obj, field, now) for field in fields)
+                for obj in objs[ids.start:ids.stop]
+            ],
+            row_inserter(
+                model, [field.name for field in fields], prepare_all=True
+            ),
+            progress,
+        )
+    sequence_sql = connection.ops.sequence_reset_sql(no_style(), IMPORT_ORDER)
+    if sequence_sql:
+        with connection.cursor() as cursor:
+            for sql in sequence_sql:
+                cursor.execute(sql)
+    recount_comments()
+    return progress
@@ -0,0 +1,95 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .caching import bump_version, post_page_tags, purge_tags
+from .comment_stream import comment_stream_hub
+from .jobs import process_post_image
+from .models import Category, Comment, Location, Post, User
+from .queryset_utilities import change_comment_count, touch_post
+
+
+def is_login_update(update_fields):
+    return update_fields is not None and set(update_fields) == {'last_login'}
+
+
+@receiver(pre_save, sender=Post)
+def remember_post_scope(sender, instance, **kwargs):
+    instance._previous_page_tags = ()
+    if instance.pk is None:
+        return
+    previous = (
+        Post.objects.filter(pk=instance.pk)
+        .values_list('category__slug', 'author__username')
+        .first()
+    )
+    if previous:
+        instance._previous_page_tags = post_page_tags(*previous)
+
+
+@receiver(post_save, sender=Post)
+def post_image_changed(sender, instance, **kwargs):
+    process_post_image(instance)
+
+
+@receiver((post_save, post_delete), sender=Post)
+def post_changed(sender, instance, **kwargs):
+    bump_version('post', instance.pk)
+    purge_tags(
+        *getattr(instance, '_previous_page_tags', ()),
+        *post_page_tags(
+            instance.category.slug if instance.category_id else None,
+            instance.author.username,
+        ),
+    )
+
+
+@receiver((post_save, post_delete), sender=Category)
+def category_changed(sender, instance, **kwargs):
+    bump_version('category', instance.pk)
+    purge_tags('all')
+
+
+@receiver((post_save, post_delete), sender=Location)
+def location_changed(sender, instance, **kwargs):
+    bump_version('location', instance.pk)
+    purge_tags('all')
+
+
+@receiver((post_save, post_delete), sender=User)
+def user_changed(sender, instance, update_fields=None, **kwargs):
+    if is_login_update(update_fields):
+        return
+    bump_version('user', instance.pk)
+    purge_tags('all')
+
+
+@receiver(post_save, sender=Comment)
+def comment_created(sender, instance, created, **kwargs):
+    if created:
+        change_comment_count(instance.post_id, 1)
+    else:
+        touch_post(instance.post_id)
+
+
+@receiver(post_save, sender=Comment)
+def comment_stream_notify(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(comment_stream_hub.notify)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    change_comment_count(instance.post_id, -1)
+
+
+@receiver((post_save, post_delete), sender=Comment)
+def comment_changed(sender, instance, **kwargs):
+    bump_version('post', instance.post_id)
+    scope = (
+        Post.objects.filter(pk=instance.post_id)
+        .values_list('category__slug', 'author__username')
+        .first()
+    )
+    if scope:
+        purge_tags(*post_page_tags(*scope))
@@ -0,0 +1,50 @@
+import gzip
+import re
+from functools import lru_cache
+
+from django.contrib.staticfiles import finders
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+BOOTSTRAP_CSS = 'vendor/bootstrap/css/bootstrap.min.css'
+COMPRESSIBLE_EXTENSIONS = (
+    '.css', '.js', '.map', '.svg', '.ico', '.json', '.xml', '.txt',
+)
+# ManifestStaticFilesStorage вставляет перед расширением 12 символов
+# md5 содержимого: logo.png → logo.0123456789ab.png.
+HASHED_NAME = re.compile(r'\.[0-9a-f]{12}\.[^./]+$')
+
+
+def is_hashed_name(name):
+    return HASHED_NAME.search(name) is not None
+
+
+@lru_cache(maxsize=None)
+def is_vendored(name):
+    """Есть ли файл среди исходной статики проекта и приложений."""
+    return finders.find(name) is not None
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Хранилище для collectstatic: к имени каждого файла добавляется хеш
+    содержимого, а рядом со сжимаемыми файлами кладутся gzip-копии
+    (.gz), которые StaticFilesMiddleware отдаёт без сжатия на лету.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for name, hashed_name in self.hashed_files.items():
+            if name.endswith(COMPRESSIBLE_EXTENSIONS):
+                self.compress(name)
+                self.compress(hashed_name)
+
+    def compress(self, name):
+        with self.open(name) as source:
+            content = source.read()
+        compressed = gzip.compress(content, compresslevel=9, mtime=0)
+        # Файлы, которые почти не сжимаются, отдаются как есть.
+        if len(compressed) < len(content) * 0.9:
+            with open(self.path(name) + '.gz', 'wb') as target:
+                target.write(compressed)
@@ -0,0 +1,21 @@
+from django import template
+from django.templatetags.static import static
+from django.utils.html import format_html
+from django_bootstrap5.templatetags.django_bootstrap5 import bootstrap_css
+
+from blog.staticfiles import BOOTSTRAP_CSS, is_vendored
+
+register = template.Library()
+
+
+@register.simple_tag
+def bootstrap_stylesheet():
+    """
+    Bootstrap из статики проекта, если его скачали командой
+    vendor_bootstrap, иначе — с CDN из настроек django_bootstrap5.
+    """
+    if not is_vendored(BOOTSTRAP_CSS):
+        return bootstrap_css()
+    return format_html(
+        '<link rel="stylesheet" href="{}">', static(BOOTSTRAP_CSS)
+    )
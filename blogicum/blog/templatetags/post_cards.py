@@ -0,0 +1,26 @@
+from django import template
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.safestring import mark_safe
+
+from blog.caching import post_card_cache_key
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def post_card(context, post):
+    user = context.get('user')
+    viewer_is_author = bool(
+        user and user.is_authenticated and user.pk == post.author_id
+    )
+    key = post_card_cache_key(post, viewer_is_author)
+    html = cache.get(key)
+    if html is None:
+        card = context.template.engine.get_template(
+            'includes/post_card.html'
+        )
+        with context.push(post=post):
+            html = card.render(context)
+        cache.set(key, html, settings.POST_CARD_CACHE_TIMEOUT)
+    return mark_safe(html)
@@ -0,0 +1,34 @@
+from django import template
+from django.conf import settings
+
+register = template.Library()
+
+
+@register.inclusion_tag('includes/post_image.html')
+def post_image(post, kind='card'):
+    image = post.image
+    meta = post.image_variants or {}
+    if meta.get('source') != image.name:
+        return {'src': image.url}
+
+    storage = image.storage
+    original = f'{image.url} {meta["width"]}w'
+    variants = meta['variants']
+    display_width = settings.POST_IMAGE_SIZES[kind]
+    return {
+        'src': image.url,
+        'width': meta['width'],
+        'height': meta['height'],
+        'sizes': f'(max-width: {display_width}px) 100vw, {display_width}px',
+        'srcset': ', '.join(
+            [
+                f'{storage.url(variant["fallback"])} {variant["width"]}w'
+                for variant in variants
+            ]
+            + [original]
+        ),
+        'webp_srcset': ', '.join(
+            f'{storage.url(variant["webp"])} {variant["width"]}w'
+            for variant in variants
+        ),
+    }
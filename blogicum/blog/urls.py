@@ -1,13 +1,21 @@
+from django.conf import settings
 from django.urls import include, path
 
-from . import views
+from . import feeds, views
 
 app_name = 'blog'
 
+
+def read_view(view_class):
+    if settings.ASYNC_VIEWS:
+        return view_class.as_async_view()
+    return view_class.as_view()
+
+
 post_urls = [
     path(
         '<int:post_id>/',
-        views.PostDetailView.as_view(),
+        read_view(views.PostDetailView),
         name='post_detail',
     ),
     path(
@@ -25,6 +33,16 @@ post_urls = [
         views.CommentCreateView.as_view(),
         name='add_comment',
     ),
+    path(
+        '<int:post_id>/comments/',
+        views.CommentListView.as_view(),
+        name='comments',
+    ),
+    path(
+        '<int:post_id>/comments/stream/',
+        views.comment_stream_view,
+        name='comment_stream',
+    ),
     path(
         '<int:post_id>/edit_comment/<int:comment_id>/',
         views.CommentUpdateView.as_view(),
@@ -39,19 +57,49 @@ post_urls = [
 ]
 
 urlpatterns = [
-    path('', views.IndexListView.as_view(), name='index'),
+    path('', read_view(views.IndexListView), name='index'),
+    path('feeds/rss/', feeds.LatestPostsFeed(), name='feed_rss'),
+    path('feeds/atom/', feeds.LatestPostsAtomFeed(), name='feed_atom'),
     path('posts/', include(post_urls)),
+    path('search/', views.SearchListView.as_view(), name='search'),
     path(
         'category/<slug:category_slug>/',
-        views.CategoryListView.as_view(),
+        read_view(views.CategoryListView),
         name='category_posts',
     ),
+    path(
+        'category/<slug:category_slug>/rss/',
+        feeds.CategoryPostsFeed(),
+        name='category_feed_rss',
+    ),
+    path(
+        'category/<slug:category_slug>/atom/',
+        feeds.CategoryPostsAtomFeed(),
+        name='category_feed_atom',
+    ),
     path(
         'profile-edit/', views.ProfileUpdateView.as_view(), name='edit_profile'
     ),
     path(
         'profile/<str:username>/',
-        views.ProfileListView.as_view(),
+        read_view(views.ProfileListView),
         name='profile',
     ),
+    path(
+        'profile/<str:username>/rss/',
+        feeds.AuthorPostsFeed(),
+        name='profile_feed_rss',
+    ),
+    path(
+        'profile/<str:username>/atom/',
+        feeds.AuthorPostsAtomFeed(),
+        name='profile_feed_atom',
+    ),
+    path(
+        'page-cache/stats/',
+        views.page_cache_stats_view,
+        name='page_cache_stats',
+    ),
+    path('metrics/', views.metrics_view, name='metrics'),
+    path('export/posts/', views.export_posts_view, name='export_posts'),
 ]
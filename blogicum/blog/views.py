@@ -1,21 +1,62 @@
+from hashlib import md5
+
 from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.http import Http404
-from django.shortcuts import get_object_or_404
+from django.core.exceptions import SuspiciousFileOperation
+from django.db import transaction
+from django.http import (
+    Http404,
+    HttpResponse,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.shortcuts import get_object_or_404, render
 from django.urls import reverse, reverse_lazy
-from django.utils import timezone
+from django.utils._os import safe_join
+from django.utils.http import urlencode
 from django.views.generic import (
     CreateView,
     DeleteView,
     DetailView,
     ListView,
     UpdateView,
+    View,
 )
 
-from .forms import CommentForm, CustomUserForm, PostForm, ProfileForm
-from .mixins import CommentMixin, PostUpdateDeleteMixin, ProfileRedirectMixin
+from .caching import page_cache_stats
+from .comment_stream import (
+    format_event,
+    format_stream_start,
+    open_stream,
+    parse_last_event_id,
+)
+from .export import export_posts_ndjson, get_export_queryset
+from .forms import (
+    CommentForm,
+    CustomUserForm,
+    PostExportForm,
+    PostForm,
+    ProfileForm,
+)
+from .media import serve_media
+from .metrics import registry
+from .mixins import (
+    AnonymousPageCacheMixin,
+    AsyncViewMixin,
+    CommentMixin,
+    ConditionalGetMixin,
+    CursorPaginationMixin,
+    EstimatedCountMixin,
+    PostListConditionalGetMixin,
+    PostUpdateDeleteMixin,
+    ProfileRedirectMixin,
+    ReplicaReadMixin,
+    VisiblePostMixin,
+)
 from .models import Category, Comment, Post, User
 from .queryset_utilities import get_posts
+from .search import search_posts
 
 
 class ProfileUpdateView(LoginRequiredMixin, ProfileRedirectMixin, UpdateView):
@@ -26,21 +67,41 @@ class ProfileUpdateView(LoginRequiredMixin, ProfileRedirectMixin, UpdateView):
         return self.request.user
 
 
-class ProfileListView(ListView):
+class ProfileListView(
+    AsyncViewMixin,
+    ReplicaReadMixin,
+    PostListConditionalGetMixin,
+    AnonymousPageCacheMixin,
+    CursorPaginationMixin,
+    EstimatedCountMixin,
+    ListView,
+):
     template_name = 'blog/user_detail.html'
     paginate_by = settings.PAGINATE_BY
+    profile_user = None
+
+    def get_cache_tags(self):
+        return (f'profile:{self.kwargs["username"]}',)
+
+    def get_count_scope(self):
+        # Автор видит в своём профиле и неопубликованные посты.
+        if self.request.user.username == self.kwargs['username']:
+            return f'{super().get_count_scope()}:own'
+        return super().get_count_scope()
 
     def get_user_obj(self):
-        return get_object_or_404(User, username=self.kwargs['username'])
+        if self.profile_user is None:
+            self.profile_user = get_object_or_404(
+                User, username=self.kwargs['username']
+            )
+        return self.profile_user
 
     def get_queryset(self):
         user_obj = self.get_user_obj()
         if self.request.user.username == user_obj.username:
-            profile_posts = get_posts(user_obj.posts, comment_count=True)
+            profile_posts = get_posts(user_obj.posts)
         else:
-            profile_posts = get_posts(
-                user_obj.posts, only_published=True, comment_count=True
-            )
+            profile_posts = get_posts(user_obj.posts, only_published=True)
         return profile_posts
 
     def get_context_data(self, **kwargs):
@@ -49,28 +110,52 @@ class ProfileListView(ListView):
         return context
 
 
-class IndexListView(ListView):
-    queryset = get_posts(only_published=True, comment_count=True)
+class IndexListView(
+    AsyncViewMixin,
+    ReplicaReadMixin,
+    PostListConditionalGetMixin,
+    AnonymousPageCacheMixin,
+    CursorPaginationMixin,
+    EstimatedCountMixin,
+    ListView,
+):
     paginate_by = settings.PAGINATE_BY
-    ordering = ('-pub_date',)
+
+    def get_cache_tags(self):
+        return ('feed',)
+
+    def get_queryset(self):
+        return get_posts(only_published=True)
 
 
-class CategoryListView(ListView):
+class CategoryListView(
+    AsyncViewMixin,
+    ReplicaReadMixin,
+    PostListConditionalGetMixin,
+    AnonymousPageCacheMixin,
+    CursorPaginationMixin,
+    EstimatedCountMixin,
+    ListView,
+):
     template_name = 'blog/category_list.html'
     paginate_by = settings.PAGINATE_BY
+    category = None
+
+    def get_cache_tags(self):
+        return (f'category:{self.kwargs["category_slug"]}',)
 
     def get_category_obj(self):
-        return get_object_or_404(
-            Category,
-            slug=self.kwargs['category_slug'],
-            is_published=True,
-        )
+        if self.category is None:
+            self.category = get_object_or_404(
+                Category,
+                slug=self.kwargs['category_slug'],
+                is_published=True,
+            )
+        return self.category
 
     def get_queryset(self):
         category = self.get_category_obj()
-        return get_posts(
-            category.posts, only_published=True, comment_count=True
-        )
+        return get_posts(category.posts, only_published=True)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -78,6 +163,34 @@ class CategoryListView(ListView):
         return context
 
 
+class SearchListView(EstimatedCountMixin, ListView):
+    template_name = 'blog/search.html'
+    paginate_by = settings.PAGINATE_BY
+
+    def get_search_query(self):
+        return self.request.GET.get('q', '').strip()
+
+    def get_cache_tags(self):
+        return ('feed',)
+
+    def get_count_scope(self):
+        query = md5(self.get_search_query().encode()).hexdigest()
+        return f'search:{query}'
+
+    def get_queryset(self):
+        return search_posts(
+            self.get_search_query(), get_posts(only_published=True)
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        query = self.get_search_query()
+        context['search_query'] = query
+        if query:
+            context['pagination_query'] = f'{urlencode({"q": query})}&'
+        return context
+
+
 class PostDeleteView(LoginRequiredMixin, PostUpdateDeleteMixin, DeleteView):
     success_url = reverse_lazy('blog:index')
     template_name = 'blog/post_form.html'
@@ -96,30 +209,107 @@ class PostCreateView(LoginRequiredMixin, ProfileRedirectMixin, CreateView):
         return super().form_valid(form)
 
 
-class PostDetailView(DetailView):
+class PostDetailView(
+    AsyncViewMixin,
+    ReplicaReadMixin,
+    ConditionalGetMixin,
+    VisiblePostMixin,
+    DetailView,
+):
+    def get_validator_versions(self):
+        return [('tag', 'all'), ('post', self.kwargs['post_id'])]
+
+    def get_last_modified_candidates(self):
+        return (
+            Post.objects.filter(pk=self.kwargs['post_id'])
+            .values_list('updated_at', flat=True)
+            .first(),
+        )
+
     def get_object(self):
-        post_id = self.kwargs['post_id']
-        post = get_object_or_404(get_posts(), pk=post_id)
-        if self.request.user != post.author and (
-            not post.is_published
-            or not post.category.is_published
-            or post.pub_date > timezone.now()
-        ):
-            raise Http404
-        return post
+        return self.get_visible_post()
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['form'] = CommentForm()
-        context['comments'] = self.object.comments.select_related('author')
+        context['comments'] = self.get_comments_page(self.object)
         return context
 
 
+class CommentListView(VisiblePostMixin, View):
+    def get(self, request, *args, **kwargs):
+        post = self.get_visible_post()
+        comments = self.get_comments_page(post)
+        if (
+            request.GET.get('format') == 'json'
+            or 'application/json' in request.headers.get('Accept', '')
+        ):
+            return JsonResponse(
+                {
+                    'comments': [
+                        {
+                            'id': comment.id,
+                            'author': comment.author.username,
+                            'text': comment.text,
+                            'created_at': comment.created_at.isoformat(),
+                        }
+                        for comment in comments
+                    ],
+                    'next_cursor': comments.next_cursor,
+                }
+            )
+        return render(
+            request,
+            'includes/comment_list.html',
+            {'post': post, 'comments': comments},
+        )
+
+
+def comment_stream_view(request, post_id):
+    """
+    Новые комментарии в формате Server-Sent Events без ASGI: отдаёт
+    комментарии после Last-Event-ID и закрывает ответ, а EventSource
+    переподключается через интервал из retry. Под ASGI этот адрес
+    держит открытым CommentStreamApplication.
+    """
+    opened = open_stream(
+        post_id, parse_last_event_id(request.headers.get('Last-Event-ID'))
+    )
+    if opened is None:
+        raise Http404
+    last_id, replay = opened
+    response = HttpResponse(
+        format_stream_start(last_id)
+        + ''.join(format_event(payload) for payload in replay),
+        content_type='text/event-stream; charset=utf-8',
+    )
+    response['Cache-Control'] = 'no-cache'
+    return response
+
+
+def media_view(request, path):
+    """
+    Медиафайлы с проверкой видимости: фото скрытых публикаций видит
+    только автор. Сам файл отдаёт веб-сервер по X-Accel-Redirect или
+    X-Sendfile либо, при MEDIA_SERVE_MODE = 'django', это
+    представление.
+    """
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404
+    response = serve_media(request, path, full_path)
+    if response is None:
+        raise Http404
+    return response
+
+
 class CommentCreateView(LoginRequiredMixin, CreateView):
     model = Comment
     form_class = CommentForm
     comment_post = None
 
+    @transaction.atomic
     def form_valid(self, form):
         form.instance.author = self.request.user
         form.instance.post = self.comment_post
@@ -140,10 +330,59 @@ class CommentUpdateView(LoginRequiredMixin, CommentMixin, UpdateView):
 
 
 class CommentDeleteView(LoginRequiredMixin, CommentMixin, DeleteView):
-    ...
+    @transaction.atomic
+    def delete(self, request, *args, **kwargs):
+        return super().delete(request, *args, **kwargs)
 
 
 class AuthUserCreateView(CreateView):
     template_name = 'registration/registration_form.html'
     form_class = CustomUserForm
     success_url = reverse_lazy('blog:index')
+
+
+@staff_member_required
+def page_cache_stats_view(request):
+    return JsonResponse(page_cache_stats())
+
+
+@staff_member_required
+def metrics_view(request):
+    cache_stats = page_cache_stats()
+    return HttpResponse(
+        registry.render(
+            counters=(
+                (
+                    'blog_page_cache_hits_total',
+                    'Ответы из кеша страниц.',
+                    cache_stats['hits'],
+                ),
+                (
+                    'blog_page_cache_misses_total',
+                    'Промахи кеша страниц.',
+                    cache_stats['misses'],
+                ),
+            )
+        ),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
+
+
+@staff_member_required
+def export_posts_view(request):
+    form = PostExportForm(request.GET)
+    if not form.is_valid():
+        return JsonResponse(form.errors, status=400)
+    data = form.cleaned_data
+    posts = get_export_queryset(
+        since=data['since'],
+        until=data['until'],
+        category=data['category'] or None,
+        only_published=not data['all'],
+    )
+    response = StreamingHttpResponse(
+        export_posts_ndjson(posts),
+        content_type='application/x-ndjson; charset=utf-8',
+    )
+    response['Content-Disposition'] = 'attachment; filename="posts.ndjson"'
+    return response
@@ -0,0 +1,46 @@
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.sqlite3 import base
+
+TRANSACTION_MODES = ('DEFERRED', 'IMMEDIATE', 'EXCLUSIVE')
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    SQLite с настройкой соединений из OPTIONS.
+
+    OPTIONS['pragmas'] — словарь PRAGMA, которые выполняются для каждого
+    нового соединения (journal_mode, synchronous, busy_timeout,
+    mmap_size, cache_size и т. п.).
+    OPTIONS['transaction_mode'] — режим BEGIN для atomic(). IMMEDIATE
+    берёт блокировку записи в начале транзакции: в режиме WAL
+    транзакция, которая сначала читает, а потом пишет, иначе получает
+    «database is locked» сразу, не дожидаясь busy_timeout.
+    Остальные ключи OPTIONS передаются в sqlite3.connect().
+    """
+
+    custom_options = ('pragmas', 'transaction_mode')
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        for name in self.custom_options:
+            params.pop(name, None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        conn = super().get_new_connection(conn_params)
+        for name, value in self.settings_dict['OPTIONS'].get(
+            'pragmas', {}
+        ).items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+
+    def _start_transaction_under_autocommit(self):
+        mode = self.settings_dict['OPTIONS'].get('transaction_mode')
+        if mode is None:
+            return super()._start_transaction_under_autocommit()
+        if mode.upper() not in TRANSACTION_MODES:
+            raise ImproperlyConfigured(
+                f'Неизвестный режим транзакций SQLite: {mode}. '
+                f'Допустимы {", ".join(TRANSACTION_MODES)}.'
+            )
+        self.cursor().execute(f'BEGIN {mode.upper()}')
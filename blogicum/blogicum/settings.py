@@ -1,12 +1,32 @@
+import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 
-SECRET_KEY = (
-    'django-insecure-icqwqr#pe@@j6s^=$g(pg27zh!(h+*(+orxrn1d6$^=%&1a8h7'
-)
+# Профиль настроек: development (по умолчанию) или production.
+BLOGICUM_ENV = os.environ.get('BLOGICUM_ENV', 'development')
+
+if BLOGICUM_ENV not in ('development', 'production'):
+    raise ImproperlyConfigured(
+        f'Неизвестный профиль настроек BLOGICUM_ENV={BLOGICUM_ENV!r}.'
+    )
+
+PRODUCTION = BLOGICUM_ENV == 'production'
+
+SECRET_KEY = os.environ.get('BLOGICUM_SECRET_KEY')
 
-DEBUG = True
+if SECRET_KEY is None:
+    if PRODUCTION:
+        raise ImproperlyConfigured(
+            'В профиле production задайте BLOGICUM_SECRET_KEY.'
+        )
+    SECRET_KEY = (
+        'django-insecure-icqwqr#pe@@j6s^=$g(pg27zh!(h+*(+orxrn1d6$^=%&1a8h7'
+    )
+
+DEBUG = not PRODUCTION
 
 ALLOWED_HOSTS = [
     '127.0.0.1',
@@ -31,6 +51,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'blog.middleware.StaticFilesMiddleware',
+    'blog.middleware.MetricsMiddleware',
+    'blog.middleware.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -71,10 +94,60 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'blogicum.wsgi.application'
 
+# Асинхронные варианты страниц лент и публикаций для запуска под ASGI.
+ASYNC_VIEWS = False
+
+# Потоки, в которых асинхронные страницы обращаются к базе и отрисовывают
+# шаблоны.
+ASYNC_VIEW_THREADS = 4
+
+SQLITE_PRAGMAS = {
+    'busy_timeout': 5000,
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'temp_store': 'MEMORY',
+}
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        'ENGINE': 'blogicum.backends.sqlite3',
         'NAME': BASE_DIR / 'db.sqlite3',
+        'OPTIONS': {
+            'pragmas': SQLITE_PRAGMAS,
+            'transaction_mode': 'IMMEDIATE',
+        },
+        'TEST': {
+            'NAME': BASE_DIR / 'test_db.sqlite3',
+        },
+    },
+    'replica': {
+        'ENGINE': 'blogicum.backends.sqlite3',
+        'NAME': BASE_DIR / 'db_replica.sqlite3',
+        'OPTIONS': {
+            'pragmas': SQLITE_PRAGMAS,
+            'transaction_mode': 'IMMEDIATE',
+        },
+        'TEST': {
+            'NAME': BASE_DIR / 'test_db_replica.sqlite3',
+        },
+    },
+}
+
+DATABASE_ROUTERS = ['blog.routers.ReplicaRouter']
+
+# Псевдонимы из DATABASES, с которых читают ленты и страницы публикаций.
+# Пустой список — всё читается с основной базы.
+DATABASE_REPLICAS = []
+
+REPLICA_PIN_COOKIE = 'primary_pin'
+
+REPLICA_PIN_SECONDS = 5
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
     }
 }
 
@@ -109,8 +182,43 @@ STATICFILES_DIRS = [
     BASE_DIR / 'static',
 ]
 
+STATIC_ROOT = BASE_DIR / 'static_collected'
+
+# Сколько браузер хранит статику с хешем в имени, секунды.
+STATIC_MAX_AGE = 365 * 24 * 60 * 60
+
+MEDIA_URL = '/media/'
+
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Как отдаются медиафайлы после проверки доступа: 'django' — из
+# процесса через FileResponse; 'x-accel-redirect' — nginx из internal
+# location MEDIA_ACCEL_REDIRECT_URL с alias на MEDIA_ROOT;
+# 'x-sendfile' — Apache mod_xsendfile и совместимые серверы.
+MEDIA_SERVE_MODE = os.environ.get('BLOGICUM_MEDIA_SERVE_MODE', 'django')
+
+MEDIA_ACCEL_REDIRECT_URL = '/protected-media/'
+
+# Сколько общие кеши хранят фото опубликованных постов, секунды.
+MEDIA_CACHE_MAX_AGE = 60 * 60
+
+POST_IMAGE_SIZES = {
+    'card': 640,
+    'detail': 960,
+}
+
+POST_IMAGE_QUALITY = 82
+
+IMAGE_PROCESSING_ASYNC = True
+
+IMAGE_WORKER_CONCURRENCY = 2
+
+IMAGE_JOB_MAX_ATTEMPTS = 3
+
+IMAGE_JOB_RETRY_DELAY = 30
+
+IMAGE_JOB_TIMEOUT = 60 * 5
+
 LOGIN_URL = 'login'
 
 LOGIN_REDIRECT_URL = 'blog:index'
@@ -118,3 +226,72 @@ LOGIN_REDIRECT_URL = 'blog:index'
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 PAGINATE_BY = 10
+
+COMMENTS_PAGINATE_BY = 20
+
+PAGINATOR_EXACT_COUNT_LIMIT = 1000
+
+PAGINATOR_COUNT_CACHE_TIMEOUT = 60 * 5
+
+CURSOR_PAGINATION = False
+
+PUBLISHED_CUTOFF_GRANULARITY = 60
+
+POST_CARD_CACHE_TIMEOUT = 60 * 60
+
+ANONYMOUS_PAGE_CACHE = False
+
+ANONYMOUS_PAGE_CACHE_TIMEOUT = 60 * 5
+
+FEED_ITEMS = 20
+
+FEED_CACHE_TIMEOUT = 60 * 60
+
+COMMENT_STREAM_MAX_CONNECTIONS = 1000
+
+COMMENT_STREAM_QUEUE_SIZE = 20
+
+COMMENT_STREAM_POLL_INTERVAL = 2
+
+COMMENT_STREAM_HEARTBEAT = 15
+
+# Компилировать все шаблоны из TEMPLATES_DIR при запуске.
+TEMPLATE_PRECOMPILE = PRODUCTION
+
+if PRODUCTION:
+    INSTALLED_APPS.remove('debug_toolbar')
+    MIDDLEWARE.remove('debug_toolbar.middleware.DebugToolbarMiddleware')
+    STATICFILES_STORAGE = (
+        'blog.staticfiles.CompressedManifestStaticFilesStorage'
+    )
+    TEMPLATES[0]['APP_DIRS'] = False
+    TEMPLATES[0]['OPTIONS']['loaders'] = [
+        (
+            'django.template.loaders.cached.Loader',
+            [
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ],
+        ),
+    ]
+    for database in DATABASES.values():
+        database['CONN_MAX_AGE'] = 60
+    # Версии кеша, кеш страниц, лент и числа объектов должны быть общими
+    # для всех процессов: LocMemCache у каждого процесса свой, и сброс
+    # в одном из них другие не видят. Для нескольких серверов задайте
+    # memcached, например
+    # django.core.cache.backends.memcached.PyMemcacheCache.
+    CACHES['default'] = {
+        'BACKEND': os.environ.get(
+            'BLOGICUM_CACHE_BACKEND',
+            'django.core.cache.backends.filebased.FileBasedCache',
+        ),
+        'LOCATION': os.environ.get(
+            'BLOGICUM_CACHE_LOCATION', str(BASE_DIR / 'cache')
+        ),
+    }
+    if CACHES['default']['BACKEND'].endswith('.LocMemCache'):
+        raise ImproperlyConfigured(
+            'В профиле production кеш должен быть общим для процессов:'
+            ' задайте в BLOGICUM_CACHE_BACKEND не LocMemCache.'
+        )
@@ -1,5 +1,4 @@
 from django.conf import settings
-from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import include, path
 
@@ -17,12 +16,15 @@ urlpatterns = [
         views.AuthUserCreateView.as_view(),
         name='registration',
     ),
+    path(
+        settings.MEDIA_URL.lstrip('/') + '<path:path>',
+        views.media_view,
+        name='media',
+    ),
     path('', include('blog.urls', namespace='blog')),
 ]
 
-if settings.DEBUG:
+if 'debug_toolbar' in settings.INSTALLED_APPS:
     import debug_toolbar
 
     urlpatterns += (path('__debug__/', include(debug_toolbar.urls)),)
-
-urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
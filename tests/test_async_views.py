@@ -0,0 +1,83 @@
+import asyncio
+from importlib import import_module, reload
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+from django.test.client import AsyncClient, Client
+from django.urls import clear_url_caches, resolve
+
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+
+def reload_urls():
+    for module in ('blog.urls', 'blogicum.urls'):
+        reload(import_module(module))
+    clear_url_caches()
+
+
+@pytest.fixture
+def async_views(settings):
+    cache.clear()
+    settings.ASYNC_VIEWS = True
+    reload_urls()
+    yield
+    settings.ASYNC_VIEWS = False
+    reload_urls()
+    cache.clear()
+
+
+def get(client, url, **extra):
+    if isinstance(client, AsyncClient):
+        async def fetch():
+            return await client.get(url, **extra)
+
+        return async_to_sync(fetch)()
+    return client.get(url, **extra)
+
+
+def read_urls(post):
+    return (
+        '/',
+        f'/category/{post.category.slug}/',
+        f'/profile/{post.author.username}/',
+        f'/posts/{post.id}/',
+    )
+
+
+def test_async_views_are_selected_by_setting(
+        async_views, post_with_published_location
+):
+    for url in read_urls(post_with_published_location):
+        assert asyncio.iscoroutinefunction(resolve(url).func), (
+            f'Убедитесь, что при `ASYNC_VIEWS = True` адрес `{url}`'
+            ' обслуживается асинхронным представлением.'
+        )
+
+
+def test_async_views_match_sync_views(
+        async_views, mixer, user, post_with_published_location
+):
+    post = post_with_published_location
+    hidden = mixer.blend(
+        'blog.Post', author=user, category=post.category, is_published=False
+    )
+    async_client = AsyncClient()
+    sync_client = Client()
+    for url in read_urls(post):
+        async_response = get(async_client, url)
+        sync_response = get(sync_client, url)
+        assert async_response.status_code == sync_response.status_code == 200
+        assert async_response['ETag'] == sync_response['ETag']
+        assert async_response.content == sync_response.content, (
+            f'Убедитесь, что асинхронная страница `{url}` совпадает с'
+            ' синхронной.'
+        )
+        # AsyncClient в Django 3.2 принимает заголовки по их HTTP-именам.
+        assert get(
+            async_client, url, **{'if-none-match': async_response['ETag']}
+        ).status_code == 304
+    assert get(async_client, f'/posts/{hidden.id}/').status_code == 404, (
+        'Убедитесь, что асинхронная страница публикации скрывает снятые с'
+        ' публикации записи.'
+    )
@@ -0,0 +1,52 @@
+import pytest
+from django.core.management import call_command
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comment_count_follows_views(
+        user_client, post_with_published_location
+):
+    post = post_with_published_location
+    assert post.comment_count == 0
+
+    user_client.post(f'/posts/{post.id}/comment/', {'text': 'Первый'})
+    user_client.post(f'/posts/{post.id}/comment/', {'text': 'Второй'})
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        'Убедитесь, что при создании комментария сохранённый счётчик'
+        ' комментариев публикации увеличивается.'
+    )
+
+    comment = post.comments.first()
+    user_client.post(f'/posts/{post.id}/delete_comment/{comment.id}/')
+    post.refresh_from_db()
+    assert post.comment_count == post.comments.count() == 1, (
+        'Убедитесь, что при удалении комментария сохранённый счётчик'
+        ' комментариев публикации уменьшается.'
+    )
+
+
+def test_comment_count_outside_views(mixer, post_with_published_location):
+    post = post_with_published_location
+    comments = mixer.cycle(3).blend('blog.Comment', post=post)
+    comments[0].delete()
+    post.refresh_from_db()
+    assert post.comment_count == 2, (
+        'Убедитесь, что счётчик комментариев учитывает комментарии,'
+        ' созданные и удалённые не через страницы блога.'
+    )
+
+
+def test_recount_comments_command(mixer, post_with_published_location):
+    post = post_with_published_location
+    mixer.cycle(3).blend('blog.Comment', post=post)
+    Post = type(post)
+    Post.objects.filter(pk=post.pk).update(comment_count=0)
+
+    call_command('recount_comments')
+    post.refresh_from_db()
+    assert post.comment_count == 3, (
+        'Убедитесь, что команда `recount_comments` пересчитывает'
+        ' количество комментариев у публикаций.'
+    )
@@ -0,0 +1,54 @@
+import pytest
+from django.test import override_settings
+
+pytestmark = [pytest.mark.django_db]
+
+
+@override_settings(COMMENTS_PAGINATE_BY=5)
+def test_comments_are_paginated(
+        mixer, unlogged_client, post_with_published_location
+):
+    post = post_with_published_location
+    comments = mixer.cycle(12).blend('blog.Comment', post=post)
+
+    page = unlogged_client.get(f'/posts/{post.id}/').context['comments']
+    assert [c.id for c in page] == [c.id for c in comments[:5]], (
+        'Убедитесь, что на странице публикации выводится только первая'
+        ' порция комментариев.'
+    )
+
+    cursor, loaded = page.next_cursor, list(page)
+    while cursor:
+        data = unlogged_client.get(
+            f'/posts/{post.id}/comments/',
+            {'cursor': cursor, 'format': 'json'},
+        ).json()
+        loaded.extend(data['comments'])
+        cursor = data['next_cursor']
+    assert len(loaded) == len(comments)
+    assert [c['id'] for c in loaded[5:]] == [c.id for c in comments[5:]], (
+        'Убедитесь, что остальные комментарии подгружаются по курсору'
+        ' в порядке их создания.'
+    )
+
+    html = unlogged_client.get(
+        f'/posts/{post.id}/comments/', {'cursor': page.next_cursor}
+    ).content.decode('utf-8')
+    assert f'name="comment_{comments[5].id}"' in html
+    assert 'js-more-comments' in html
+
+
+def test_comments_of_hidden_post(
+        mixer, user, another_user_client, published_category
+):
+    post = mixer.blend(
+        'blog.Post',
+        author=user,
+        is_published=False,
+        category=published_category,
+    )
+    response = another_user_client.get(f'/posts/{post.id}/comments/')
+    assert response.status_code == 404, (
+        'Убедитесь, что комментарии к скрытой публикации недоступны'
+        ' другим пользователям.'
+    )
@@ -0,0 +1,319 @@
+import asyncio
+import json
+from datetime import timedelta
+
+import pytest
+from asgiref.sync import sync_to_async
+from django.db import connections
+from django.test import override_settings
+from django.utils import timezone
+
+from blog.comment_stream import (
+    CommentStreamApplication,
+    CommentStreamHub,
+    Listener,
+)
+from blog.models import Comment
+
+pytestmark = [pytest.mark.django_db(transaction=True)]
+
+
+async def not_found_application(scope, receive, send):
+    await send(
+        {'type': 'http.response.start', 'status': 404, 'headers': []}
+    )
+    await send({'type': 'http.response.body', 'body': b''})
+
+
+class StreamClient:
+    """Открывает поток через ASGI и читает из него события."""
+
+    def __init__(self, application, path, last_event_id=None):
+        self.messages = asyncio.Queue()
+        self.disconnected = asyncio.Event()
+        headers = [(b'host', b'localhost')]
+        if last_event_id is not None:
+            headers.append((b'last-event-id', str(last_event_id).encode()))
+        scope = {
+            'type': 'http',
+            'method': 'GET',
+            'path': path,
+            'query_string': b'',
+            'headers': headers,
+        }
+        self.task = asyncio.ensure_future(
+            application(scope, self.receive, self.messages.put)
+        )
+        self.body = ''
+
+    async def receive(self):
+        await self.disconnected.wait()
+        return {'type': 'http.disconnect'}
+
+    async def start(self):
+        return await asyncio.wait_for(self.messages.get(), 5)
+
+    async def read_until(self, text):
+        while text not in self.body:
+            message = await asyncio.wait_for(self.messages.get(), 5)
+            self.body += message.get('body', b'').decode()
+            if not message.get('more_body'):
+                break
+        return self.body
+
+    async def close(self):
+        self.disconnected.set()
+        await asyncio.wait_for(self.task, 5)
+
+
+def events(body):
+    return [
+        json.loads(line[len('data: '):])
+        for line in body.splitlines()
+        if line.startswith('data: ')
+    ]
+
+
+def create_comment(post, user, text):
+    return Comment.objects.create(post=post, author=user, text=text)
+
+
+def post_comment(client, post, text):
+    try:
+        return client.post(f'/posts/{post.id}/comment/', {'text': text})
+    finally:
+        connections.close_all()
+
+
+@override_settings(COMMENT_STREAM_POLL_INTERVAL=60)
+def test_new_comments_are_pushed(
+        user, user_client, post_with_published_location
+):
+    post = post_with_published_location
+    old = create_comment(post, user, 'Старый комментарий')
+    application = CommentStreamApplication(not_found_application)
+    url = f'/posts/{post.id}/comments/stream/'
+
+    async def scenario():
+        client = StreamClient(application, url)
+        start = await client.start()
+        assert start['status'] == 200
+        assert dict(start['headers'])[b'content-type'].startswith(
+            b'text/event-stream'
+        )
+        await client.read_until(f'id: {old.id}\n')
+        await sync_to_async(post_comment)(
+            user_client, post, 'Новый комментарий'
+        )
+        body = await client.read_until('Новый комментарий')
+        await client.close()
+        return body
+
+    body = asyncio.run(scenario())
+    comment = Comment.objects.latest('pk')
+    assert [event['id'] for event in events(body)] == [comment.id], (
+        'Убедитесь, что комментарий, добавленный через форму, сразу'
+        ' приходит подписчикам, а старые комментарии не повторяются.'
+    )
+    assert 'Новый комментарий' in events(body)[0]['html']
+    assert application.hub.connections == 0, (
+        'Убедитесь, что после отключения клиента подписка удаляется.'
+    )
+
+
+def test_reconnect_replays_missed_comments(
+        user, post_with_published_location
+):
+    post = post_with_published_location
+    first = create_comment(post, user, 'Первый')
+    second = create_comment(post, user, 'Второй')
+    application = CommentStreamApplication(
+        not_found_application, CommentStreamHub()
+    )
+
+    async def scenario():
+        client = StreamClient(
+            application,
+            f'/posts/{post.id}/comments/stream/',
+            last_event_id=first.id,
+        )
+        await client.start()
+        body = await client.read_until('Второй')
+        await client.close()
+        return body
+
+    assert [event['id'] for event in events(asyncio.run(scenario()))] == [
+        second.id
+    ], (
+        'Убедитесь, что при переподключении с Last-Event-ID поток сначала'
+        ' отдаёт пропущенные комментарии.'
+    )
+
+
+def test_long_replay_closes_stream(
+        monkeypatch, user, post_with_published_location
+):
+    post = post_with_published_location
+    first = create_comment(post, user, 'Первый')
+    missed = [
+        create_comment(post, user, f'Пропущенный {number}').id
+        for number in range(3)
+    ]
+    monkeypatch.setattr('blog.comment_stream.BATCH_SIZE', 2)
+    application = CommentStreamApplication(
+        not_found_application, CommentStreamHub()
+    )
+    url = f'/posts/{post.id}/comments/stream/'
+
+    async def reconnect():
+        client = StreamClient(application, url, last_event_id=first.id)
+        await client.start()
+        body = await client.read_until('Пропущенный 2')
+        await asyncio.wait_for(client.task, 5)
+        return body
+
+    async def resume():
+        client = StreamClient(application, url, last_event_id=missed[1])
+        await client.start()
+        body = await client.read_until('Пропущенный 2')
+        await client.close()
+        return body
+
+    assert [event['id'] for event in events(asyncio.run(reconnect()))] == (
+        missed[:2]
+    ), (
+        'Убедитесь, что поток закрывается после полной выборки пропущенных'
+        ' комментариев, чтобы клиент переподключился и дочитал остальные.'
+    )
+    assert [event['id'] for event in events(asyncio.run(resume()))] == (
+        missed[2:]
+    )
+
+
+@override_settings(COMMENT_STREAM_MAX_CONNECTIONS=1)
+def test_connection_cap(mixer, post_with_published_location):
+    post = post_with_published_location
+    hidden = mixer.blend('blog.Post', is_published=False)
+    application = CommentStreamApplication(
+        not_found_application, CommentStreamHub()
+    )
+
+    async def scenario():
+        first = StreamClient(
+            application, f'/posts/{post.id}/comments/stream/'
+        )
+        assert (await first.start())['status'] == 200
+        second = StreamClient(
+            application, f'/posts/{post.id}/comments/stream/'
+        )
+        rejected = await second.start()
+        hidden_post = StreamClient(
+            application, f'/posts/{hidden.id}/comments/stream/'
+        )
+        await first.close()
+        return rejected, await hidden_post.start()
+
+    rejected, hidden_post = asyncio.run(scenario())
+    assert rejected['status'] == 503, (
+        'Убедитесь, что сверх COMMENT_STREAM_MAX_CONNECTIONS подключения'
+        ' отклоняются.'
+    )
+    assert hidden_post['status'] == 404
+
+
+def add_comment(post, user, text):
+    try:
+        return create_comment(post, user, text)
+    finally:
+        connections.close_all()
+
+
+@override_settings(
+    COMMENT_STREAM_POLL_INTERVAL=0.05, COMMENT_STREAM_QUEUE_SIZE=5
+)
+def test_new_subscriber_does_not_rewind_stream(
+        mixer, user, published_category, post_with_published_location
+):
+    busy = post_with_published_location
+    quiet = mixer.blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+    for number in range(10):
+        create_comment(busy, user, f'Старый {number}')
+    application = CommentStreamApplication(
+        not_found_application, CommentStreamHub()
+    )
+
+    async def scenario():
+        reader = StreamClient(
+            application, f'/posts/{busy.id}/comments/stream/'
+        )
+        await reader.start()
+        await reader.read_until('\n\n')
+        newcomer = StreamClient(
+            application, f'/posts/{quiet.id}/comments/stream/'
+        )
+        await newcomer.start()
+        await asyncio.sleep(0.3)
+        await sync_to_async(add_comment)(busy, user, 'Новый')
+        body = await reader.read_until('Новый')
+        await newcomer.close()
+        await reader.close()
+        return body
+
+    body = asyncio.run(scenario())
+    assert [event['id'] for event in events(body)] == [
+        Comment.objects.latest('pk').id
+    ], (
+        'Убедитесь, что подписка на публикацию без комментариев не'
+        ' заставляет поток повторять старые комментарии другим'
+        ' подписчикам и не закрывает их потоки.'
+    )
+
+
+@override_settings(COMMENT_STREAM_QUEUE_SIZE=2)
+def test_slow_listener_is_dropped():
+    listener = Listener()
+    for number in range(1, 5):
+        listener.offer({'id': number})
+    assert listener.overflowed
+    assert listener.queue.qsize() == 1
+    assert listener.queue.get_nowait() is None, (
+        'Убедитесь, что при переполнении очередь подписчика очищается и'
+        ' поток закрывается.'
+    )
+
+
+def test_listener_skips_sent_comments():
+    listener = Listener(last_id=3)
+    for number in range(1, 6):
+        listener.offer({'id': number})
+    assert [
+        listener.queue.get_nowait()['id'] for _ in range(2)
+    ] == [4, 5]
+    assert listener.queue.empty()
+
+
+def test_stream_fallback_without_asgi(
+        client, user, post_with_published_location
+):
+    post = post_with_published_location
+    first = create_comment(post, user, 'Первый')
+    second = create_comment(post, user, 'Второй')
+    url = f'/posts/{post.id}/comments/stream/'
+
+    response = client.get(url)
+    assert response['Content-Type'].startswith('text/event-stream')
+    body = response.content.decode()
+    assert f'id: {second.id}\n' in body and not events(body)
+
+    body = client.get(url, HTTP_LAST_EVENT_ID=str(first.id)).content.decode()
+    assert [event['id'] for event in events(body)] == [second.id], (
+        'Убедитесь, что без ASGI адрес потока отдаёт комментарии после'
+        ' Last-Event-ID.'
+    )
+    assert 'retry: ' in body
@@ -0,0 +1,132 @@
+import pytest
+from django.core.cache import cache
+from django.utils import timezone
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def test_list_pages_answer_not_modified(
+        unlogged_client, user, post_with_published_location
+):
+    post = post_with_published_location
+    for url in (
+        '/',
+        f'/category/{post.category.slug}/',
+        f'/profile/{user.username}/',
+    ):
+        response = unlogged_client.get(url)
+        assert response.status_code == 200
+        etag, last_modified = response['ETag'], response['Last-Modified']
+        assert 'Cookie' in response['Vary']
+        assert unlogged_client.get(
+            url, HTTP_IF_NONE_MATCH=etag
+        ).status_code == 304, (
+            f'Убедитесь, что страница `{url}` отвечает 304 на запрос с'
+            ' актуальным ETag.'
+        )
+        assert unlogged_client.get(
+            url, HTTP_IF_MODIFIED_SINCE=last_modified
+        ).status_code == 304, (
+            f'Убедитесь, что страница `{url}` отвечает 304 на запрос с'
+            ' актуальной датой Last-Modified.'
+        )
+
+
+def test_not_modified_skips_page_query(
+        unlogged_client, post_with_published_location,
+        django_assert_num_queries
+):
+    etag = unlogged_client.get('/')['ETag']
+    with django_assert_num_queries(1):
+        response = unlogged_client.get('/', HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 304, (
+        'Убедитесь, что для ответа 304 не выполняется запрос самой'
+        ' страницы.'
+    )
+
+
+def test_validators_change_with_content(
+        mixer, user, unlogged_client, post_with_published_location
+):
+    post = post_with_published_location
+    list_etag = unlogged_client.get('/')['ETag']
+    detail_etag = unlogged_client.get(f'/posts/{post.id}/')['ETag']
+    updated_at = post.updated_at
+
+    comment = mixer.blend('blog.Comment', post=post, author=user)
+    post.refresh_from_db()
+    assert post.updated_at > updated_at, (
+        'Убедитесь, что новый комментарий сдвигает время изменения'
+        ' публикации `updated_at`.'
+    )
+    response = unlogged_client.get(
+        f'/posts/{post.id}/', HTTP_IF_NONE_MATCH=detail_etag
+    )
+    assert response.status_code == 200, (
+        'Убедитесь, что ETag страницы публикации меняется после'
+        ' добавления комментария.'
+    )
+
+    updated_at = post.updated_at
+    comment.text = 'Исправленный комментарий'
+    comment.save()
+    post.refresh_from_db()
+    assert post.updated_at > updated_at, (
+        'Убедитесь, что правка комментария сдвигает время изменения'
+        ' публикации `updated_at`.'
+    )
+
+    mixer.blend('blog.Post', author=user, category=post.category)
+    assert unlogged_client.get(
+        '/', HTTP_IF_NONE_MATCH=list_etag
+    ).status_code == 200, (
+        'Убедитесь, что ETag ленты меняется после добавления публикации.'
+    )
+
+
+def test_validators_depend_on_viewer(
+        user_client, unlogged_client, post_with_published_location
+):
+    url = f'/posts/{post_with_published_location.id}/'
+    anonymous = unlogged_client.get(url)
+    # Первый ответ выставляет CSRF-куку, от которой зависит ETag.
+    user_client.get(url)
+    response = user_client.get(url)
+    assert 'Last-Modified' not in response, (
+        'Убедитесь, что авторизованным пользователям не отдаётся'
+        ' Last-Modified: он не различает пользователей.'
+    )
+    assert response['ETag'] != anonymous['ETag']
+    assert user_client.get(
+        url, HTTP_IF_NONE_MATCH=anonymous['ETag']
+    ).status_code == 200, (
+        'Убедитесь, что авторизованный пользователь не получает 304 на ETag'
+        ' страницы, показанной анониму.'
+    )
+    assert user_client.get(
+        url, HTTP_IF_NONE_MATCH=response['ETag']
+    ).status_code == 304
+
+
+def test_list_validators_follow_updated_at(
+        unlogged_client, post_with_published_location
+):
+    etag = unlogged_client.get('/')['ETag']
+    Post.objects.filter(pk=post_with_published_location.pk).update(
+        title='Новый заголовок', updated_at=timezone.now()
+    )
+    assert unlogged_client.get(
+        '/', HTTP_IF_NONE_MATCH=etag
+    ).status_code == 200, (
+        'Убедитесь, что ETag ленты меняется после правки публикации, даже'
+        ' если версии в кеше не сдвинулись.'
+    )
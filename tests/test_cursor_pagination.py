@@ -0,0 +1,57 @@
+import pytest
+from django.test import override_settings
+
+pytestmark = [pytest.mark.django_db]
+
+
+def walk_pages(client, url):
+    pages = [client.get(url).context['page_obj']]
+    while pages[-1].has_next():
+        pages.append(
+            client.get(f'{url}?cursor={pages[-1].next_cursor}')
+            .context['page_obj']
+        )
+    return pages
+
+
+@override_settings(CURSOR_PAGINATION=True)
+def test_cursor_pagination(
+        user, user_client, unlogged_client,
+        many_posts_with_published_locations, published_category,
+        django_assert_num_queries
+):
+    posts = sorted(
+        many_posts_with_published_locations,
+        key=lambda post: (post.pub_date, post.id),
+        reverse=True,
+    )
+    for url in (
+        '/',
+        f'/category/{published_category.slug}/',
+        f'/profile/{user.username}/',
+    ):
+        pages = walk_pages(user_client, url)
+        assert [post.id for page in pages for post in page] == [
+            post.id for post in posts
+        ], (
+            f'Убедитесь, что курсорная пагинация на странице `{url}` '
+            'выдаёт все публикации по одному разу и в порядке «от новых к '
+            'старым».'
+        )
+        assert not pages[0].has_previous()
+
+        previous = user_client.get(
+            f'{url}?cursor={pages[-1].previous_cursor}'
+        ).context['page_obj']
+        assert list(previous) == list(pages[-2])
+
+    # Страница по курсору не считает публикации: второй запрос нужен
+    # только для ETag и Last-Modified.
+    with django_assert_num_queries(2):
+        unlogged_client.get(f'/?cursor={pages[0].next_cursor}')
+
+
+@override_settings(CURSOR_PAGINATION=True)
+def test_invalid_cursor(user_client):
+    response = user_client.get('/?cursor=not-a-cursor')
+    assert response.status_code == 404
@@ -0,0 +1,139 @@
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.caching import purge_tags
+from blog.paginators import COUNT_LOCK_KEY, EstimatedCountPaginator
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+    return response, [
+        query['sql'] for query in queries if 'COUNT(' in query['sql']
+    ]
+
+
+def test_small_lists_are_counted_exactly(
+        unlogged_client, many_posts_with_published_locations
+):
+    response, counts = count_queries(unlogged_client, '/')
+    assert response.context['paginator'].count == len(
+        many_posts_with_published_locations
+    )
+    assert len(counts) == 1 and 'LIMIT' in counts[0], (
+        'Убедитесь, что число публикаций небольшой ленты считается одним'
+        ' запросом, ограниченным LIMIT.'
+    )
+
+
+@override_settings(PAGINATOR_EXACT_COUNT_LIMIT=5)
+def test_large_counts_are_cached(
+        mixer, user, unlogged_client, published_category,
+        many_posts_with_published_locations
+):
+    total = len(many_posts_with_published_locations)
+    response, counts = count_queries(unlogged_client, '/')
+    assert response.context['paginator'].count == total
+    assert len(counts) == 2
+
+    later = timezone.now() + timedelta(minutes=2)
+    with mock.patch('django.utils.timezone.now', return_value=later):
+        response, counts = count_queries(unlogged_client, '/?page=2')
+    assert response.status_code == 200
+    assert not counts, (
+        'Убедитесь, что число публикаций большой ленты берётся из кеша,'
+        ' без COUNT(*), и после сдвига границы публикации.'
+    )
+    assert response.context['paginator'].count == total
+
+    mixer.blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=timezone.now() - timedelta(days=1),
+    )
+    response, counts = count_queries(unlogged_client, '/')
+    assert response.context['paginator'].count == total + 1, (
+        'Убедитесь, что число публикаций пересчитывается после изменения'
+        ' ленты.'
+    )
+
+
+@override_settings(PAGINATOR_EXACT_COUNT_LIMIT=5)
+def test_stale_count_is_served_during_recount(
+        unlogged_client, many_posts_with_published_locations
+):
+    total = len(many_posts_with_published_locations)
+    count_queries(unlogged_client, '/')
+    purge_tags('feed')
+    assert cache.add(COUNT_LOCK_KEY.format('feed'), True)
+    response, counts = count_queries(unlogged_client, '/')
+    assert not counts, (
+        'Убедитесь, что пока число пересчитывает другой процесс, отдаётся'
+        ' прежнее значение без COUNT(*).'
+    )
+    assert response.context['paginator'].count == total
+
+    cache.delete(COUNT_LOCK_KEY.format('feed'))
+    purge_tags('feed')
+    response, counts = count_queries(unlogged_client, '/')
+    assert len(counts) == 2
+    assert not cache.get(COUNT_LOCK_KEY.format('feed')), (
+        'Убедитесь, что блокировка пересчёта снимается.'
+    )
+
+
+def test_elided_page_range():
+    paginator = EstimatedCountPaginator(range(1000), 10)
+    assert list(paginator.page(50).elided_page_range()) == [
+        1, paginator.ELLIPSIS, 48, 49, 50, 51, 52, paginator.ELLIPSIS, 100,
+    ], 'Убедитесь, что пагинатор показывает только окно номеров страниц.'
+    assert list(paginator.page(1).elided_page_range()) == [
+        1, 2, 3, paginator.ELLIPSIS, 100,
+    ]
+
+
+def test_paginator_renders_window(
+        monkeypatch, unlogged_client, many_posts_with_published_locations
+):
+    monkeypatch.setattr(EstimatedCountPaginator, 'count', 1000)
+    content = unlogged_client.get('/?page=50').content.decode('utf-8')
+    assert content.count('class="page-item') < 15, (
+        'Убедитесь, что пагинатор не выводит ссылку на каждую страницу.'
+    )
+    for number in (1, 49, 51, 100):
+        assert f'page={number}"' in content
+    assert 'page=2"' not in content
+
+
+@override_settings(PAGINATOR_EXACT_COUNT_LIMIT=5)
+def test_cold_count_respects_lock(
+        unlogged_client, many_posts_with_published_locations
+):
+    assert cache.add(COUNT_LOCK_KEY.format('feed'), True)
+    response, counts = count_queries(unlogged_client, '/')
+    assert len(counts) == 1 and 'LIMIT' in counts[0], (
+        'Убедитесь, что без числа в кеше процесс, не взявший блокировку,'
+        ' считает только COUNT с LIMIT.'
+    )
+    assert response.context['paginator'].count == 6
+    assert cache.get(COUNT_LOCK_KEY.format('feed')), (
+        'Убедитесь, что процесс не снимает чужую блокировку пересчёта.'
+    )
@@ -0,0 +1,106 @@
+import json
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog.export import export_posts_ndjson, get_export_queryset
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def parse_ndjson(text):
+    return [json.loads(line) for line in text.splitlines()]
+
+
+def test_export_command(
+        mixer, many_posts_with_published_locations, another_category
+):
+    posts = many_posts_with_published_locations
+    Post.objects.filter(pk__in=[post.pk for post in posts]).update(
+        pub_date=timezone.now() - timedelta(days=1)
+    )
+    comments = mixer.cycle(3).blend('blog.Comment', post=posts[0])
+    other = mixer.blend(
+        'blog.Post',
+        category=another_category,
+        pub_date=timezone.now() - timedelta(days=30),
+    )
+    mixer.blend('blog.Post', is_published=False)
+
+    out = StringIO()
+    call_command('export_posts', stdout=out, chunk_size=7)
+    exported = parse_ndjson(out.getvalue())
+    assert sorted(post['id'] for post in exported) == sorted(
+        [post.id for post in posts] + [other.id]
+    ), (
+        'Убедитесь, что команда `export_posts` выгружает все опубликованные'
+        ' публикации по одной на строку.'
+    )
+    first = next(post for post in exported if post['id'] == posts[0].id)
+    assert [comment['id'] for comment in first['comments']] == [
+        comment.id for comment in comments
+    ], 'Убедитесь, что в выгрузку попадают комментарии публикации.'
+    assert first['category']['slug'] == posts[0].category.slug
+    assert first['author']['username'] == posts[0].author.username
+
+    out = StringIO()
+    call_command(
+        'export_posts', stdout=out, category=another_category.slug
+    )
+    assert [post['id'] for post in parse_ndjson(out.getvalue())] == [
+        other.id
+    ], 'Убедитесь, что выгрузку можно ограничить категорией.'
+
+    out = StringIO()
+    call_command(
+        'export_posts',
+        stdout=out,
+        until=(timezone.now() - timedelta(days=29)).date(),
+    )
+    assert [post['id'] for post in parse_ndjson(out.getvalue())] == [
+        other.id
+    ], 'Убедитесь, что выгрузку можно ограничить датами публикации.'
+
+
+def test_export_reads_in_chunks(
+        mixer, many_posts_with_published_locations,
+        django_assert_num_queries
+):
+    for post in many_posts_with_published_locations:
+        mixer.cycle(2).blend('blog.Comment', post=post)
+    with django_assert_num_queries(1 + 4):
+        lines = list(
+            export_posts_ndjson(get_export_queryset(), chunk_size=5)
+        )
+    assert len(lines) == len(many_posts_with_published_locations), (
+        'Убедитесь, что комментарии выгружаются одним запросом на порцию'
+        ' публикаций, а не отдельным запросом на каждую публикацию.'
+    )
+
+
+def test_export_view(
+        admin_client, user_client, unlogged_client,
+        post_with_published_location
+):
+    for client in (user_client, unlogged_client):
+        assert client.get('/export/posts/').status_code == 302, (
+            'Убедитесь, что выгрузка доступна только сотрудникам.'
+        )
+    response = admin_client.get('/export/posts/')
+    assert response.status_code == 200
+    assert response.streaming, (
+        'Убедитесь, что выгрузка отдаётся потоком через'
+        ' `StreamingHttpResponse`.'
+    )
+    assert response['Content-Type'].startswith('application/x-ndjson')
+    body = b''.join(response.streaming_content).decode('utf-8')
+    assert [post['id'] for post in parse_ndjson(body)] == [
+        post_with_published_location.id
+    ]
+    assert admin_client.get(
+        '/export/posts/', {'since': 'вчера'}
+    ).status_code == 400
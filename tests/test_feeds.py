@@ -0,0 +1,94 @@
+import pytest
+from django.core.cache import cache
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def test_feeds_list_published_posts(
+        mixer, unlogged_client, user, post_with_published_location
+):
+    post = post_with_published_location
+    hidden = mixer.blend(
+        'blog.Post', author=user, category=post.category, is_published=False
+    )
+    for url, content_type in (
+        ('/feeds/rss/', 'application/rss+xml'),
+        ('/feeds/atom/', 'application/atom+xml'),
+        (f'/category/{post.category.slug}/rss/', 'application/rss+xml'),
+        (f'/category/{post.category.slug}/atom/', 'application/atom+xml'),
+        (f'/profile/{user.username}/rss/', 'application/rss+xml'),
+        (f'/profile/{user.username}/atom/', 'application/atom+xml'),
+    ):
+        response = unlogged_client.get(url)
+        assert response.status_code == 200, (
+            f'Убедитесь, что лента `{url}` доступна.'
+        )
+        assert response['Content-Type'].startswith(content_type)
+        body = response.content.decode('utf-8')
+        assert f'/posts/{post.id}/' in body, (
+            f'Убедитесь, что в ленту `{url}` попадают опубликованные'
+            ' публикации.'
+        )
+        assert f'/posts/{hidden.id}/' not in body, (
+            f'Убедитесь, что в ленту `{url}` не попадают снятые с'
+            ' публикации записи.'
+        )
+
+
+def test_feed_of_hidden_category_is_not_found(
+        mixer, unlogged_client
+):
+    category = mixer.blend('blog.Category', is_published=False)
+    assert unlogged_client.get(
+        f'/category/{category.slug}/rss/'
+    ).status_code == 404
+
+
+def test_feed_conditional_get(
+        unlogged_client, post_with_published_location,
+        django_assert_num_queries
+):
+    response = unlogged_client.get('/feeds/rss/')
+    etag, last_modified = response['ETag'], response['Last-Modified']
+
+    with django_assert_num_queries(0):
+        cached = unlogged_client.get('/feeds/rss/')
+    assert cached.content == response.content, (
+        'Убедитесь, что тело ленты берётся из кеша без запросов к базе.'
+    )
+
+    assert unlogged_client.get(
+        '/feeds/rss/', HTTP_IF_NONE_MATCH=etag
+    ).status_code == 304, (
+        'Убедитесь, что лента отвечает 304 на запрос с актуальным ETag.'
+    )
+    assert unlogged_client.get(
+        '/feeds/rss/', HTTP_IF_MODIFIED_SINCE=last_modified
+    ).status_code == 304, (
+        'Убедитесь, что лента отвечает 304 на запрос с актуальной датой'
+        ' Last-Modified.'
+    )
+
+
+def test_feed_is_invalidated_by_post_changes(
+        unlogged_client, post_with_published_location
+):
+    post = post_with_published_location
+    url = f'/category/{post.category.slug}/atom/'
+    etag = unlogged_client.get(url)['ETag']
+
+    post.title = 'Новый заголовок'
+    post.save()
+    response = unlogged_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == 200, (
+        'Убедитесь, что кеш ленты сбрасывается при изменении публикации.'
+    )
+    assert 'Новый заголовок' in response.content.decode('utf-8')
+    assert response['ETag'] != etag
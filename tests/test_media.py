@@ -0,0 +1,172 @@
+from datetime import timedelta
+from http import HTTPStatus
+from io import BytesIO
+
+import pytest
+from django.core.checks import run_checks
+from django.core.files.images import ImageFile
+from django.test import override_settings
+from django.utils import timezone
+from PIL import Image
+
+from blog.images import update_variants
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def media_root(tmp_path):
+    with override_settings(MEDIA_ROOT=tmp_path, MEDIA_SERVE_MODE='django'):
+        yield tmp_path
+
+
+def make_post(mixer, author, category, is_published=True):
+    img_io = BytesIO()
+    Image.new('RGB', (1000, 500), color=(73, 109, 137)).save(
+        img_io, format='JPEG'
+    )
+    post = mixer.blend(
+        'blog.Post',
+        author=author,
+        category=category,
+        is_published=is_published,
+        pub_date=timezone.now() - timedelta(days=1),
+        image=ImageFile(img_io, name='media_image.jpg'),
+    )
+    update_variants(post)
+    return post
+
+
+@pytest.fixture
+def published_post(media_root, mixer, user, published_category):
+    return make_post(mixer, user, published_category)
+
+
+@pytest.fixture
+def hidden_post(media_root, mixer, user, published_category):
+    return make_post(mixer, user, published_category, is_published=False)
+
+
+def test_published_image(
+        published_post, media_root, unlogged_client,
+        django_assert_num_queries
+):
+    with django_assert_num_queries(1):
+        response = unlogged_client.get(published_post.image.url)
+    assert response.status_code == HTTPStatus.OK
+    assert response['Content-Type'] == 'image/jpeg'
+    assert response['Cache-Control'].startswith('public, max-age=')
+    assert response['Accept-Ranges'] == 'bytes'
+    content = (media_root / published_post.image.name).read_bytes()
+    assert b''.join(response.streaming_content) == content
+    repeated = unlogged_client.get(
+        published_post.image.url, HTTP_IF_NONE_MATCH=response['ETag']
+    )
+    assert repeated.status_code == HTTPStatus.NOT_MODIFIED, (
+        'Убедитесь, что повторный запрос фото с If-None-Match получает'
+        ' ответ 304.'
+    )
+
+
+def test_published_image_variant(published_post, unlogged_client):
+    variant = published_post.image_variants['variants'][0]['webp']
+    response = unlogged_client.get(f'/media/{variant}')
+    assert response.status_code == HTTPStatus.OK, (
+        'Убедитесь, что уменьшенные копии фото опубликованного поста'
+        ' доступны всем.'
+    )
+    assert response['Content-Type'] == 'image/webp'
+
+
+@pytest.mark.parametrize(
+    'header, expected',
+    (('bytes=0-9', slice(0, 10)), ('bytes=-5', slice(-5, None))),
+)
+def test_image_range(
+        published_post, media_root, unlogged_client, header, expected
+):
+    content = (media_root / published_post.image.name).read_bytes()
+    response = unlogged_client.get(
+        published_post.image.url, HTTP_RANGE=header
+    )
+    assert response.status_code == HTTPStatus.PARTIAL_CONTENT
+    body = b''.join(response.streaming_content)
+    assert body == content[expected]
+    assert response['Content-Length'] == str(len(body))
+    assert response['Content-Range'].endswith(f'/{len(content)}')
+
+
+def test_image_range_not_satisfiable(published_post, unlogged_client):
+    response = unlogged_client.get(
+        published_post.image.url, HTTP_RANGE='bytes=100000000-'
+    )
+    assert response.status_code == HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE
+
+
+def test_image_range_for_changed_file(published_post, unlogged_client):
+    response = unlogged_client.get(
+        published_post.image.url,
+        HTTP_RANGE='bytes=0-9',
+        HTTP_IF_RANGE='"outdated"',
+    )
+    assert response.status_code == HTTPStatus.OK, (
+        'Убедитесь, что при несовпадении If-Range файл отдаётся целиком.'
+    )
+
+
+def test_hidden_image(
+        hidden_post, unlogged_client, another_user_client, user_client
+):
+    urls = (
+        hidden_post.image.url,
+        '/media/' + hidden_post.image_variants['variants'][0]['fallback'],
+    )
+    for url in urls:
+        for client in (unlogged_client, another_user_client):
+            assert client.get(url).status_code == HTTPStatus.NOT_FOUND, (
+                'Убедитесь, что фото неопубликованного поста видит только'
+                ' его автор.'
+            )
+        response = user_client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        assert response['Cache-Control'] == 'private, no-cache'
+
+
+def test_unknown_media(media_root, unlogged_client):
+    (media_root / 'orphan.jpg').write_bytes(b'orphan')
+    for url in ('/media/orphan.jpg', '/media/../manage.py'):
+        assert unlogged_client.get(url).status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.parametrize(
+    'mode, header, value',
+    (
+        (
+            'x-accel-redirect',
+            'X-Accel-Redirect',
+            '/protected-media/{name}',
+        ),
+        ('x-sendfile', 'X-Sendfile', '{root}/{name}'),
+    ),
+)
+def test_offloaded_image(
+        published_post, media_root, unlogged_client, mode, header, value
+):
+    with override_settings(MEDIA_SERVE_MODE=mode):
+        response = unlogged_client.get(published_post.image.url)
+    assert response.status_code == HTTPStatus.OK
+    assert response[header] == value.format(
+        root=media_root, name=published_post.image.name
+    ), (
+        f'Убедитесь, что при MEDIA_SERVE_MODE = {mode!r} файл отдаёт'
+        f' веб-сервер по заголовку {header}.'
+    )
+    assert response.content == b''
+    assert response['Content-Type'] == 'image/jpeg'
+    assert response['Cache-Control'].startswith('public')
+
+
+def test_media_serve_mode_check():
+    with override_settings(MEDIA_SERVE_MODE='nginx'):
+        errors = run_checks()
+    assert 'blog.E002' in [error.id for error in errors]
@@ -0,0 +1,68 @@
+import re
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test.client import AsyncClient
+
+from blog.metrics import registry
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def clean_registry():
+    registry.reset()
+    yield registry
+    registry.reset()
+
+
+def test_metrics_per_view(
+        clean_registry, admin_client, unlogged_client,
+        post_with_published_location
+):
+    unlogged_client.get('/')
+    unlogged_client.get('/')
+    unlogged_client.get(f'/posts/{post_with_published_location.id}/')
+
+    response = admin_client.get('/metrics/')
+    assert response.status_code == 200
+    assert response['Content-Type'].startswith('text/plain; version=0.0.4')
+    body = response.content.decode('utf-8')
+    assert 'blog_request_duration_seconds_count{view="blog:index"} 2' in body
+    assert (
+        'blog_request_duration_seconds_count{view="blog:post_detail"} 1'
+        in body
+    ), 'Убедитесь, что метрики собираются отдельно по представлениям.'
+    queries = re.search(r'blog_sql_queries_sum\{view="blog:index"\} (\d+)', body)
+    assert queries and int(queries.group(1)) >= 2
+    render = re.search(
+        r'blog_template_render_seconds_sum\{view="blog:index"\} ([\d.e-]+)',
+        body,
+    )
+    assert render and float(render.group(1)) > 0
+    assert 'blog_sql_queries_bucket{view="blog:index",le="+Inf"} 2' in body
+
+
+def test_sync_view_queries_are_counted_under_asgi(
+        settings, clean_registry, post_with_published_location
+):
+    # Без debug_toolbar вся цепочка middleware асинхронная, а синхронное
+    # представление выполняется в потоке sync_to_async.
+    settings.MIDDLEWARE = [
+        name for name in settings.MIDDLEWARE if 'debug_toolbar' not in name
+    ]
+    client = AsyncClient()
+    response = async_to_sync(client.get)('/')
+    assert response.status_code == 200
+    queries = registry.families['blog_sql_queries'].by_view['blog:index']
+    assert queries.sum >= 2, (
+        'Убедитесь, что под ASGI учитываются SQL-запросы синхронных'
+        ' представлений.'
+    )
+
+
+def test_metrics_are_staff_only(user_client, unlogged_client):
+    for client in (user_client, unlogged_client):
+        assert client.get('/metrics/').status_code == 302, (
+            'Убедитесь, что метрики доступны только сотрудникам.'
+        )
@@ -0,0 +1,86 @@
+import pytest
+from django.test import override_settings
+
+from blog.caching import page_cache_stats
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.usefixtures('post_with_published_location'),
+]
+
+
+def page_urls(post):
+    return {
+        'index': '/',
+        'category': f'/category/{post.category.slug}/',
+        'profile': f'/profile/{post.author.username}/',
+    }
+
+
+def cache_states(client, urls):
+    return {
+        name: client.get(url)['X-Page-Cache'] for name, url in urls.items()
+    }
+
+
+@override_settings(ANONYMOUS_PAGE_CACHE=True)
+def test_anonymous_pages_are_cached(
+        unlogged_client, user_client, post_with_published_location
+):
+    urls = page_urls(post_with_published_location)
+    before = page_cache_stats()
+    assert set(cache_states(unlogged_client, urls).values()) == {'miss'}
+    assert set(cache_states(unlogged_client, urls).values()) == {'hit'}, (
+        'Убедитесь, что страницы для анонимных пользователей кешируются.'
+    )
+    after = page_cache_stats()
+    assert after['hits'] - before['hits'] == 3
+    assert after['misses'] - before['misses'] == 3
+
+    response = user_client.get('/')
+    assert 'X-Page-Cache' not in response, (
+        'Убедитесь, что авторизованные пользователи не получают страницы'
+        ' из кеша.'
+    )
+
+
+@override_settings(ANONYMOUS_PAGE_CACHE=True)
+def test_post_edit_purges_only_its_pages(
+        mixer, unlogged_client, another_user, post_with_published_location
+):
+    post = post_with_published_location
+    other = mixer.blend(
+        'blog.Post', author=another_user, category__is_published=True
+    )
+    urls = page_urls(post)
+    other_urls = {
+        'category': f'/category/{other.category.slug}/',
+        'profile': f'/profile/{another_user.username}/',
+    }
+    cache_states(unlogged_client, urls)
+    cache_states(unlogged_client, other_urls)
+
+    post.title = 'Изменённый заголовок'
+    post.save()
+
+    assert set(cache_states(unlogged_client, urls).values()) == {'miss'}, (
+        'Убедитесь, что изменение публикации сбрасывает кеш главной'
+        ' страницы, страницы её категории и профиля её автора.'
+    )
+    assert set(cache_states(unlogged_client, other_urls).values()) == {
+        'hit'
+    }, (
+        'Убедитесь, что изменение публикации не сбрасывает кеш страниц'
+        ' других категорий и авторов.'
+    )
+    assert 'Изменённый заголовок' in unlogged_client.get('/').content.decode()
+
+
+@override_settings(ANONYMOUS_PAGE_CACHE=True)
+def test_comment_purges_post_pages(
+        mixer, unlogged_client, post_with_published_location
+):
+    urls = page_urls(post_with_published_location)
+    cache_states(unlogged_client, urls)
+    mixer.blend('blog.Comment', post=post_with_published_location)
+    assert set(cache_states(unlogged_client, urls).values()) == {'miss'}
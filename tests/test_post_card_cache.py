@@ -0,0 +1,66 @@
+import pytest
+from django.core.cache import cache
+from django.utils import timezone
+
+from blog.caching import post_card_cache_key
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_post_card_is_cached(unlogged_client, post_with_published_location):
+    post = post_with_published_location
+    unlogged_client.get('/')
+    assert cache.get(post_card_cache_key(post, False)), (
+        'Убедитесь, что карточка публикации сохраняется в кеш.'
+    )
+
+
+@pytest.mark.parametrize('change', ['post', 'category', 'location', 'user'])
+def test_post_card_invalidation(
+        change, unlogged_client, post_with_published_location
+):
+    post = post_with_published_location
+    unlogged_client.get('/')
+    if change == 'post':
+        post.title = 'Новый заголовок'
+        post.save()
+    elif change == 'category':
+        post.category.title = 'Новый заголовок'
+        post.category.save()
+    elif change == 'location':
+        post.location.name = 'Новый заголовок'
+        post.location.save()
+    else:
+        post.author.username = 'Новый_заголовок'
+        post.author.save()
+    content = unlogged_client.get('/').content.decode('utf-8')
+    assert 'Новый' in content, (
+        'Убедитесь, что кеш карточки публикации сбрасывается при изменении'
+        f' связанного объекта `{change}`.'
+    )
+
+
+def test_post_card_invalidation_on_comment(
+        mixer, unlogged_client, post_with_published_location
+):
+    post = post_with_published_location
+    key = post_card_cache_key(post, False)
+    unlogged_client.get('/')
+    mixer.blend('blog.Comment', post=post)
+    assert post_card_cache_key(post, False) != key
+
+
+def test_post_card_invalidation_without_signals(
+        unlogged_client, post_with_published_location
+):
+    post = post_with_published_location
+    unlogged_client.get('/')
+    Post.objects.filter(pk=post.pk).update(
+        title='Новый заголовок', updated_at=timezone.now()
+    )
+    content = unlogged_client.get('/').content.decode('utf-8')
+    assert 'Новый заголовок' in content, (
+        'Убедитесь, что карточка публикации сбрасывается по updated_at,'
+        ' а не только по версиям в кеше процесса.'
+    )
@@ -0,0 +1,155 @@
+from datetime import timedelta
+from io import BytesIO
+from unittest import mock
+
+import pytest
+from bs4 import BeautifulSoup
+from django.conf import settings
+from django.core.files.images import ImageFile
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+from PIL import Image
+
+from blog.models import ImageJob
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def media_root(tmp_path):
+    with override_settings(MEDIA_ROOT=tmp_path):
+        yield tmp_path
+
+
+def wide_image(width=2000, height=1000, exif=None):
+    img_io = BytesIO()
+    image = Image.new('RGB', (width, height), color=(73, 109, 137))
+    image.save(img_io, format='JPEG', exif=exif or b'')
+    return ImageFile(img_io, name='wide_image.jpg')
+
+
+def process_jobs():
+    call_command('process_image_jobs', '--once', '--concurrency', '1')
+
+
+def test_variants_generated_on_upload(
+        media_root, mixer, user, published_category, unlogged_client
+):
+    post = mixer.blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        image=wide_image(),
+    )
+    job = ImageJob.objects.get(post=post)
+    assert job.status == ImageJob.PENDING, (
+        'Убедитесь, что обработка изображения ставится в очередь.'
+    )
+    soup = BeautifulSoup(unlogged_client.get('/').content, 'html.parser')
+    assert not soup.find('img', src=post.image.url).get('srcset'), (
+        'Убедитесь, что до обработки показывается оригинал изображения.'
+    )
+
+    process_jobs()
+    job.refresh_from_db()
+    assert job.status == ImageJob.DONE
+    post.refresh_from_db()
+    meta = post.image_variants
+    assert (meta['width'], meta['height']) == (2000, 1000)
+    assert [v['width'] for v in meta['variants']] == [640, 960, 1280, 1920]
+    for variant in meta['variants']:
+        assert (media_root / variant['fallback']).exists()
+        assert (media_root / variant['webp']).exists()
+        with Image.open(media_root / variant['webp']) as image:
+            assert image.format == 'WEBP'
+            assert image.size == (variant['width'], variant['height'])
+
+    for url in ('/', f'/posts/{post.id}/'):
+        soup = BeautifulSoup(unlogged_client.get(url).content, 'html.parser')
+        img = soup.find('img', src=post.image.url)
+        assert img['loading'] == 'lazy'
+        assert img['width'] == '2000' and img['height'] == '1000'
+        assert '640w' in img['srcset'], (
+            'Убедитесь, что в карточке публикации указан `srcset`'
+            ' с уменьшенными копиями изображения.'
+        )
+        assert soup.find('source', type='image/webp')
+
+
+def test_backfill_command(media_root, mixer, user, published_category):
+    post = mixer.blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        image=wide_image(),
+    )
+    type(post).objects.filter(pk=post.pk).update(image_variants={})
+    call_command('generate_image_variants')
+    post.refresh_from_db()
+    assert len(post.image_variants['variants']) == 4
+
+
+def test_exif_is_stripped(media_root, mixer, user, published_category):
+    exif = Image.Exif()
+    exif[0x010F] = 'Camera maker'
+    post = mixer.blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        image=wide_image(exif=exif.tobytes()),
+    )
+    with Image.open(media_root / post.image.name) as image:
+        assert image.getexif()
+    process_jobs()
+    post.refresh_from_db()
+    with Image.open(media_root / post.image.name) as image:
+        assert not image.getexif(), (
+            'Убедитесь, что при обработке из изображения удаляются'
+            ' EXIF-метаданные.'
+        )
+
+
+@override_settings(IMAGE_JOB_MAX_ATTEMPTS=2, IMAGE_JOB_RETRY_DELAY=0)
+def test_failed_job_is_retried(media_root, mixer, user, published_category):
+    post = mixer.blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        image=wide_image(),
+    )
+    with mock.patch(
+        'blog.images.generate_variants', side_effect=OSError('disk full')
+    ) as generate:
+        process_jobs()
+    job = ImageJob.objects.get(post=post)
+    assert generate.call_count == 2, (
+        'Убедитесь, что неудачная задача обработки повторяется.'
+    )
+    assert job.status == ImageJob.FAILED
+    assert 'disk full' in job.last_error
+
+
+@override_settings(IMAGE_JOB_MAX_ATTEMPTS=2)
+def test_stale_job_attempts_are_limited(
+        media_root, mixer, user, published_category
+):
+    post = mixer.blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        image=wide_image(),
+    )
+    stale = timezone.now() - timedelta(seconds=settings.IMAGE_JOB_TIMEOUT)
+    ImageJob.objects.filter(post=post).update(
+        status=ImageJob.RUNNING, locked_at=stale, attempts=2
+    )
+    with mock.patch('blog.images.generate_variants') as generate:
+        process_jobs()
+    job = ImageJob.objects.get(post=post)
+    assert not generate.called, (
+        'Убедитесь, что зависшая задача без оставшихся попыток не'
+        ' забирается заново.'
+    )
+    assert job.status == ImageJob.FAILED
+    assert job.last_error
@@ -0,0 +1,138 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from django.conf import settings
+from django.core.checks import run_checks
+from django.test import override_settings
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent / 'blogicum'
+
+PROBE = '''
+import json
+import django
+django.setup()
+from django.conf import settings
+from django.template import engines
+from blogicum import urls
+loader = engines['django'].engine.template_loaders[0]
+print(json.dumps({
+    'debug': settings.DEBUG,
+    'apps': settings.INSTALLED_APPS,
+    'middleware': settings.MIDDLEWARE,
+    'conn_max_age': settings.DATABASES['default'].get('CONN_MAX_AGE', 0),
+    'cache': settings.CACHES['default']['BACKEND'],
+    'loader': type(loader).__module__,
+    'cached': sorted(getattr(loader, 'get_template_cache', ())),
+    'urls': [str(pattern.pattern) for pattern in urls.urlpatterns],
+}))
+'''
+
+
+def run_probe(environment, **variables):
+    return subprocess.run(
+        (sys.executable, '-c', PROBE),
+        cwd=PROJECT_DIR,
+        env={
+            **{
+                name: value
+                for name, value in os.environ.items()
+                if name != 'BLOGICUM_SECRET_KEY'
+            },
+            'DJANGO_SETTINGS_MODULE': 'blogicum.settings',
+            'BLOGICUM_ENV': environment,
+            **variables,
+        },
+        capture_output=True,
+        text=True,
+    )
+
+
+def probe_settings(environment, **variables):
+    if environment == 'production':
+        variables.setdefault('BLOGICUM_SECRET_KEY', 'production-secret')
+    probe = run_probe(environment, **variables)
+    probe.check_returncode()
+    return json.loads(probe.stdout)
+
+
+def test_production_profile():
+    production = probe_settings('production')
+    assert production['debug'] is False
+    assert not any(
+        name.startswith('debug_toolbar')
+        for name in production['apps'] + production['middleware']
+    ), (
+        'Убедитесь, что в профиле production debug toolbar не подключена'
+        ' ни в INSTALLED_APPS, ни в MIDDLEWARE.'
+    )
+    assert '__debug__/' not in production['urls']
+    assert production['loader'] == 'django.template.loaders.cached', (
+        'Убедитесь, что в профиле production шаблоны загружаются'
+        ' кеширующим загрузчиком.'
+    )
+    assert production['conn_max_age'] > 0, (
+        'Убедитесь, что в профиле production соединения с базой'
+        ' переиспользуются между запросами.'
+    )
+    assert not production['cache'].endswith('.LocMemCache'), (
+        'Убедитесь, что в профиле production кеш общий для всех процессов.'
+    )
+    assert {'base.html', 'blog/post_detail.html', 'pages/404.html'} <= set(
+        production['cached']
+    ), (
+        'Убедитесь, что в профиле production шаблоны компилируются при'
+        ' запуске.'
+    )
+
+
+def test_production_requires_secret_key():
+    probe = run_probe('production')
+    assert probe.returncode != 0
+    assert 'BLOGICUM_SECRET_KEY' in probe.stderr, (
+        'Убедитесь, что профиль production не запускается без'
+        ' BLOGICUM_SECRET_KEY.'
+    )
+
+
+def test_production_cache_backend(tmp_path):
+    backend = 'django.core.cache.backends.filebased.FileBasedCache'
+    production = probe_settings(
+        'production',
+        BLOGICUM_CACHE_BACKEND=backend,
+        BLOGICUM_CACHE_LOCATION=str(tmp_path),
+    )
+    assert production['cache'] == backend
+    probe = run_probe(
+        'production',
+        BLOGICUM_SECRET_KEY='production-secret',
+        BLOGICUM_CACHE_BACKEND=(
+            'django.core.cache.backends.locmem.LocMemCache'
+        ),
+    )
+    assert probe.returncode != 0
+    assert 'BLOGICUM_CACHE_BACKEND' in probe.stderr, (
+        'Убедитесь, что профиль production не запускается с кешем,'
+        ' который у каждого процесса свой.'
+    )
+
+
+def test_development_profile_is_default():
+    development = probe_settings('development')
+    assert development['debug'] is True
+    assert 'debug_toolbar' in development['apps']
+    assert '__debug__/' in development['urls']
+
+
+def test_broken_template_is_reported(tmp_path):
+    (tmp_path / 'broken.html').write_text('{% if %}', encoding='utf-8')
+    templates = [{**settings.TEMPLATES[0], 'DIRS': [tmp_path]}]
+    with override_settings(TEMPLATES=templates, TEMPLATES_DIR=tmp_path):
+        errors = run_checks(tags=['templates'])
+    assert [error.id for error in errors] == ['blog.E001'], (
+        'Убедитесь, что проверка при запуске сообщает о шаблонах, которые'
+        ' не компилируются.'
+    )
+    assert 'broken.html' in errors[0].msg
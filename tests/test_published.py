@@ -0,0 +1,68 @@
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.test import override_settings
+from django.utils import timezone
+
+from blog.models import Post, get_publication_cutoff
+
+pytestmark = [pytest.mark.django_db]
+
+
+@override_settings(PUBLISHED_CUTOFF_GRANULARITY=60)
+def test_publication_cutoff_is_rounded():
+    now = timezone.now().replace(second=42, microsecond=123)
+    cutoff = get_publication_cutoff(now)
+    assert cutoff == now.replace(second=0, microsecond=0)
+    assert get_publication_cutoff(now + timedelta(seconds=10)) == cutoff, (
+        'Убедитесь, что граница публикации одинакова в пределах одного окна.'
+    )
+
+
+def test_scheduled_post_appears_without_restart(
+        mixer, user, published_category, unlogged_client
+):
+    post = mixer.blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        pub_date=timezone.now() + timedelta(hours=1),
+    )
+    assert post not in Post.objects.published()
+    assert post not in unlogged_client.get('/').context['page_obj']
+
+    later = timezone.now() + timedelta(hours=2)
+    assert post in Post.objects.published(now=later)
+    with mock.patch('django.utils.timezone.now', return_value=later):
+        page_obj = unlogged_client.get('/').context['page_obj']
+    assert post in page_obj, (
+        'Убедитесь, что отложенная публикация появляется на главной'
+        ' странице, когда наступает время её публикации.'
+    )
+
+
+@override_settings(PUBLISHED_CUTOFF_GRANULARITY=60)
+def test_post_detail_uses_publication_cutoff(
+        mixer, user, published_category, unlogged_client
+):
+    now = timezone.now().replace(second=42) - timedelta(hours=1)
+    post = mixer.blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        is_published=True,
+        pub_date=now.replace(second=30),
+    )
+    with mock.patch('django.utils.timezone.now', return_value=now):
+        assert post not in unlogged_client.get('/').context['page_obj']
+        response = unlogged_client.get(f'/posts/{post.id}/')
+    assert response.status_code == 404, (
+        'Убедитесь, что страница публикации открывается не раньше, чем'
+        ' публикация появляется в лентах.'
+    )
+    later = now + timedelta(minutes=1)
+    with mock.patch('django.utils.timezone.now', return_value=later):
+        assert post in unlogged_client.get('/').context['page_obj']
+        response = unlogged_client.get(f'/posts/{post.id}/')
+    assert response.status_code == 200
@@ -0,0 +1,83 @@
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+POST_FORM = {
+    'title': 'Заголовок',
+    'text': 'Текст',
+    'pub_date': '2020-01-01T10:00',
+}
+
+# Сессия и пользователь авторизованного клиента дают два запроса
+# к каждому адресу. Ленты и страница публикации делают ещё один
+# лёгкий запрос для ETag и Last-Modified. Ленты, поток комментариев
+# и фото опубликованной публикации не читают сессию.
+QUERY_BUDGET = (
+    ('index', 'get', '/', 5),
+    ('category', 'get', '/category/{category}/', 6),
+    ('profile', 'get', '/profile/{username}/', 6),
+    ('post_detail', 'get', '/posts/{post}/', 5),
+    ('create_post', 'get', '/posts/create/', 4),
+    ('create_post', 'post', '/posts/create/', 5),
+    ('edit_post', 'get', '/posts/{post}/edit/', 5),
+    ('edit_post', 'post', '/posts/{post}/edit/', 9),
+    ('delete_post', 'get', '/posts/{post}/delete/', 3),
+    ('delete_post', 'post', '/posts/{post}/delete/', 11),
+    ('add_comment', 'post', '/posts/{post}/comment/', 8),
+    ('edit_comment', 'get', '/posts/{post}/edit_comment/{comment}/', 3),
+    ('edit_comment', 'post', '/posts/{post}/edit_comment/{comment}/', 6),
+    ('delete_comment', 'get', '/posts/{post}/delete_comment/{comment}/', 3),
+    (
+        'delete_comment',
+        'post',
+        '/posts/{post}/delete_comment/{comment}/',
+        8,
+    ),
+    ('edit_profile', 'get', '/profile-edit/', 2),
+    ('comments', 'get', '/posts/{post}/comments/', 4),
+    ('comment_stream', 'get', '/posts/{post}/comments/stream/', 2),
+    ('search', 'get', '/search/?q=Текст', 3),
+    ('feed_rss', 'get', '/feeds/rss/', 1),
+    ('feed_atom', 'get', '/feeds/atom/', 1),
+    ('category_feed_rss', 'get', '/category/{category}/rss/', 2),
+    ('category_feed_atom', 'get', '/category/{category}/atom/', 2),
+    ('profile_feed_rss', 'get', '/profile/{username}/rss/', 2),
+    ('profile_feed_atom', 'get', '/profile/{username}/atom/', 2),
+    ('export_posts', 'get', '/export/posts/?all=1', 4),
+    ('media', 'get', '{image}', 1),
+)
+
+
+@pytest.mark.parametrize(
+    ('name', 'method', 'url', 'expected'),
+    QUERY_BUDGET,
+    ids=[f'{method} {name}' for name, method, *_ in QUERY_BUDGET],
+)
+def test_query_budget(
+        name, method, url, expected, mixer, user, user_client,
+        post_with_published_location, django_assert_num_queries
+):
+    post = post_with_published_location
+    comment = mixer.blend('blog.Comment', post=post, author=user)
+    url = url.format(
+        post=post.id,
+        comment=comment.id,
+        category=post.category.slug,
+        username=user.username,
+        image=post.image.url,
+    )
+    if name == 'export_posts':
+        user.is_staff = True
+        user.save()
+    data = {'text': 'Текст'}
+    if name in ('create_post', 'edit_post'):
+        data = {**POST_FORM, 'category': post.category_id}
+
+    with django_assert_num_queries(expected):
+        if method == 'get':
+            response = user_client.get(url)
+        else:
+            response = user_client.post(url, data)
+        if response.streaming:
+            b''.join(response.streaming_content)
+    assert response.status_code in (200, 302)
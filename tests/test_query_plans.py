@@ -0,0 +1,64 @@
+import re
+
+import pytest
+from django.db import connection
+
+from blog.queryset_utilities import get_posts
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        connection.vendor != 'sqlite',
+        reason='Планы запросов проверяются для SQLite.',
+    ),
+]
+
+FULL_SCAN = re.compile(r'SCAN (TABLE )?blog_post$', re.MULTILINE)
+
+
+def assert_uses_index(queryset, index_name, page_name):
+    plan = queryset.explain()
+    assert not FULL_SCAN.search(plan), (
+        f'Убедитесь, что запрос публикаций для {page_name} не выполняет'
+        f' полный просмотр таблицы:\n{plan}'
+    )
+    assert index_name in plan, (
+        f'Убедитесь, что запрос публикаций для {page_name} использует'
+        f' индекс `{index_name}`:\n{plan}'
+    )
+    assert 'TEMP B-TREE FOR ORDER BY' not in plan, (
+        f'Убедитесь, что публикации для {page_name} сортируются по индексу,'
+        f' без временной сортировки:\n{plan}'
+    )
+
+
+def test_index_query_plan():
+    assert_uses_index(
+        get_posts(only_published=True),
+        'post_published_feed_idx',
+        'главной страницы',
+    )
+
+
+def test_category_query_plan(published_category):
+    assert_uses_index(
+        get_posts(published_category.posts, only_published=True),
+        'post_category_pub_date_idx',
+        'страницы категории',
+    )
+
+
+def test_profile_query_plan(user):
+    for posts in (
+        get_posts(user.posts),
+        get_posts(user.posts, only_published=True),
+    ):
+        assert_uses_index(
+            posts, 'post_author_pub_date_idx', 'страницы пользователя'
+        )
+
+
+def test_comments_query_plan(post_with_published_location):
+    plan = post_with_published_location.comments.all().explain()
+    assert 'comment_post_created_at_idx' in plan, plan
+    assert 'TEMP B-TREE FOR ORDER BY' not in plan, plan
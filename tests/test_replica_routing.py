@@ -0,0 +1,122 @@
+import pytest
+from django.conf import settings as django_settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.client import Client
+from django.test.utils import CaptureQueriesContext
+
+from blog.models import Comment, Post
+from blog.routers import ReplicaRouter, RoutingState, routing_state
+
+User = get_user_model()
+
+pytestmark = [
+    pytest.mark.django_db(transaction=True, databases=['default', 'replica']),
+]
+
+
+@pytest.fixture(autouse=True)
+def replicas(settings):
+    settings.DATABASE_REPLICAS = ['replica']
+    cache.clear()
+    yield
+    cache.clear()
+
+
+def replicate(*objects):
+    for obj in objects:
+        obj.save(using='replica', force_insert=True)
+
+
+def test_feed_reads_go_to_replica(
+        unlogged_client, user, post_with_published_location
+):
+    post = post_with_published_location
+    response = unlogged_client.get(f'/posts/{post.id}/')
+    assert response.status_code == 404, (
+        'Убедитесь, что страница публикации читается с реплики, если она'
+        ' указана в `DATABASE_REPLICAS`.'
+    )
+    assert post not in unlogged_client.get('/').context['page_obj'], (
+        'Убедитесь, что главная страница читается с реплики.'
+    )
+
+    replicate(user, post.category, post.location, post)
+    assert post.id == Post.objects.using('replica').get().id
+    assert unlogged_client.get(f'/posts/{post.id}/').status_code == 200
+    for url in (
+        '/',
+        f'/category/{post.category.slug}/',
+        f'/profile/{user.username}/',
+    ):
+        response = unlogged_client.get(url)
+        assert response.status_code == 200
+        assert post in response.context['page_obj'], (
+            f'Убедитесь, что страница `{url}` читается с реплики.'
+        )
+
+
+def test_author_reads_own_writes_from_primary(
+        user, post_with_published_location
+):
+    post = post_with_published_location
+    replicate(user, post.category, post.location, post)
+    author = Client()
+    author.force_login(user)
+
+    response = author.post(
+        f'/posts/{post.id}/comment/',
+        {'text': 'Свежий комментарий'},
+        follow=True,
+    )
+    assert response.status_code == 200
+    assert 'Свежий комментарий' in response.content.decode('utf-8'), (
+        'Убедитесь, что после записи пользователь читает с основной базы и'
+        ' сразу видит свой комментарий.'
+    )
+    pin = response.client.cookies[django_settings.REPLICA_PIN_COOKIE]
+    assert pin['max-age'] == django_settings.REPLICA_PIN_SECONDS
+    assert Comment.objects.using('replica').count() == 0, (
+        'Убедитесь, что запись выполняется в основную базу.'
+    )
+
+    reader = Client()
+    assert 'Свежий комментарий' not in reader.get(
+        f'/posts/{post.id}/'
+    ).content.decode('utf-8'), (
+        'Убедитесь, что закрепление за основной базой действует только'
+        ' для пользователя, который изменял данные.'
+    )
+
+
+def test_one_replica_per_request(
+        settings, unlogged_client, user, post_with_published_location
+):
+    post = post_with_published_location
+    replicate(user, post.category, post.location, post)
+    settings.DATABASE_REPLICAS = ['default', 'replica']
+    used = set()
+    for _ in range(10):
+        cache.clear()
+        with CaptureQueriesContext(
+            connections['default']
+        ) as primary, CaptureQueriesContext(connections['replica']) as replica:
+            assert unlogged_client.get(f'/posts/{post.id}/').status_code == 200
+        assert not (primary and replica), (
+            'Убедитесь, что все чтения одного запроса идут на одну реплику.'
+        )
+        used.add('replica' if replica else 'default')
+    assert used == {'default', 'replica'}
+
+
+def test_users_are_read_from_primary():
+    state = RoutingState(replica_reads=True, replica='replica')
+    token = routing_state.set(state)
+    try:
+        assert ReplicaRouter().db_for_read(User) == DEFAULT_DB_ALIAS, (
+            'Убедитесь, что пользователи всегда читаются с основной базы.'
+        )
+        assert ReplicaRouter().db_for_read(Post) == 'replica'
+    finally:
+        routing_state.reset(token)
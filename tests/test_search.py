@@ -0,0 +1,110 @@
+import pytest
+from django.db import connection
+
+from blog.models import Post
+from blog.search import FTS_TABLE, ensure_search_triggers, search_posts
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def searchable_posts(mixer, user, published_category, published_location):
+    def blend(**kwargs):
+        return mixer.blend(
+            'blog.Post',
+            author=user,
+            category=published_category,
+            location=published_location,
+            **kwargs,
+        )
+
+    return {
+        'title': blend(title='Кедровые орехи', text='Про тайгу.'),
+        'text': blend(title='Поход', text='Собирали кедровые шишки.'),
+        'other': blend(title='Море', text='Про пляж.'),
+        'hidden': blend(title='Кедровый черновик', is_published=False),
+    }
+
+
+def search_ids(client, query, **params):
+    response = client.get('/search/', {'q': query, **params})
+    assert response.status_code == 200
+    return [post.id for post in response.context['page_obj']]
+
+
+def test_search_ranks_published_posts(unlogged_client, searchable_posts):
+    posts = searchable_posts
+    assert search_ids(unlogged_client, 'кедров') == [
+        posts['title'].id,
+        posts['text'].id,
+    ], (
+        'Убедитесь, что поиск находит опубликованные публикации по началу'
+        ' слова в заголовке и тексте, а совпадения в заголовке идут выше.'
+    )
+    assert search_ids(unlogged_client, 'кедровые шишки') == [
+        posts['text'].id
+    ], 'Убедитесь, что поиск требует совпадения всех слов запроса.'
+    for query in ('', '"', 'AND OR (', '*'):
+        assert search_ids(unlogged_client, query) == [], (
+            'Убедитесь, что пустой запрос или запрос из одних служебных'
+            ' символов не приводит к ошибке.'
+        )
+
+
+def test_search_index_follows_changes(searchable_posts):
+    post = searchable_posts['other']
+    post.title = 'Горное озеро'
+    post.save()
+    assert list(search_posts('озеро')) == [post]
+    assert not search_posts('море').exists(), (
+        'Убедитесь, что полнотекстовый индекс обновляется при изменении'
+        ' публикации.'
+    )
+    Post.objects.filter(pk=post.pk).update(text='Ледник')
+    assert list(search_posts('ледник')) == [post]
+    post.delete()
+    assert not search_posts('озеро').exists(), (
+        'Убедитесь, что удалённая публикация пропадает из индекса.'
+    )
+
+
+def test_search_triggers_are_restored(searchable_posts):
+    with connection.cursor() as cursor:
+        cursor.execute(f'DROP TRIGGER {FTS_TABLE}_insert')
+    ensure_search_triggers()
+    post = Post.objects.create(
+        title='Новая находка',
+        text='Текст',
+        pub_date=searchable_posts['title'].pub_date,
+        author=searchable_posts['title'].author,
+    )
+    assert list(search_posts('находка')) == [post], (
+        'Убедитесь, что триггеры полнотекстового индекса восстанавливаются'
+        ' после миграций.'
+    )
+
+
+def test_search_uses_fts_index(searchable_posts):
+    plan = search_posts('кедров').explain()
+    assert 'VIRTUAL TABLE' in plan and 'SCAN blog_post ' not in plan, (
+        'Убедитесь, что поиск выполняется по индексу FTS5, а не полным'
+        ' просмотром таблицы публикаций.'
+    )
+
+
+def test_search_pagination_keeps_query(
+        mixer, unlogged_client, user, published_category
+):
+    mixer.cycle(12).blend(
+        'blog.Post',
+        title='Кедровый пост',
+        author=user,
+        category=published_category,
+    )
+    response = unlogged_client.get('/search/', {'q': 'кедровый'})
+    assert response.context['paginator'].count == 12
+    assert 'href="?q=%D0%BA%D0%B5%D0%B4%D1%80%D0%BE%D0%B2%D1%8B%D0%B9&amp;' \
+        'page=2"' in response.content.decode('utf-8'), (
+            'Убедитесь, что ссылки пагинации результатов поиска сохраняют'
+            ' поисковый запрос.'
+        )
@@ -0,0 +1,79 @@
+from io import StringIO
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.db.models import Sum
+
+from blog.models import Category, Comment, Location, Post, User
+
+pytestmark = [pytest.mark.django_db]
+
+SEED_OPTIONS = dict(
+    users=5, categories=3, locations=4, posts=30, comments=90, batch_size=7
+)
+
+
+def snapshot():
+    return list(
+        Post.objects.order_by('pk').values_list(
+            'title',
+            'text',
+            'is_published',
+            'author__username',
+            'category__slug',
+            'location__name',
+        )
+    )
+
+
+def test_seed_blog_generates_rows():
+    out = StringIO()
+    call_command('seed_blog', stdout=out, **SEED_OPTIONS)
+    assert (
+        User.objects.count(),
+        Category.objects.count(),
+        Location.objects.count(),
+        Post.objects.count(),
+        Comment.objects.count(),
+    ) == (5, 3, 4, 30, 90), (
+        'Убедитесь, что команда `seed_blog` создаёт заданное количество'
+        ' пользователей, категорий, местоположений, публикаций и'
+        ' комментариев.'
+    )
+    assert Post.objects.aggregate(total=Sum('comment_count'))['total'] == 90, (
+        'Убедитесь, что после заполнения базы командой `seed_blog`'
+        ' счётчики комментариев публикаций пересчитаны.'
+    )
+    assert 'Комментарии: 90/90' in out.getvalue(), (
+        'Убедитесь, что команда `seed_blog` сообщает о ходе загрузки.'
+    )
+
+
+def test_seed_blog_is_deterministic():
+    call_command('seed_blog', stdout=StringIO(), seed=7, **SEED_OPTIONS)
+    first = snapshot()
+    for model in (Comment, Post, Category, Location, User):
+        model.objects.all().delete()
+    call_command('seed_blog', stdout=StringIO(), seed=7, **SEED_OPTIONS)
+    assert snapshot() == first, (
+        'Убедитесь, что команда `seed_blog` с одним и тем же `--seed`'
+        ' создаёт одинаковые данные.'
+    )
+
+
+def test_seed_blog_imports_fixture():
+    call_command(
+        'seed_blog',
+        stdout=StringIO(),
+        fixture=str(settings.BASE_DIR.parent / 'db.json'),
+    )
+    assert Post.objects.count() == 39, (
+        'Убедитесь, что команда `seed_blog --fixture` загружает'
+        ' публикации из файла в формате dumpdata.'
+    )
+    category = Category.objects.get(pk=1)
+    assert (category.slug, category.created_at.year) == ('routine', 2022), (
+        'Убедитесь, что при загрузке из файла команда `seed_blog`'
+        ' сохраняет значения полей, в том числе даты создания.'
+    )
@@ -0,0 +1,107 @@
+import threading
+
+import pytest
+from django.core.cache import cache
+from django.db import connection, connections
+from django.test.client import Client
+
+from blog.models import Comment
+
+WRITERS = 4
+READERS = 2
+COMMENTS_PER_WRITER = 10
+
+pytestmark = [
+    pytest.mark.skipif(
+        connection.vendor != 'sqlite', reason='Проверяются настройки SQLite.'
+    ),
+]
+
+
+def _run(errors, target, *args):
+    try:
+        target(*args)
+    except Exception as error:
+        errors.append(error)
+    finally:
+        connections.close_all()
+
+
+def _write(post, client):
+    for number in range(COMMENTS_PER_WRITER):
+        response = client.post(
+            f'/posts/{post.id}/comment/', {'text': f'Комментарий {number}'}
+        )
+        assert response.status_code == 302, response.status_code
+
+
+def _read(post, done):
+    client = Client()
+    while not done.is_set():
+        for url in ('/', '/feeds/rss/', f'/posts/{post.id}/'):
+            response = client.get(url)
+            assert response.status_code == 200, response.status_code
+
+
+@pytest.mark.django_db
+def test_connection_pragmas_are_applied():
+    with connection.cursor() as cursor:
+        cursor.execute('PRAGMA journal_mode')
+        journal_mode = cursor.fetchone()[0]
+        cursor.execute('PRAGMA synchronous')
+        synchronous = cursor.fetchone()[0]
+        cursor.execute('PRAGMA busy_timeout')
+        busy_timeout = cursor.fetchone()[0]
+    assert journal_mode == 'wal', (
+        'Убедитесь, что соединения с SQLite открываются в режиме WAL.'
+    )
+    assert synchronous == 1, (
+        'Убедитесь, что для SQLite задан `synchronous = NORMAL`.'
+    )
+    assert busy_timeout > 0, (
+        'Убедитесь, что для SQLite задан `busy_timeout`.'
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_comments_and_feed_reads(
+        mixer, post_with_published_location
+):
+    post = post_with_published_location
+    cache.clear()
+    users = mixer.cycle(WRITERS).blend('auth.User')
+    clients = []
+    for user in users:
+        client = Client()
+        client.force_login(user)
+        clients.append(client)
+    errors = []
+    done = threading.Event()
+    readers = [
+        threading.Thread(target=_run, args=(errors, _read, post, done))
+        for _ in range(READERS)
+    ]
+    writers = [
+        threading.Thread(target=_run, args=(errors, _write, post, client))
+        for client in clients
+    ]
+    for thread in readers + writers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    done.set()
+    for thread in readers:
+        thread.join()
+    cache.clear()
+
+    assert not errors, (
+        'Убедитесь, что одновременная запись комментариев и чтение лент'
+        f' не приводят к ошибкам SQLite: {errors!r}'
+    )
+    post.refresh_from_db()
+    expected = WRITERS * COMMENTS_PER_WRITER
+    assert Comment.objects.filter(post=post).count() == expected
+    assert post.comment_count == expected, (
+        'Убедитесь, что счётчик комментариев не теряет обновлений при'
+        ' одновременной записи.'
+    )
@@ -0,0 +1,173 @@
+import base64
+import gzip
+import hashlib
+import io
+import json
+from http import HTTPStatus
+from unittest import mock
+
+import pytest
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.template import Context, Template
+from django.test import override_settings
+
+from blog.staticfiles import BOOTSTRAP_CSS, is_vendored
+
+BOOTSTRAP_CONTENT = b'.container{margin:0 auto}' * 200
+STORAGE = 'blog.staticfiles.CompressedManifestStaticFilesStorage'
+
+
+@pytest.fixture(scope='module')
+def collected(tmp_path_factory):
+    source = tmp_path_factory.mktemp('vendor')
+    (source / BOOTSTRAP_CSS).parent.mkdir(parents=True)
+    (source / BOOTSTRAP_CSS).write_bytes(BOOTSTRAP_CONTENT)
+    root = tmp_path_factory.mktemp('static_collected')
+    with override_settings(
+        STATIC_ROOT=root,
+        STATICFILES_DIRS=[*settings.STATICFILES_DIRS, source],
+        STATICFILES_STORAGE=STORAGE,
+    ):
+        call_command('collectstatic', interactive=False, verbosity=0)
+        manifest = json.loads((root / 'staticfiles.json').read_text())
+        yield root, manifest['paths']
+    is_vendored.cache_clear()
+
+
+def static_url(name):
+    return settings.STATIC_URL + name
+
+
+def test_collectstatic_hashes_and_compresses(collected):
+    root, paths = collected
+    assert paths['img/logo.png'] != 'img/logo.png'
+    assert (root / paths['img/logo.png']).exists()
+    assert not (root / (paths['img/logo.png'] + '.gz')).exists(), (
+        'Убедитесь, что несжимаемые файлы не получают gzip-копий.'
+    )
+    compressed = root / (paths[BOOTSTRAP_CSS] + '.gz')
+    assert gzip.decompress(compressed.read_bytes()) == BOOTSTRAP_CONTENT, (
+        'Убедитесь, что collectstatic кладёт рядом с CSS его gzip-копию.'
+    )
+
+
+def test_hashed_static_is_immutable(collected, client):
+    _, paths = collected
+    url = static_url(paths['img/logo.png'])
+    response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    assert response['Content-Type'] == 'image/png'
+    assert 'immutable' in response['Cache-Control']
+    assert f'max-age={settings.STATIC_MAX_AGE}' in response['Cache-Control']
+    repeated = client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+    assert repeated.status_code == HTTPStatus.NOT_MODIFIED, (
+        'Убедитесь, что повторный запрос статики с If-None-Match получает'
+        ' ответ 304.'
+    )
+    assert repeated.content == b''
+    assert 'immutable' in repeated['Cache-Control']
+
+
+def test_unhashed_static_revalidates(collected, client):
+    response = client.get(static_url('img/logo.png'))
+    assert response.status_code == HTTPStatus.OK
+    assert response['Cache-Control'] == 'no-cache', (
+        'Убедитесь, что файлы без хеша в имени не кешируются навсегда.'
+    )
+    repeated = client.get(
+        static_url('img/logo.png'),
+        HTTP_IF_MODIFIED_SINCE=response['Last-Modified'],
+    )
+    assert repeated.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_precompressed_static(collected, client):
+    _, paths = collected
+    url = static_url(paths[BOOTSTRAP_CSS])
+    compressed = client.get(url, HTTP_ACCEPT_ENCODING='gzip, br')
+    assert compressed['Content-Encoding'] == 'gzip'
+    assert compressed['Content-Type'] == 'text/css'
+    assert 'Accept-Encoding' in compressed['Vary']
+    body = b''.join(compressed.streaming_content)
+    assert gzip.decompress(body) == BOOTSTRAP_CONTENT
+    plain = client.get(url)
+    assert not plain.has_header('Content-Encoding')
+    assert b''.join(plain.streaming_content) == BOOTSTRAP_CONTENT
+    assert plain['ETag'] != compressed['ETag'], (
+        'Убедитесь, что у сжатой и несжатой версий файла разные ETag.'
+    )
+
+
+@pytest.mark.parametrize(
+    'header, compressed',
+    (
+        ('gzip;q=0, br', False),
+        ('br, *;q=0.1', True),
+        ('*, gzip;q=0', False),
+        ('GZIP;q=0.5', True),
+        ('identity', False),
+    ),
+)
+def test_accept_encoding_weights(collected, client, header, compressed):
+    _, paths = collected
+    response = client.get(
+        static_url(paths[BOOTSTRAP_CSS]), HTTP_ACCEPT_ENCODING=header
+    )
+    response.close()
+    assert response.has_header('Content-Encoding') == compressed, (
+        'Убедитесь, что gzip-копия отдаётся только клиентам, которые'
+        ' принимают gzip с ненулевым q.'
+    )
+
+
+@pytest.mark.parametrize(
+    'name', ('missing.css', '../settings.py', 'img/')
+)
+def test_unknown_static_passes_through(collected, client, name):
+    assert client.get(static_url(name)).status_code == HTTPStatus.NOT_FOUND
+
+
+def test_bootstrap_stylesheet(collected):
+    _, paths = collected
+    template = Template('{% load assets %}{% bootstrap_stylesheet %}')
+    is_vendored.cache_clear()
+    assert static_url(paths[BOOTSTRAP_CSS]) in template.render(Context())
+    with override_settings(STATICFILES_DIRS=settings.STATICFILES_DIRS[:1]):
+        is_vendored.cache_clear()
+        assert 'cdn.jsdelivr.net' in template.render(Context()), (
+            'Убедитесь, что без скачанного Bootstrap страница подключает'
+            ' его с CDN.'
+        )
+    is_vendored.cache_clear()
+
+
+def vendor_bootstrap(tmp_path, integrity):
+    source = {
+        'url': 'https://cdn.example.com/bootstrap.min.css',
+        'integrity': integrity,
+    }
+    with override_settings(
+        STATICFILES_DIRS=[tmp_path], BOOTSTRAP5={'css_url': source}
+    ), mock.patch(
+        'blog.management.commands.vendor_bootstrap.urlopen',
+        return_value=io.BytesIO(BOOTSTRAP_CONTENT),
+    ):
+        call_command('vendor_bootstrap', stdout=io.StringIO())
+    return tmp_path / BOOTSTRAP_CSS
+
+
+def test_vendor_bootstrap(tmp_path):
+    digest = hashlib.sha384(BOOTSTRAP_CONTENT).digest()
+    integrity = 'sha384-' + base64.b64encode(digest).decode()
+    target = vendor_bootstrap(tmp_path, integrity)
+    assert target.read_bytes() == BOOTSTRAP_CONTENT
+
+
+def test_vendor_bootstrap_checks_integrity(tmp_path):
+    with pytest.raises(CommandError):
+        vendor_bootstrap(tmp_path, 'sha384-AAAA')
+    assert not (tmp_path / BOOTSTRAP_CSS).exists(), (
+        'Убедитесь, что файл с неверным хешем не сохраняется.'
+    )